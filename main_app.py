@@ -35,6 +35,9 @@ from viewers.doppler.callbacks import doppler_callbacks
 from viewers.SAR_Drone.callbacks import register_SAR_drone_callback
 from viewers.SAR_Drone.layout import SAR_app_layout
 
+from viewers.common.audio_store import audio_store
+from viewers.common.inference_pool import inference_pool
+
 # Initialize ECG components
 ecg_data_loader = ECGDataLoader()
 ecg_predictor = ECGPredictor()
@@ -200,6 +203,12 @@ register_all_callback_eeg(app)
 doppler_callbacks(app)
 register_SAR_drone_callback(app)
 
+# Generated and uploaded audio is streamed from here instead of data URIs
+audio_store.register(server)
+
+# Model processes for the background jobs, once every task is registered
+inference_pool.start()
+
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 8080))  # Render provides PORT env var
     app.run(host="0.0.0.0", port=port, debug=False)
\ No newline at end of file
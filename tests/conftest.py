@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Keep background jobs, cached diagnoses and the live buffer of the test run out of the app's stores
+_scratch = tempfile.mkdtemp(prefix='signal_viewer_tests_')
+os.environ.setdefault('BACKGROUND_CACHE_DIR', os.path.join(_scratch, 'jobs'))
+os.environ.setdefault('ECG_PREDICTION_CACHE_DIR', os.path.join(_scratch, 'predictions'))
+os.environ.setdefault('ECG_STREAM_BUFFER', os.path.join(_scratch, 'ecg_stream.buf'))
@@ -0,0 +1,32 @@
+"""Drive registered Dash callbacks through the update endpoint, as the browser does"""
+import json
+
+
+def fire(app, inputs, state=()):
+    """
+    Run the callback whose inputs are exactly `inputs` through Dash's update endpoint
+
+    Args:
+        inputs (list): (id, property, value) of every input, in order
+        state (list): (id, property, value) of every state
+
+    Returns:
+        dict: {component id: {property: value}} of the outputs that changed
+            ({} when the callback prevented the update)
+    """
+    spec = [f'{id_}.{prop}' for id_, prop, _ in inputs]
+    output = next(key for key, callback in app.callback_map.items()
+                  if [f"{i['id']}.{i['property']}" for i in callback['inputs']] == spec)
+    outputs = [dict(zip(('id', 'property'), part.rsplit('.', 1)))
+               for part in output.strip('.').split('...')]
+
+    body = {
+        'output': output,
+        'outputs': outputs if output.startswith('..') else outputs[0],
+        'inputs': [{'id': id_, 'property': prop, 'value': value} for id_, prop, value in inputs],
+        'changedPropIds': [spec[0]],
+        'state': [{'id': id_, 'property': prop, 'value': value} for id_, prop, value in state]
+    }
+    response = app.server.test_client().post('/_dash-update-component', json=body)
+    assert response.status_code in (200, 204), response.data
+    return json.loads(response.data)['response'] if response.status_code == 200 else {}
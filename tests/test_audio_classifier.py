@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('librosa')
+pytest.importorskip('torch')
+
+from viewers.SAR_Drone.models import audio_classifier
+
+
+@pytest.fixture
+def yamnet_scores(monkeypatch):
+    rng = np.random.default_rng(0)
+    scores = rng.random((7, 10)).astype(np.float32)
+    mask = np.zeros(10, dtype=np.float32)
+    mask[[1, 4, 5]] = 1.0
+    monkeypatch.setattr(audio_classifier, '_bird_mask', mask)
+    monkeypatch.setattr(audio_classifier, 'get_bird_model', lambda: lambda waveform: (scores, None, None))
+    return scores, mask
+
+
+def test_bird_score_matches_normalised_mean_scores(yamnet_scores):
+    scores, mask = yamnet_scores
+    bird_score, frame_times, frame_probs = audio_classifier.bird_frame_scores(np.zeros(16000))
+
+    # The original per-class loop: normalise the mean score vector, sum the bird classes
+    mean_scores = scores.mean(axis=0)
+    expected = np.sum((mean_scores / mean_scores.sum())[mask > 0])
+    assert bird_score == pytest.approx(expected, rel=1e-5)
+
+    np.testing.assert_allclose(frame_probs, scores[:, mask > 0].sum(axis=1) / scores.sum(axis=1), rtol=1e-5)
+    np.testing.assert_allclose(frame_times, np.arange(7) * audio_classifier.YAMNET_HOP_SECONDS)
+
+
+def test_bird_segments_merge_consecutive_frames():
+    times = np.arange(6) * audio_classifier.YAMNET_HOP_SECONDS
+    probs = [0.1, 0.5, 0.6, 0.0, 0.9, 0.2]
+    segments = audio_classifier.bird_segments(times, probs, threshold=0.3)
+
+    frame = audio_classifier.YAMNET_FRAME_SECONDS
+    assert segments == [(times[1], times[2] + frame), (times[4], times[4] + frame)]
+    assert audio_classifier.bird_segments(times, np.zeros(6)) == []
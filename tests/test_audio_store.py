@@ -0,0 +1,59 @@
+import base64
+
+import flask
+import pytest
+
+from viewers.common.audio_store import AudioStore
+
+
+@pytest.fixture
+def store_client(tmp_path):
+    store = AudioStore(root=str(tmp_path))
+    server = flask.Flask(__name__)
+    store.register(server)
+    return store, server.test_client()
+
+
+def test_put_is_content_addressed(store_client):
+    store, _ = store_client
+    url = store.put(b'RIFF-audio', '.WAV')
+    assert url == store.put(b'RIFF-audio', '.wav')
+    assert url != store.put(b'other-audio', '.wav')
+    with pytest.raises(ValueError):
+        store.put(b'data', '.exe')
+
+    upload = 'data:audio/mpeg;base64,' + base64.b64encode(b'ID3-audio').decode()
+    assert store.put_upload(upload, 'clip.mp3').endswith('.mp3')
+
+
+def test_range_requests(store_client):
+    store, client = store_client
+    data = bytes(range(256)) * 40
+    url = store.put(data, '.wav')
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.data == data
+    assert full.headers['Accept-Ranges'] == 'bytes'
+    assert full.mimetype == 'audio/wav'
+
+    part = client.get(url, headers={'Range': 'bytes=100-199'})
+    assert part.status_code == 206
+    assert part.data == data[100:200]
+    assert part.headers['Content-Range'] == f'bytes 100-199/{len(data)}'
+
+    assert client.get(url, headers={'If-None-Match': full.headers['ETag']}).status_code == 304
+
+
+def test_unknown_or_unsafe_assets_are_not_served(store_client):
+    store, client = store_client
+    assert client.get('/audio-assets/' + 'a' * 32 + '.wav').status_code == 404
+    assert client.get('/audio-assets/..%2Fsecret.wav').status_code == 404
+    assert store.path('../etc.wav') is None
+
+
+def test_eviction_keeps_the_store_bounded(tmp_path):
+    store = AudioStore(root=str(tmp_path), max_bytes=2500)
+    for i in range(5):
+        store.put(bytes([i]) * 1000, '.wav')
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 2500
@@ -0,0 +1,143 @@
+import json
+import os
+import time
+
+import dash
+import numpy as np
+import pytest
+
+from viewers.common.inference_pool import inference_pool
+from viewers.ecg.callbacks.graph import register_graph_callbacks
+from viewers.ecg.components.layout import create_ecg_layout
+from viewers.ecg.config import DIAGNOSIS_LABELS, MODEL_INPUT_SIZE
+from viewers.ecg.models.prediction_cache import PredictionCache
+from viewers.ecg.models.predictor import ECGPredictor
+
+
+class _Predictions:
+    def __init__(self, values):
+        self.values = values
+
+    def numpy(self):
+        return self.values
+
+
+class StubModelPredictor(ECGPredictor):
+    """ECGPredictor whose lazily loaded model always predicts the third label"""
+
+    def __init__(self, model_path, pid_file):
+        super().__init__(model_path)
+        self.pid_file = pid_file
+
+    def _load(self):
+        if self._infer is None:
+            with open(self.pid_file, 'a') as f:
+                f.write(f"{os.getpid()}\n")  # tells the test which processes loaded it
+
+            def infer(metadata, signal):
+                assert signal.shape[1:] == (MODEL_INPUT_SIZE, 12)
+                probabilities = np.zeros((1, len(DIAGNOSIS_LABELS)), dtype=np.float32)
+                probabilities[0, 2] = 1.0
+                return _Predictions(probabilities)
+
+            self._infer = infer
+
+
+class StubLoader:
+    dataset_id = 1
+
+    def get_dataset_hash(self):
+        return 'stub-dataset'
+
+    def get_record(self, record_index):
+        signal = np.zeros((1000, 12), dtype=np.float32)
+        return np.zeros(4, dtype=np.float32), signal, signal, None
+
+
+@pytest.fixture
+def pool():
+    yield inference_pool
+    inference_pool.stop()
+
+
+def _post(client, body, **query):
+    response = client.post('/_dash-update-component', query_string=query, json=body)
+    assert response.status_code in (200, 204), response.data
+    return json.loads(response.data) if response.status_code == 200 else {}
+
+
+def _diagnose(client, predictor, record, dataset='stub-dataset'):
+    """Post a diagnosis request and poll its background job until it answers"""
+    key = [dataset, record, predictor.model_hash]
+    body = {
+        'output': 'ecg-diagnosis-result.data',
+        'outputs': {'id': 'ecg-diagnosis-result', 'property': 'data'},
+        'inputs': [{'id': 'ecg-diagnosis-request', 'property': 'data',
+                    'value': {'key': key, 'record': record, 'clicks': 1}}],
+        'changedPropIds': ['ecg-diagnosis-request.data'],
+        'state': []
+    }
+
+    job = _post(client, body)
+    assert job['cacheKey'] and job['job']
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        update = _post(client, body, cacheKey=job['cacheKey'], job=job['job'])
+        if 'ecg-diagnosis-result' in update.get('response', {}):
+            break
+        time.sleep(0.2)
+    else:
+        raise AssertionError("Background diagnosis job did not finish")
+
+    payload = update['response']['ecg-diagnosis-result']['data']
+    assert payload['key'] == key
+    return payload['result']
+
+
+def test_diagnosis_runs_in_the_inference_pool(tmp_path, pool):
+    model_path = tmp_path / 'model.keras'
+    model_path.write_bytes(b'stub model')
+    pid_file = tmp_path / 'loaded.pid'
+    predictor = StubModelPredictor(str(model_path), pid_file)
+
+    app = dash.Dash(__name__, suppress_callback_exceptions=True)
+    app.layout = create_ecg_layout(1, 12)
+    register_graph_callbacks(app, StubLoader(), predictor)
+    pool.start()
+    client = app.server.test_client()
+
+    # Every pool process loads the model as soon as it starts
+    deadline = time.monotonic() + 30
+    while not pid_file.exists() or len(pid_file.read_text().split()) < pool.processes:
+        assert time.monotonic() < deadline, "Pool processes did not warm up"
+        time.sleep(0.1)
+
+    for record in range(4):
+        result = _diagnose(client, predictor, record)
+        assert result['success'], result['error']
+        assert result['label'] == DIAGNOSIS_LABELS[2]
+
+    # The model was loaded once by each long-lived pool process, never by the
+    # web process or the per-job processes
+    assert predictor._infer is None
+    loaded_by = [int(pid) for pid in pid_file.read_text().split()]
+    assert len(loaded_by) == len(set(loaded_by)) == pool.processes
+    assert set(loaded_by) <= {worker.pid for worker in pool._workers}
+    # ...which still reports the inference times from the shared counters
+    assert predictor.timing_stats()['calls'] >= 4
+
+
+def test_diagnosis_of_other_data_is_refused(tmp_path):
+    model_path = tmp_path / 'model.keras'
+    model_path.write_bytes(b'stub model')
+    predictor = StubModelPredictor(str(model_path), tmp_path / 'loaded.pid')
+
+    app = dash.Dash(__name__, suppress_callback_exceptions=True)
+    app.layout = create_ecg_layout(1, 12)
+    register_graph_callbacks(app, StubLoader(), predictor)
+
+    # Keyed by a worker holding other data than this one
+    result = _diagnose(app.server.test_client(), predictor, 0, dataset='uploaded-dataset')
+    assert not result['success'] and 'dataset changed' in result['error']
+    assert PredictionCache().get(['uploaded-dataset', 0, predictor.model_hash]) is None
@@ -0,0 +1,60 @@
+import numpy as np
+
+from viewers.common.decimation import minmax_envelope, MinMaxPyramid
+
+
+def _check_envelope(y, indices, values, start, stop):
+    assert np.all(np.diff(indices) >= 0)
+    assert indices.min() >= start and indices.max() < stop
+    np.testing.assert_array_equal(values, y[indices])
+    assert values.min() == y[start:stop].min()
+    assert values.max() == y[start:stop].max()
+
+
+def test_minmax_envelope_keeps_extremes():
+    y = np.random.default_rng(0).standard_normal(10007)
+    indices, values = minmax_envelope(y, 100, 13, 9001)
+    assert len(indices) <= 2 * 100 + 2
+    _check_envelope(y, indices, values, 13, 9001)
+
+
+def test_pyramid_non_power_of_two_length():
+    rng = np.random.default_rng(1)
+    n_samples = MinMaxPyramid.BASE_BIN * 37 * 11 + 3  # odd bin counts at several levels and a sub-bin tail
+    signals = rng.standard_normal((2, n_samples))
+    # Extremes in the last bins, which an odd level would otherwise drop
+    signals[0, n_samples - 6] = 50.0
+    signals[1, n_samples - 10] = -50.0
+    pyramid = MinMaxPyramid(signals)
+
+    # Every level spans the whole signal and the top is a single bin
+    n_bins = n_samples // MinMaxPyramid.BASE_BIN
+    for level, (arg_min, v_min, arg_max, v_max) in enumerate(pyramid.levels):
+        assert arg_min.shape[1] == -(-n_bins // 2 ** level)
+    assert pyramid.levels[-1][0].shape[1] == 1
+    top_min, top_max = pyramid.levels[-1][1][:, 0], pyramid.levels[-1][3][:, 0]
+    covered = signals[:, :pyramid.n_covered]
+    np.testing.assert_array_equal(top_min, covered.min(axis=1))
+    np.testing.assert_array_equal(top_max, covered.max(axis=1))
+
+    for channel in range(2):
+        for start, stop, bins in [(0, n_samples, 10), (0, n_samples, 3), (5, n_samples - 1, 7),
+                                  (1000, n_samples, 40), (123, 64000, 20)]:
+            indices, values = pyramid.envelope(channel, start, stop, bins)
+            _check_envelope(signals[channel], indices, values, start, stop)
+            assert len(indices) <= 4 * bins + 4
+
+
+def test_pyramid_size_and_fine_zoom():
+    rng = np.random.default_rng(2)
+    signals = rng.standard_normal((3, 200_000))
+    pyramid = MinMaxPyramid(signals)
+    pyramid_bytes = sum(a.nbytes for level in pyramid.levels for a in level)
+    assert pyramid_bytes < 0.1 * signals.nbytes
+
+    # Fine zooms bypass the pyramid and match the raw envelope exactly
+    start, stop, bins = 5000, 5000 + MinMaxPyramid.BASE_BIN * 100, 100
+    indices, values = pyramid.envelope(1, start, stop, bins)
+    expected = minmax_envelope(signals[1], bins, start, stop)
+    np.testing.assert_array_equal(indices, expected[0])
+    np.testing.assert_array_equal(values, expected[1])
@@ -0,0 +1,131 @@
+import csv
+import importlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import h5py
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+from viewers.doppler import batch
+from viewers.doppler.callbacks.doppler_callbacks import (
+    TOTAL_DISTANCE,
+    estimate_source_frequency,
+    generate_doppler_audio,
+    predict_vehicle_speed
+)
+from viewers.doppler.speed_index import ESTIMATE_ROW, SpeedIndex
+
+# the callbacks package re-exports a function under the module's name
+doppler_callbacks = importlib.import_module('viewers.doppler.callbacks.doppler_callbacks')
+
+SAMPLE_RATE = 8000
+
+
+def test_scenario_grid():
+    grid = batch.scenario_grid([500, 800], [36, 72], [10, 30, 50])
+    assert len(grid) == 2 * 2 * 3
+    assert grid[0] == {'source_freq': 500.0, 'speed_ms': 10.0, 'lateral': 10.0}
+    assert {s['speed_ms'] for s in grid} == {10.0, 20.0}
+
+    grid = batch.scenario_grid([500], [10], [5], speed_unit='ms')
+    assert grid == [{'source_freq': 500.0, 'speed_ms': 10.0, 'lateral': 5.0}]
+    assert batch.scenario_name(grid[0]) == 'doppler_500Hz_36kmh_5m'
+
+
+def test_generated_audio():
+    audio, freq_profile, time_array = generate_doppler_audio(600.0, 40.0, 20.0, SAMPLE_RATE)
+    n = int(TOTAL_DISTANCE / 40.0 * SAMPLE_RATE)
+    assert audio.shape == (n, 2) and len(freq_profile) == len(time_array) == n
+    assert audio.dtype == np.int16
+    # approaching then receding: above the source frequency first, below it last
+    assert freq_profile[0] > 600.0 > freq_profile[-1]
+    # panned left at the start and right at the end
+    left, right = np.abs(audio[:n // 10].astype(float)).mean(axis=0)
+    assert left > right
+    left, right = np.abs(audio[-n // 10:].astype(float)).mean(axis=0)
+    assert right > left
+
+
+def test_generate_batch(tmp_path):
+    scenarios = batch.scenario_grid([500, 900], [100], [10], speed_unit='ms')
+    seen = []
+    summary = batch.generate_batch(scenarios, str(tmp_path), workers=1, sample_rate=SAMPLE_RATE,
+                                   profile_points=50, progress=seen.append)
+
+    assert len(summary['results']) == len(seen) == 2
+    assert summary['audio_seconds'] == pytest.approx(2 * TOTAL_DISTANCE / 100, rel=1e-3)
+    for result in summary['results']:
+        rate, audio = wavfile.read(tmp_path / f"{result['name']}.wav")
+        assert rate == SAMPLE_RATE and audio.shape[1] == 2
+        profile = np.loadtxt(tmp_path / f"{result['name']}_profile.csv", delimiter=',', skiprows=1)
+        assert profile.shape == (50, 2)
+        assert np.all(np.diff(profile[:, 0]) > 0)
+
+
+@pytest.fixture
+def speed_h5(tmp_path, monkeypatch):
+    path = tmp_path / 'speeds.h5'
+    estimates = np.zeros((ESTIMATE_ROW + 1, 2))
+    estimates[ESTIMATE_ROW] = [58.5, 81.0]
+    with h5py.File(path, 'w') as hf:
+        hf['Mazda3_speeds_est_all'] = estimates
+        hf['Mazda3_speeds_gt'] = np.array([60, 80])
+    monkeypatch.setattr(doppler_callbacks, 'speed_index', SpeedIndex(str(path)))
+
+
+def test_predict_vehicle_speed(speed_h5):
+    assert predict_vehicle_speed('Mazda3_60.wav') == 58.5
+    assert predict_vehicle_speed('Mazda3_80.wav') == 81.0
+    for filename, message in [('Mazda3_70.wav', "GT speed not found in H5"),
+                              ('Tractor_60.wav', "Vehicle is not present"),
+                              ('recording.wav', "Invalid filename format")]:
+        with pytest.raises(ValueError, match=message):
+            predict_vehicle_speed(filename)
+
+
+def _write_pass_by(path, source_freq=700.0, speed_ms=30.0):
+    audio, _, _ = generate_doppler_audio(source_freq, speed_ms, 10.0, SAMPLE_RATE)
+    wavfile.write(path, SAMPLE_RATE, audio)
+
+
+def test_analyze_recording(tmp_path, speed_h5):
+    _write_pass_by(tmp_path / 'Mazda3_60.wav')
+    row = batch.analyze_recording(None, str(tmp_path / 'Mazda3_60.wav'))
+    assert row['status'] == 'ok'
+    assert list(row) == batch.ANALYSIS_COLUMNS
+    assert row['predicted_speed_kmh'] == 58.5
+    assert row['source_freq_hz'] == pytest.approx(
+        estimate_source_frequency(row['dominant_freq_hz'], 58.5), abs=0.01)
+
+    (tmp_path / 'broken.wav').write_bytes(b'not a wav file')
+    row = batch.analyze_recording(None, str(tmp_path / 'broken.wav'))
+    assert row['status'] != 'ok' and row['dominant_freq_hz'] is None
+
+
+def test_analyze_batch_from_zip(tmp_path, speed_h5, monkeypatch):
+    recordings = tmp_path / 'recordings'
+    recordings.mkdir()
+    _write_pass_by(recordings / 'Mazda3_60.wav')
+    _write_pass_by(recordings / 'Mazda3_80.wav', speed_ms=80 / 3.6)
+    _write_pass_by(recordings / 'Unknown_50.wav')
+    archive = tmp_path / 'recordings.zip'
+    with zipfile.ZipFile(archive, 'w') as zf:
+        for wav in recordings.iterdir():
+            zf.write(wav, f'pass_bys/{wav.name}')
+        zf.writestr('notes.txt', 'ignored')
+
+    assert [p for _, p in batch.list_recordings(str(archive))] == [
+        'pass_bys/Mazda3_60.wav', 'pass_bys/Mazda3_80.wav', 'pass_bys/Unknown_50.wav']
+    assert len(batch.list_recordings(str(recordings))) == 3
+
+    # run in-process so the patched speed index is the one being used
+    monkeypatch.setattr(batch, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    summary = batch.analyze_batch(str(archive), str(tmp_path / 'results.csv'), workers=2)
+
+    assert summary['files'] == 3 and summary['failed'] == 1
+    with open(tmp_path / 'results.csv', newline='') as f:
+        rows = {row['file']: row for row in csv.DictReader(f)}
+    assert rows['pass_bys/Mazda3_80.wav']['predicted_speed_kmh'] == '81.0'
+    assert rows['pass_bys/Unknown_50.wav']['status'] == "Vehicle is not present"
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from viewers.doppler.callbacks.doppler_callbacks import (
+    MAX_TIMELINE_FRAMES,
+    START_X,
+    END_X,
+    compute_animation_timeline,
+    compute_observed_freq,
+    compute_observed_freq_profile
+)
+
+
+def test_profile_matches_scalar_formula():
+    car_x = np.array([-200.0, -50.0, -0.5, 0.0, 0.5, 80.0, 200.0])
+    for lateral in (0.0, 10.0):
+        f_obs, v_radial, r = compute_observed_freq_profile(440.0, 30.0, car_x, 0.0, lateral)
+        for i, x in enumerate(car_x):
+            expected = compute_observed_freq(440.0, 30.0, x, 0.0, lateral)
+            np.testing.assert_allclose((f_obs[i], v_radial[i], r[i]), expected)
+
+
+def test_timeline_covers_the_trip():
+    timeline = compute_animation_timeline(500.0, 20.0, 5.0, display_hz=25)
+    duration = (END_X - START_X) / 20.0
+    assert timeline['duration'] == pytest.approx(duration)
+    assert len(timeline['x']) == len(timeline['f']) == len(timeline['left']) == int(duration * 25) + 1
+    assert timeline['x'][0] == START_X and timeline['x'][-1] == END_X
+    assert timeline['left'][0] == 10 and timeline['left'][-1] == 90
+    assert timeline['dt'] == pytest.approx(1 / 25)
+
+    # Approaching raises the pitch, receding lowers it
+    assert timeline['f'][0] > 500.0 > timeline['f'][-1]
+
+
+def test_slow_trips_are_capped():
+    timeline = compute_animation_timeline(500.0, 0.0, 5.0)
+    assert len(timeline['x']) == MAX_TIMELINE_FRAMES
+    assert timeline['dt'] == pytest.approx(timeline['duration'] / (MAX_TIMELINE_FRAMES - 1))
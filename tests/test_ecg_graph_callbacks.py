@@ -0,0 +1,127 @@
+import json
+
+import dash
+import numpy as np
+import pytest
+
+from tests.dash_client import fire as _fire
+from viewers.ecg.callbacks.graph import register_graph_callbacks
+from viewers.ecg.components.layout import create_ecg_layout
+from viewers.ecg.config import SAMPLING_FREQUENCY
+from viewers.ecg.models.predictor import ECGPredictor
+from viewers.ecg.utils.figure_cache import FigureCache
+
+
+class SignalLoader:
+    """Loader serving the same synthetic 12-lead record for every index"""
+
+    dataset_id = 1
+
+    def __init__(self):
+        t = np.arange(20 * SAMPLING_FREQUENCY) / SAMPLING_FREQUENCY
+        self.signal = np.column_stack([np.sin(2 * np.pi * (1 + lead / 12) * t) for lead in range(12)])
+
+    def get_dataset_hash(self):
+        return 'signal-dataset'
+
+    def get_record(self, record_index):
+        return np.zeros(4, dtype=np.float32), self.signal, self.signal, None
+
+
+@pytest.fixture
+def app(tmp_path):
+    model_path = tmp_path / 'model.keras'
+    model_path.write_bytes(b'never loaded')
+
+    app = dash.Dash(__name__, suppress_callback_exceptions=True)
+    app.layout = create_ecg_layout(1, 12)
+    app.loader = SignalLoader()
+    register_graph_callbacks(app, app.loader, ECGPredictor(str(model_path)))
+    return app
+
+
+def _static(app, mode='static', record=0, channels=(0, 1)):
+    return _fire(app, [('ecg-mode-select', 'value', mode),
+                       ('ecg-record-select', 'value', record),
+                       ('ecg-channel-select', 'value', list(channels))])
+
+
+def _figure_cache_stats(app):
+    return json.loads(app.server.test_client().get('/ecg/figure-cache').data)
+
+
+def test_figure_cache_lru():
+    cache = FigureCache(max_entries=2)
+    builds = []
+
+    def build(name):
+        return lambda: builds.append(name) or name
+
+    assert cache.get(('a',), build('a')) == 'a'
+    assert cache.get(('a',), build('a2')) == 'a'
+    cache.get(('b',), build('b'))
+    cache.get(('a',), build('a3'))  # a becomes the most recent entry
+    cache.get(('c',), build('c'))   # evicts b
+    cache.get(('b',), build('b2'))
+    assert builds == ['a', 'b', 'c', 'b2']
+    assert cache.stats() == {'entries': 2, 'hits': 2, 'misses': 4, 'hit_rate': 2 / 6}
+
+    cache.clear()
+    assert cache.stats()['entries'] == 0
+
+
+def test_static_figures_are_cached_per_record_channels_and_dataset(app):
+    first = _static(app)['ecg-graph']['figure']
+    assert _static(app)['ecg-graph']['figure'] == first
+    assert _figure_cache_stats(app)['hits'] == 1
+
+    # Each input the figure depends on is part of the key
+    _static(app, channels=(0, 2))
+    _static(app, record=1)
+    app.loader.dataset_id += 1
+    _static(app)
+    stats = _figure_cache_stats(app)
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 4, 4)
+
+
+MODE_CALLBACKS = {
+    'static': ([('ecg-record-select', 'value', 0), ('ecg-channel-select', 'value', [0, 1])], []),
+    'continuous': ([('ecg-record-select', 'value', 0), ('ecg-channel-select', 'value', [0, 1]),
+                    ('ecg-continuous-position', 'value', 2.5), ('ecg-continuous-zoom', 'value', 6),
+                    ('ecg-continuous-speed', 'value', 1.0)],
+                   [('ecg-data-source-select', 'value', 'preloaded')]),
+    'xor_chunks': ([('ecg-record-select', 'value', 0), ('ecg-xor-chunks-channel', 'value', 0),
+                    ('ecg-xor-chunk-period', 'value', 0.7), ('ecg-xor-duration', 'value', 5.0),
+                    ('ecg-xor-chunks-threshold', 'value', 0.05)], []),
+    'polar_new': ([('ecg-record-select', 'value', 0), ('ecg-polar-channel', 'value', 0),
+                   ('ecg-polar-window', 'value', 5.0), ('ecg-polar-mode', 'value', 'latest'),
+                   ('ecg-polar-position', 'data', 0)],
+                  [('ecg-polar-cumulative-data', 'data', 0), ('ecg-session-id', 'data', 'test-session')]),
+    'phase_space': ([('ecg-record-select', 'value', 0), ('ecg-phase-space-channel-1', 'value', 0),
+                     ('ecg-phase-space-channel-2', 'value', 1), ('ecg-phase-space-resolution', 'value', 0.1),
+                     ('ecg-colormap-select', 'value', 'Viridis')], [])
+}
+
+
+@pytest.mark.parametrize('mode', sorted(MODE_CALLBACKS))
+def test_only_the_shown_mode_renders(app, mode):
+    inputs, state = MODE_CALLBACKS[mode]
+    for shown in sorted(MODE_CALLBACKS) + ['grid']:
+        response = _fire(app, [('ecg-mode-select', 'value', shown)] + inputs, state)
+        if shown == mode:
+            assert response['ecg-graph']['figure']['data']
+        else:
+            assert response == {}, f"{mode} callback updated while {shown} is shown"
+
+
+def test_live_and_grid_callbacks_skip_other_modes(app):
+    live = [('ecg-live-interval', 'n_intervals', 3), ('ecg-mode-select', 'value', 'static'),
+            ('ecg-data-source-select', 'value', 'live'), ('ecg-channel-select', 'value', [0]),
+            ('ecg-continuous-zoom', 'value', 6)]
+    assert _fire(app, live) == {}
+
+    grid = [('ecg-mode-select', 'value', 'continuous'), ('ecg-grid-lead', 'value', 1),
+            ('ecg-grid-page', 'data', 0)]
+    filters = [('ecg-record-label-filter', 'value', None), ('ecg-record-sex-filter', 'value', None),
+               ('ecg-record-age-filter', 'value', None), ('ecg-record-bpm-filter', 'value', None)]
+    assert _fire(app, grid, filters) == {}
@@ -0,0 +1,85 @@
+import dash
+import numpy as np
+import pytest
+
+from tests.dash_client import fire
+from viewers.ecg.callbacks.interval import register_interval_callbacks
+from viewers.ecg.components.layout import create_ecg_layout
+from viewers.ecg.config import CONTINUOUS_UPDATE_INTERVAL, POLAR_UPDATE_INTERVAL
+from viewers.ecg.data.stream import ECGStreamBuffer
+
+
+def _block(start, n, n_leads=2):
+    """Samples whose value is their absolute index, on every lead"""
+    return np.repeat(np.arange(start, start + n, dtype=np.float32)[:, np.newaxis], n_leads, axis=1)
+
+
+@pytest.mark.parametrize('file_backed', [False, True])
+def test_stream_buffer_wraps_around(tmp_path, file_backed):
+    path = str(tmp_path / 'stream.buf') if file_backed else None
+    buffer = ECGStreamBuffer(n_leads=2, fs=10, seconds=1, path=path)
+    assert buffer.capacity == 10
+    assert buffer.latest(5)[1].shape == (0, 2)
+
+    buffer.append(_block(0, 7))
+    start, samples = buffer.latest(20)
+    assert (start, buffer.total) == (0, 7)
+    np.testing.assert_array_equal(samples, _block(0, 7))
+
+    # Crosses the end of the ring: the oldest samples are overwritten
+    buffer.append(_block(7, 6))
+    start, samples = buffer.latest(20)
+    assert (start, buffer.total) == (3, 13)
+    np.testing.assert_array_equal(samples, _block(3, 10))
+    np.testing.assert_array_equal(buffer.latest(4)[1], _block(9, 4))
+
+    # A block longer than the ring keeps only its newest samples
+    buffer.append(_block(13, 25))
+    start, samples = buffer.latest(10)
+    assert (start, buffer.total) == (28, 38)
+    np.testing.assert_array_equal(samples, _block(28, 10))
+
+    if file_backed:
+        reader = ECGStreamBuffer(n_leads=2, fs=10, seconds=1, path=path)
+        assert reader.total == 38
+        np.testing.assert_array_equal(reader.latest(10)[1], _block(28, 10))
+
+
+@pytest.fixture
+def interval_app():
+    app = dash.Dash(__name__, suppress_callback_exceptions=True)
+    app.layout = create_ecg_layout(1, 12)
+    register_interval_callbacks(app)
+    return app
+
+
+def _interval(app, mode, source='preloaded', continuous_playing=False, speed=2.0, polar_playing=False):
+    response = fire(app, [('ecg-mode-select', 'value', mode), ('ecg-play-pause', 'n_clicks', 0),
+                          ('ecg-continuous-playing', 'data', continuous_playing),
+                          ('ecg-continuous-speed', 'value', speed),
+                          ('ecg-polar-playing', 'data', polar_playing),
+                          ('ecg-data-source-select', 'value', source)],
+                    [('ecg-interval', 'disabled', True)])
+    return response['ecg-interval']['disabled'], response['ecg-interval']['interval']
+
+
+def test_interval_follows_mode_and_playback(interval_app):
+    assert _interval(interval_app, 'static') == (True, 1000)
+    assert _interval(interval_app, 'continuous') == (True, CONTINUOUS_UPDATE_INTERVAL)
+    assert _interval(interval_app, 'continuous', continuous_playing=True) == (
+        False, int(CONTINUOUS_UPDATE_INTERVAL / 2.0))
+    assert _interval(interval_app, 'continuous', source='live', continuous_playing=True) == (
+        True, CONTINUOUS_UPDATE_INTERVAL)
+    assert _interval(interval_app, 'polar_new') == (True, POLAR_UPDATE_INTERVAL)
+    assert _interval(interval_app, 'polar_new', polar_playing=True) == (False, POLAR_UPDATE_INTERVAL)
+
+
+def test_live_interval_runs_only_for_the_live_continuous_view(interval_app):
+    def live_disabled(mode, source):
+        response = fire(interval_app, [('ecg-mode-select', 'value', mode),
+                                       ('ecg-data-source-select', 'value', source)])
+        return response['ecg-live-interval']['disabled']
+
+    assert live_disabled('continuous', 'live') is False
+    assert live_disabled('continuous', 'preloaded') is True
+    assert live_disabled('static', 'live') is True
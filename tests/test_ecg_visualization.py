@@ -0,0 +1,36 @@
+import numpy as np
+
+from viewers.ecg.config import GRID_POINT_BUDGET, SAMPLING_FREQUENCY
+from viewers.ecg.utils.visualization import create_grid_plot
+
+
+def test_grid_keeps_to_the_point_budget():
+    rng = np.random.default_rng(0)
+    for n_records in (1, 7, 24):
+        signals = rng.standard_normal((n_records, 5000))
+        records = list(range(100, 100 + n_records))
+        fig = create_grid_plot(signals, records, 1, SAMPLING_FREQUENCY, columns=4)
+
+        assert len(fig.data) == n_records
+        n_points = sum(len(trace.y) for trace in fig.data)
+        assert n_points <= GRID_POINT_BUDGET + 2 * n_records  # plus a partial last bin per panel
+        for trace, record, y in zip(fig.data, records, signals):
+            assert trace.name == f'Record {record}'
+            assert trace.y.dtype == np.float32
+            # The envelope keeps every panel's extremes
+            assert trace.y.max() == np.float32(y.max()) and trace.y.min() == np.float32(y.min())
+            assert np.all(np.diff(trace.x) >= 0) and trace.x[-1] <= len(y) / SAMPLING_FREQUENCY
+
+        # Panels fill four columns, row by row
+        assert fig.data[-1].xaxis == ('x' if n_records == 1 else f'x{n_records}')
+        assert fig.layout.height == max(400, 150 * -(-n_records // 4))
+
+
+def test_grid_with_short_signals_and_no_records():
+    signals = np.arange(60, dtype=float).reshape(3, 20)
+    fig = create_grid_plot(signals, [0, 1, 2], 0, SAMPLING_FREQUENCY, titles=['a', 'b', 'c'])
+    np.testing.assert_array_equal(fig.data[1].y, signals[1])  # short panels are sent whole
+    assert [a.text for a in fig.layout.annotations] == ['a', 'b', 'c']
+
+    fig = create_grid_plot(np.empty((0, 100)), [], 0, SAMPLING_FREQUENCY)
+    assert not fig.data and "No records" in fig.layout.annotations[0].text
@@ -0,0 +1,77 @@
+import threading
+
+import numpy as np
+import pytest
+
+mne = pytest.importorskip('mne')
+pytest.importorskip('keras')
+
+from viewers.EEG.Data_helper import SEGMENT_SIZE, DataManager  # noqa: E402
+
+
+def _manager(**attrs):
+    """A DataManager without the EDF and model loading of __init__"""
+    manager = DataManager.__new__(DataManager)
+    manager.segments = []
+    manager.segment_predictions = []
+    manager.processing_done = threading.Event()
+    manager.processing_error = None
+    manager.__dict__.update(attrs)
+    return manager
+
+
+def test_read_signals_in_float32_blocks():
+    sfreq = 256.0
+    ch_names = ['A', 'B', 'C']
+    data = np.random.default_rng(0).normal(0, 50e-6, (3, 1000))  # volts
+    raw = mne.io.RawArray(data, mne.create_info(ch_names, sfreq, ch_types='eeg'), verbose=False)
+    manager = _manager(temp_edf=raw)
+
+    # Blocks of 0.7 s (179 samples) do not divide the recording evenly
+    signals = manager.read_signals(['C', 'A'], block_seconds=0.7)
+    assert signals.dtype == np.float32 and signals.shape == (2, 1000)
+    np.testing.assert_allclose(signals, data[[2, 0]] * 1e6, rtol=1e-6)
+
+
+class _RecordingModel:
+    """Returns the mean of each downsampled segment and records the batch sizes"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, batch, verbose=0):
+        self.batch_sizes.append(len(batch))
+        return batch.mean(axis=(1, 2, 3))[:, np.newaxis]
+
+
+def test_background_processing_reports_progress():
+    n_segments = 5
+    signals = np.zeros((2, n_segments * SEGMENT_SIZE + 7), dtype=np.float32)
+    for i in range(n_segments):
+        signals[:, i * SEGMENT_SIZE:(i + 1) * SEGMENT_SIZE] = i / 4
+    model = _RecordingModel()
+    manager = _manager(temp_signals=signals, n_segments=n_segments, original_sfreq=256, model=model)
+    assert manager.progress() == {'processed': 0, 'total': n_segments, 'done': False, 'error': None}
+
+    manager.start_processing(batch_size=2)
+    assert manager.processing_done.wait(30)
+
+    assert manager.progress() == {'processed': n_segments, 'total': n_segments, 'done': True, 'error': None}
+    assert model.batch_sizes == [2, 2, 1]
+    assert [p['segment'] for p in manager.segment_predictions] == list(range(n_segments))
+    assert [p['is_seizure'] for p in manager.segment_predictions] == [False, False, False, True, True]
+    assert manager.segments[3]['start_sample'] == 3 * SEGMENT_SIZE
+    assert manager.segments[3]['data'].shape == (2, SEGMENT_SIZE)
+
+
+def test_background_processing_reports_errors():
+    class FailingModel:
+        def predict(self, batch, verbose=0):
+            raise RuntimeError("out of memory")
+
+    manager = _manager(temp_signals=np.zeros((2, 2 * SEGMENT_SIZE), dtype=np.float32),
+                       n_segments=2, original_sfreq=256, model=FailingModel())
+    manager.start_processing()
+    assert manager.processing_done.wait(30)
+    assert manager.progress()['error'] == "out of memory"
+    assert manager.progress()['processed'] == 0
@@ -0,0 +1,73 @@
+import os
+
+import diskcache
+import pytest
+
+from viewers.common.inference_pool import InferenceError, InferencePool
+
+
+def _fail(message):
+    raise ValueError(message)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = diskcache.Cache(str(tmp_path / 'cache'))
+    yield cache
+    cache.close()
+
+
+def test_tasks_run_in_long_lived_processes(cache):
+    pool = InferencePool(processes=2, cache=cache, lease_seconds=3)
+    pool.register('pid', os.getpid)
+    pool.register('add', lambda a, b=0: a + b)
+    pool.register('fail', _fail)
+
+    with pytest.raises(InferenceError, match="not running"):
+        pool.run('add', 1)
+
+    pool.start()
+    try:
+        with pytest.raises(RuntimeError):
+            pool.register('late', os.getpid)
+
+        progress = []
+        assert pool.run('add', 2, b=3, set_progress=progress.append, timeout=30) == 5
+        assert progress[0].startswith("⏳")
+
+        pids = {pool.run('pid', timeout=30) for _ in range(10)}
+        assert os.getpid() not in pids
+        assert pids <= {worker.pid for worker in pool._workers}
+        assert len(pool._workers) == 2
+
+        with pytest.raises(InferenceError, match="broken input"):
+            pool.run('fail', "broken input", timeout=30)
+        with pytest.raises(InferenceError, match="Unknown inference task"):
+            pool.run('missing', timeout=30)
+
+        # A process that dies is replaced at the next lease renewal
+        pool._workers[0].kill()
+        pool._workers[0].join()
+        assert pool.run('add', 1, timeout=30) == 1
+    finally:
+        pool.stop()
+
+    assert cache.get(InferencePool.LEASE_KEY) is None
+    assert pool._workers == []
+
+
+def test_one_worker_runs_the_pool(cache):
+    first = InferencePool(processes=1, cache=cache, lease_seconds=3)
+    second = InferencePool(processes=1, cache=cache, lease_seconds=3)
+    for pool in (first, second):
+        pool.register('pid', os.getpid)
+
+    first.start()
+    try:
+        first.run('pid', timeout=30)
+        second.start()
+        assert second.run('pid', timeout=30) == first._workers[0].pid
+        assert second._workers == []
+    finally:
+        first.stop()
+        second.stop()
@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+from viewers.SAR_Drone.models import model_registry
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, 'MODEL_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(model_registry, 'PINS_FILE', str(tmp_path / 'pins.json'))
+
+    def download(name, target, revision):
+        with open(os.path.join(target, 'yamnet_class_map.csv'), 'w') as f:
+            f.write(f'index,mid,display_name\n0,/m/0,{revision}\n')
+
+    monkeypatch.setattr(model_registry, '_download', download)
+    return model_registry
+
+
+def test_unpinned_artifact_is_served_and_checked_against_its_first_download(registry):
+    target = registry.prefetch(['yamnet_class_map'])['yamnet_class_map']
+    assert target.endswith(os.path.join('yamnet_class_map', 'master'))
+    assert registry.verify('yamnet_class_map') == target
+
+    with open(os.path.join(target, 'yamnet_class_map.csv'), 'a') as f:
+        f.write('tampered\n')
+    with pytest.raises(registry.ArtifactError):
+        registry.verify('yamnet_class_map')
+
+
+def test_pinned_artifact_must_match_its_pin(registry, tmp_path):
+    with open(registry.PINS_FILE, 'w') as f:
+        json.dump({'yamnet_class_map': {'revision': 'abc123', 'files': {'yamnet_class_map.csv': '0' * 64}}}, f)
+    with pytest.raises(registry.ArtifactError):
+        registry.prefetch(['yamnet_class_map'])
+
+    reference = tmp_path / 'reference.csv'
+    reference.write_text('index,mid,display_name\n0,/m/0,abc123\n')
+    with open(registry.PINS_FILE, 'w') as f:
+        json.dump({'yamnet_class_map': {'revision': 'abc123',
+                                        'files': {'yamnet_class_map.csv': registry._sha256(str(reference))}}}, f)
+    target = registry.prefetch(['yamnet_class_map'])['yamnet_class_map']
+    assert target.endswith('abc123')
+    assert registry.verify('yamnet_class_map') == target
@@ -0,0 +1,70 @@
+import diskcache
+import numpy as np
+import pytest
+
+from viewers.ecg.utils.polar_buffer import PolarBufferStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    cache = diskcache.Cache(str(tmp_path / 'cache'))
+    yield PolarBufferStore(capacity=1000, window_points=200, ttl=60, cache=cache)
+    cache.close()
+
+
+def _window(n, samples=500):
+    theta = np.linspace(0, 360, samples)
+    r = np.abs(np.sin(np.radians(theta) * 3)) + n
+    return r, theta
+
+
+def test_windows_are_decimated_and_kept_across_requests(store):
+    with store.session('a') as history:
+        history.append(*_window(0))
+        history.append(*_window(1, samples=50))
+
+    with store.session('a') as history:
+        assert history.n_windows == 2
+        (n0, r0, theta0), (n1, r1, theta1) = history.windows()
+        assert (n0, n1) == (0, 1)
+        assert len(r0) <= 201 and np.isnan(r0[-1]) and np.isnan(theta0[-1])
+        assert r0.dtype == np.float32
+        # The envelope keeps the extremes of the window
+        r, _ = _window(0)
+        assert np.nanmax(r0) == pytest.approx(r.max()) and np.nanmin(r0) == pytest.approx(r.min())
+        assert len(r1) == 51  # short windows are stored whole
+
+    with store.session('b') as other:
+        assert other.n_windows == 0 and other.fade_groups(5) == []
+
+
+def test_appends_write_only_the_new_window(store):
+    with store.session('a') as history:
+        for n in range(3):
+            history.append(*_window(n))
+    keys = set(store.cache.iterkeys())
+
+    with store.session('a') as history:
+        history.append(*_window(3))
+    assert set(store.cache.iterkeys()) - keys == {'polar-buffer-a-3'}
+
+
+def test_oldest_windows_are_dropped_and_faded(store):
+    with store.session('a') as history:
+        for n in range(12):
+            history.append(*_window(n))
+        assert history.size <= store.capacity
+        numbers = [n for n, _, _ in history.windows()]
+        assert numbers == list(range(12 - len(numbers), 12))
+        assert store.cache.get('polar-buffer-a-0') is None
+
+        groups = history.fade_groups(3)
+        assert len(groups) == 3
+        assert [age for _, _, age in groups] == pytest.approx([1 / 3, 2 / 3, 1])
+        assert sum(len(r) for r, _, _ in groups) == history.size
+        # Groups run from the oldest windows to the newest
+        assert np.nanmin(groups[0][0]) < np.nanmin(groups[-1][0])
+
+        history.clear()
+        assert history.n_windows == 0 and history.windows() == []
+    assert not [key for key in store.cache.iterkeys() if key.startswith('polar-buffer-a-')]
@@ -0,0 +1,48 @@
+import numpy as np
+
+from viewers.ecg.data.loader import ECGDataLoader
+from viewers.ecg.models.prediction_cache import PredictionCache
+
+RESULT = {'label': 'NORM', 'confidence': 0.9, 'success': True, 'error': None}
+
+
+def test_keys_and_lru():
+    cache = PredictionCache(max_entries=2, directory=None)
+    cache.put(['data-a', 1, 'model-1'], RESULT)
+    assert cache.get(('data-a', 1, 'model-1')) == RESULT  # lists from the browser match tuples
+
+    # Each part of the key tells diagnoses apart
+    for other in (['data-b', 1, 'model-1'], ['data-a', 2, 'model-1'], ['data-a', 1, 'model-2']):
+        assert cache.get(other) is None
+
+    cache.put(['data-a', 2, 'model-1'], RESULT)
+    cache.get(['data-a', 1, 'model-1'])
+    cache.put(['data-a', 3, 'model-1'], RESULT)  # evicts record 2, the least recently used
+    assert cache.get(['data-a', 2, 'model-1']) is None
+    assert cache.get(['data-a', 1, 'model-1']) == RESULT
+
+
+def test_disk_tier_is_shared(tmp_path):
+    directory = str(tmp_path / 'predictions')
+    job, worker = PredictionCache(directory=directory), PredictionCache(directory=directory)
+
+    job.put(['data-a', 1, 'model-1'], RESULT)
+    job.put(['data-a', 2, 'model-1'], RESULT, persist=False)
+    assert worker.get(['data-a', 1, 'model-1']) == RESULT
+    assert worker.get(['data-a', 2, 'model-1']) is None
+
+
+def test_dataset_hash_follows_the_model_inputs(tmp_path):
+    rng = np.random.default_rng(0)
+    arrays = {'X_test': rng.standard_normal((3, 4)), 'Y_test': rng.standard_normal((3, 100, 12)),
+              'Y_test_non_scaled': rng.standard_normal((3, 100, 12)), 'Z_test': np.eye(3)}
+    np.savez(tmp_path / 'a.npz', **arrays)
+    np.savez(tmp_path / 'b.npz', **{**arrays, 'Y_test_non_scaled': np.zeros((3, 100, 12))})
+    np.savez(tmp_path / 'c.npz', **{**arrays, 'Y_test': arrays['Y_test'][::-1]})
+
+    loader = ECGDataLoader(str(tmp_path / 'a.npz'))
+    first = loader.get_dataset_hash()
+    loader.load_data(str(tmp_path / 'b.npz'))
+    assert loader.get_dataset_hash() == first  # only the model inputs are hashed
+    loader.load_data(str(tmp_path / 'c.npz'))
+    assert loader.get_dataset_hash() != first
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from viewers.ecg.config import SAMPLING_FREQUENCY
+from viewers.ecg.data.loader import ECGDataLoader
+from viewers.ecg.data.record_index import RecordIndex, record_bpm
+
+LABELS = ['NORM', 'MI', 'STTC']
+
+
+def _ecg(bpm, seconds=10, fs=SAMPLING_FREQUENCY, leads=3):
+    """Flat curves with one sharp R peak per beat"""
+    signal = np.zeros((seconds * fs, leads))
+    signal[::int(round(60 / bpm * fs)), :] = 1.0  # the peak detector caps at 100 bpm
+    return signal
+
+
+@pytest.fixture
+def records():
+    X = np.array([[-1.0, 1.0], [0.5, -1.0], [1.5, 1.0], [0.0, -1.0]])  # z-scored age, sex
+    Y = np.stack([_ecg(60), _ecg(75), _ecg(100), _ecg(90)])
+    Z = np.array([[1, 0, 0], [0, 1, 0], [0, 1, 1], [0.2, 0.1, 0.9]])
+    return X, Y, Z
+
+
+def test_search(records):
+    index = RecordIndex(*records, labels=LABELS)
+    np.testing.assert_allclose(index.bpm, [60, 75, 100, 90], rtol=0.02)
+    assert list(index.sex) == ['F', 'M', 'F', 'M']
+    assert index.descriptions[2] == "Record 2 · MI/STTC · F · 100 bpm"
+
+    assert list(index.search()) == [0, 1, 2, 3]
+    assert list(index.search(query='mi')) == [1, 2]
+    assert list(index.search(query='sttc f')) == [2]
+    assert list(index.search(query='3')) == [3]
+    assert list(index.search(labels=['NORM', 'STTC'])) == [0, 2, 3]
+    assert list(index.search(labels=['unknown'])) == []
+    assert list(index.search(sex='M', bpm_range=(70, None))) == [1, 3]
+    assert list(index.search(age_range=(0, 1), bpm_range=(None, 80))) == [1]
+
+    options, page, n_pages = index.page(np.arange(4), page=5, page_size=3)
+    assert (page, n_pages) == (1, 2)
+    assert options == [{'label': index.descriptions[3], 'value': 3}]
+
+
+def test_precomputed_bpm(records):
+    X, Y, Z = records
+    bpm = record_bpm(Y)
+    index = RecordIndex(X, np.zeros_like(Y), Z, labels=LABELS, bpm=bpm)
+    np.testing.assert_array_equal(index.bpm, bpm)
+
+
+def test_loader_builds_index_at_load_time(records, tmp_path):
+    X, Y, Z = records
+    path = tmp_path / 'records.npz'
+    np.savez(path, X_test=X, Y_test_non_scaled=Y, Z_test=Z, Y_test=Y / Y.max())
+
+    loader = ECGDataLoader(str(path))
+    assert loader._index_ready.wait(30)
+    index = loader.get_record_index()
+    assert index is loader._record_index and index.n_records == 4
+
+    # Reloading the same curves reuses the cached BPM estimates
+    loader.load_data(str(path))
+    reloaded = loader.get_record_index()
+    assert reloaded is not index
+    np.testing.assert_array_equal(reloaded.bpm, index.bpm)
+
+    loader.data = None
+    assert loader.get_record_index() is None
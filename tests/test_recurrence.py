@@ -0,0 +1,98 @@
+import numpy as np
+
+from viewers.EEG.recurrence import (
+    CRP_BIN_UV,
+    RecurrenceCache,
+    all_pair_histograms,
+    code_dtype,
+    quantize,
+    recurrence_histogram,
+    similarity_matrix
+)
+
+
+def _signals(n_channels=3, n_samples=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    signals = rng.normal(0, 400, (n_channels, n_samples)).astype(np.float32)
+    signals[1] += 0.5 * signals[0]  # correlated pair
+    return signals
+
+
+def _unique_counts(x, y):
+    """The original scatter: unique rounded (x, y) points and how often each occurs"""
+    points, counts = np.unique(np.column_stack((np.round(x, -2), np.round(y, -2))),
+                               axis=0, return_counts=True)
+    return {(float(px), float(py)): int(c) for (px, py), c in zip(points, counts)}
+
+
+def _nonzero_counts(x_centers, y_centers, counts):
+    rows, cols = np.nonzero(counts)
+    return {(float(x_centers[r]), float(y_centers[c])): int(counts[r, c]) for r, c in zip(rows, cols)}
+
+
+def test_histogram_matches_unique_points():
+    signals = _signals()
+    cache = RecurrenceCache(signals)
+
+    x_centers, y_centers, counts = cache.get(0, 1)
+    assert counts.shape == (len(x_centers), len(y_centers))
+    assert counts.sum() == signals.shape[1]
+    assert np.all(np.diff(x_centers) == CRP_BIN_UV)
+    assert _nonzero_counts(x_centers, y_centers, counts) == _unique_counts(
+        signals[0].astype(np.float64), signals[1].astype(np.float64))
+
+
+def test_cache_reuses_and_evicts_pairs():
+    cache = RecurrenceCache(_signals(n_channels=4), max_pairs=2)
+
+    first = cache.get(0, 1)
+    assert cache.get(0, 1) is first
+
+    # The swapped pair is served transposed from the cached one
+    x_centers, y_centers, counts = cache.get(1, 0)
+    np.testing.assert_array_equal(x_centers, first[1])
+    np.testing.assert_array_equal(counts, first[2].T)
+
+    cache.get(2, 3)
+    assert (0, 1) not in cache._pairs
+    assert list(cache._pairs) == [(1, 0), (2, 3)]
+
+
+def test_code_dtype():
+    assert code_dtype([-300], [400]) == np.int16
+    assert code_dtype([-40000], [10]) == np.int32
+    assert code_dtype([0], [2 ** 40]) == np.int64
+
+
+def test_all_pair_histograms_match_single_pairs():
+    signals = _signals(n_channels=4, n_samples=3001)
+    # Several chunks, including a short last one, summed across workers
+    lows, histograms = all_pair_histograms(signals, max_workers=2, chunk_samples=700)
+    assert sorted(histograms) == [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
+
+    for (i, j), counts in histograms.items():
+        (lo_i, lo_j), expected = recurrence_histogram(quantize(signals[i]), quantize(signals[j]))
+        assert (lows[i], lows[j]) == (lo_i, lo_j)
+        assert counts.dtype == np.uint32
+        np.testing.assert_array_equal(counts.toarray(), expected)
+
+    similarity = similarity_matrix(histograms, 4)
+    np.testing.assert_allclose(similarity, similarity.T)
+    np.testing.assert_allclose(np.diag(similarity), 1.0)
+    # The correlated pair shares more information than the independent ones
+    assert similarity[0, 1] > similarity[2, 3]
+
+
+def test_cache_serves_precomputed_pairs():
+    signals = _signals()
+    cache = RecurrenceCache(signals)
+    expected = cache.get(2, 0)
+    cache._pairs.clear()
+
+    cache.start_precompute(max_workers=1)
+    assert cache.ready.wait(60)
+    assert cache.similarity.shape == (3, 3)
+    x_centers, y_centers, counts = cache.get(2, 0)
+    np.testing.assert_array_equal(x_centers, expected[0])
+    np.testing.assert_array_equal(y_centers, expected[1])
+    np.testing.assert_array_equal(counts, expected[2])
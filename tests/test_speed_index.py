@@ -0,0 +1,43 @@
+import h5py
+import numpy as np
+import pytest
+
+from viewers.doppler.layout.doppler_layout import H5_FILENAME
+from viewers.doppler.speed_index import ESTIMATE_ROW, SpeedIndex
+
+
+@pytest.fixture
+def h5_file(tmp_path):
+    path = tmp_path / 'speeds.h5'
+    estimates = np.zeros((ESTIMATE_ROW + 1, 4))
+    estimates[ESTIMATE_ROW] = [31.5, 52.0, 49.0, 70.25]
+    with h5py.File(path, 'w') as hf:
+        hf['Car_speeds_est_all'] = estimates
+        hf['Car_speeds_gt'] = np.array([30, 50, 50, 70])
+    return str(path)
+
+
+def test_lookup(h5_file):
+    index = SpeedIndex(h5_file)
+    assert index.available
+    assert index.lookup('Car', 30) == 31.5
+    assert index.lookup('Car', 70.0) == 70.25
+    assert index.lookup('Car', 50) == 52.0  # first entry of a repeated speed, as np.where(...)[0][0]
+    assert index.lookup('Car', 40) is None
+    assert index.speeds('Car') is index.speeds('Car')  # read once, then served from memory
+
+    with pytest.raises(KeyError):
+        index.lookup('Bus', 30)
+    assert not SpeedIndex(h5_file + '.missing').available
+
+
+def test_matches_direct_h5_reads():
+    index = SpeedIndex(H5_FILENAME)
+    if not index.available:
+        pytest.skip("speed estimation H5 file not present")
+
+    with h5py.File(H5_FILENAME, 'r') as hf:
+        speed_est = hf['Mazda3_speeds_est_all'][ESTIMATE_ROW]
+        speed_gt = hf['Mazda3_speeds_gt'][:]
+    for gt in speed_gt:
+        assert index.lookup('Mazda3', gt) == speed_est[np.where(speed_gt == gt)[0][0]]
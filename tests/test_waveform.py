@@ -0,0 +1,49 @@
+import numpy as np
+
+from viewers.SAR_Drone.waveform import WaveformStore, create_waveform_figure, visible_range, waveform_trace_data
+
+
+def test_visible_range_events():
+    assert visible_range(None) is False
+    assert visible_range({'dragmode': 'pan'}) is False
+    assert visible_range({'xaxis.autorange': True}) == (None, None)
+    assert visible_range({'xaxis.range[0]': 1.5, 'xaxis.range[1]': '2.5'}) == (1.5, 2.5)
+    assert visible_range({'xaxis.range': [0, 3]}) == (0.0, 3.0)
+
+
+def test_trace_data_is_bounded_and_keeps_peaks():
+    sr = 1000
+    y = np.sin(np.linspace(0, 200 * np.pi, 60 * sr)).astype(np.float32)
+    y[31234] = 2.0
+
+    t, values = waveform_trace_data(y, sr, n_bins=500)
+    assert len(values) <= 2 * 500 + 2
+    assert values.max() == 2.0
+
+    # A zoom re-decimates only the visible range (plus one padding bin per side)
+    t, values = waveform_trace_data(y, sr, 31.0, 32.0, n_bins=100)
+    assert t.min() >= 31.0 - 0.011 and t.max() <= 32.0 + 0.012
+    assert 2.0 in values
+
+
+def test_figure_keeps_zoom_across_patches():
+    y = np.zeros(1000, dtype=np.float32)
+    fig = create_waveform_figure(y, 100, 10.0, uirevision='clip-key')
+    assert fig.layout.uirevision == 'clip-key'
+    assert tuple(fig.layout.xaxis.range) == (0, 10.0)
+
+
+def test_store_round_trip_and_eviction(tmp_path):
+    store = WaveformStore(root=str(tmp_path), max_files=2)
+    y = np.arange(10, dtype=np.float64)
+    key = store.put(y)
+    loaded = store.get(key)
+    assert loaded.dtype == np.float32
+    np.testing.assert_array_equal(loaded, y)
+
+    assert store.get('../' + key) is not None  # unsafe characters are stripped, not followed
+    assert store.get('missing') is None
+
+    store.put(y)
+    store.put(y)
+    assert len(list(tmp_path.glob('*.npy'))) == 2
@@ -0,0 +1,24 @@
+import numpy as np
+
+from viewers.common.xor_engine import xor_chunks, xor_trace
+
+
+def test_xor_chunks_threshold_is_inclusive():
+    signal = np.array([0.0, 0.0, 0.0, 1.0, 0.5, 0.0])
+    n_chunks, pair, sample, value = xor_chunks(signal, 2, 0.5)
+    assert n_chunks == 3
+    # pair 0: |0-0|, |1-0| -> sample 1; pair 1: |0.5-0|, |0-1| -> samples 0 and 1
+    np.testing.assert_array_equal(pair, [0, 1, 1])
+    np.testing.assert_array_equal(sample, [1, 0, 1])
+    np.testing.assert_array_equal(value, [1.0, 0.5, 1.0])
+
+
+def test_xor_trace_thinning_keeps_peaks():
+    rng = np.random.default_rng(0)
+    signal = rng.standard_normal(200 * 1000)
+    signal[123457] += 40.0
+    _, pair, sample, value = xor_chunks(signal, 1000, 0.0)
+
+    trace = xor_trace(pair, sample, value, fs=250, max_points=2000)
+    assert len(trace.y) <= 2000 + 2
+    assert np.max(trace.y) == value.max()
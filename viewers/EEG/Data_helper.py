@@ -1,6 +1,7 @@
 import numpy as np
 import logging
 import os
+import threading
 
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 from keras.models import load_model
@@ -8,6 +9,8 @@ import yaml
 import mne
 import re
 
+from viewers.common.decimation import MinMaxPyramid
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,6 +29,8 @@ DOWNSAMPLING_FACTOR = config['DOWNSAMPLING_FACTOR']
 SFREQ = config['SFREQ']
 CH_LABELS = config['CH_LABELS']
 SEGMENT_SIZE = config['SEGMENT_SIZE']
+EDF_BLOCK_SECONDS = 60  # seconds of signal converted per read
+INFERENCE_BATCH_SIZE = 32  # segments per model.predict call
 
 
 # -----------------------
@@ -34,21 +39,32 @@ SEGMENT_SIZE = config['SEGMENT_SIZE']
 class DataManager:
     """Manages EEG data loading and preprocessing."""
 
-    def __init__(self, edf_file):
+    def __init__(self, edf_file, background=False):
+        """
+        Args:
+            edf_file (str): Path of the EDF recording
+            background (bool): Run segment inference in a background thread
+                (see start_processing and progress) instead of blocking
+        """
         self.edf_file = edf_file
         self.segments = []
         self.segment_predictions = []
+        self.processing_done = threading.Event()
+        self.processing_error = None
         self.load_data()
         self.load_model()
-        self.process_segments()
+        if background:
+            self.start_processing()
+        else:
+            self.process_segments()
 
     def load_data(self, ch_labels=CH_LABELS, verbose=True):
         logger.info("Loading data files...")
         if verbose:
             print(f'{self.edf_file}: Reading.')
 
-        # load EDF file
-        self.temp_edf = mne.io.read_raw_edf(self.edf_file, preload=True, verbose="ERROR")
+        # open EDF file lazily; samples are read per block in read_signals
+        self.temp_edf = mne.io.read_raw_edf(self.edf_file, preload=False, verbose="ERROR")
 
         if sum([any([0 if re.match(c, l) == None else 1 for l in self.temp_edf.ch_names]) for c in ch_labels]) == len(
                 ch_labels):
@@ -57,7 +73,7 @@ class DataManager:
             self.temp_edf.rename_channels(ch_mapping)
             self.temp_edf = self.temp_edf.pick(ch_labels)
 
-            self.temp_signals = self.temp_edf.get_data(picks=ch_labels) * 1e6
+            self.temp_signals = self.read_signals(ch_labels)
             self.total_samples = self.temp_signals.shape[1]
 
             # Calculate how many complete segments we can extract
@@ -69,52 +85,105 @@ class DataManager:
             # Create time axis for the entire signal
             self.time_axis = np.arange(self.total_samples) / self.original_sfreq
 
+            # Min/max envelopes at every zoom level for the continuous viewer
+            self.pyramid = MinMaxPyramid(self.temp_signals)
+
             logger.info(f"Data loaded. Total samples: {self.total_samples}, Segments: {self.n_segments}")
         else:
             if verbose == True:
                 print('EEG {}: Not appropriate channel labels. Reading skipped.'.format(self.edf_file))
 
+    def read_signals(self, ch_labels=CH_LABELS, block_seconds=EDF_BLOCK_SECONDS):
+        """
+        Read the picked channels as float32 μV, one block at a time.
+
+        Only a block of float64 samples exists at any moment, so peak memory is
+        the float32 result plus one block instead of two full float64 copies.
+        """
+        n_times = self.temp_edf.n_times
+        block = max(1, int(block_seconds * self.temp_edf.info['sfreq']))
+        signals = np.empty((len(ch_labels), n_times), dtype=np.float32)
+
+        for start in range(0, n_times, block):
+            stop = min(start + block, n_times)
+            data = self.temp_edf.get_data(picks=ch_labels, start=start, stop=stop)
+            np.multiply(data, 1e6, out=signals[:, start:stop], casting='same_kind')
+
+        return signals
+
     def load_model(self):
         """Load the Keras model once."""
         logger.info("Loading model...")
         self.model = load_model(f'{Path}Model/CHB_MIT_sz_detec_demo.h5')
         logger.info("Model loaded successfully")
 
-    def process_segments(self):
-        """Process all segments and run predictions."""
+    def start_processing(self, batch_size=INFERENCE_BATCH_SIZE):
+        """Run process_segments in a background thread."""
+        def run():
+            try:
+                self.process_segments(batch_size)
+            except Exception as e:
+                logger.exception("Segment processing failed")
+                self.processing_error = str(e)
+            finally:
+                self.processing_done.set()
+
+        threading.Thread(target=run, name='eeg-inference', daemon=True).start()
+
+    def progress(self):
+        """Return how many segments have been predicted so far."""
+        return {
+            'processed': len(self.segment_predictions),
+            'total': self.n_segments,
+            'done': self.processing_done.is_set(),
+            'error': self.processing_error
+        }
+
+    def process_segments(self, batch_size=INFERENCE_BATCH_SIZE):
+        """Process all segments and run predictions, one batch at a time."""
         logger.info(f"Processing {self.n_segments} segments...")
 
-        for seg_idx in range(self.n_segments):
-            start_idx = seg_idx * SEGMENT_SIZE
-            end_idx = start_idx + SEGMENT_SIZE
-
-            # Extract segment
-            segment_data = self.temp_signals[:, start_idx:end_idx]
+        for batch_start in range(0, self.n_segments, batch_size):
+            batch_ids = range(batch_start, min(batch_start + batch_size, self.n_segments))
 
             # Prepare for CNN (with downsampling for model)
-            segment_downsampled = segment_data[:, ::DOWNSAMPLING_FACTOR]
-            segment_cnn = segment_downsampled[:, :, np.newaxis]
+            batch_cnn = np.stack([
+                self.temp_signals[:, i * SEGMENT_SIZE:(i + 1) * SEGMENT_SIZE:DOWNSAMPLING_FACTOR]
+                for i in batch_ids
+            ])[:, :, :, np.newaxis]
 
             # Run prediction
-            pred = self.model.predict(segment_cnn[np.newaxis, :, :, :], verbose=0)[0][0]
-
-            # Store segment info
-            self.segments.append({
-                'index': seg_idx,
-                'start_sample': start_idx,
-                'end_sample': end_idx,
-                'start_time': start_idx / self.original_sfreq,
-                'end_time': end_idx / self.original_sfreq,
-                'data': segment_data
-            })
-
-            self.segment_predictions.append({
-                'segment': seg_idx,
-                'prediction': pred,
-                'is_seizure': pred > 0.5
-            })
-
-            if pred > 0.5:
-                logger.info(f"Seizure detected in segment {seg_idx} (prob: {pred:.3f})")
-            else:
-                logger.info(f"Segment {seg_idx} is Normal (prob: {pred:.3f})")
\ No newline at end of file
+            preds = self.model.predict(batch_cnn, verbose=0)[:, 0]
+
+            segments = []
+            predictions = []
+            for seg_idx, pred in zip(batch_ids, preds):
+                start_idx = seg_idx * SEGMENT_SIZE
+                end_idx = start_idx + SEGMENT_SIZE
+
+                # Store segment info
+                segments.append({
+                    'index': seg_idx,
+                    'start_sample': start_idx,
+                    'end_sample': end_idx,
+                    'start_time': start_idx / self.original_sfreq,
+                    'end_time': end_idx / self.original_sfreq,
+                    'data': self.temp_signals[:, start_idx:end_idx]
+                })
+
+                predictions.append({
+                    'segment': seg_idx,
+                    'prediction': pred,
+                    'is_seizure': pred > 0.5
+                })
+
+                if pred > 0.5:
+                    logger.info(f"Seizure detected in segment {seg_idx} (prob: {pred:.3f})")
+                else:
+                    logger.info(f"Segment {seg_idx} is Normal (prob: {pred:.3f})")
+
+            # Segments first, so readers never see a prediction without its segment
+            self.segments.extend(segments)
+            self.segment_predictions.extend(predictions)
+
+        self.processing_done.set()
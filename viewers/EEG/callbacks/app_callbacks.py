@@ -2,7 +2,8 @@ import dash
 import os
 
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
-from dash import html
+from dash import html, Patch
+from flask import jsonify
 from dash.dependencies import Input, Output, State
 import base64
 import tempfile
@@ -13,16 +14,62 @@ from viewers.EEG.visualize_utils import *
 from viewers.EEG.layout.app_layout import *
 
 
+data_manager = None
+plot_generator = None
+
+
+def segment_options(dm):
+    """Dropdown options for the segments predicted so far."""
+    return [
+        {
+            'label': f"Segment {i} ({s['start_time']:.1f}-{s['end_time']:.1f}s) - {'SEIZURE' if p['is_seizure'] else 'Normal'}",
+            'value': i
+        }
+        for i, (s, p) in enumerate(zip(dm.segments, dm.segment_predictions))
+    ]
+
+
+def status_message(dm, progress):
+    """Upload status, updated as segment predictions come in."""
+    signal_duration = dm.total_samples / dm.original_sfreq
+    seizure_count = sum(1 for p in dm.segment_predictions[:progress['processed']] if p['is_seizure'])
+
+    if progress['error']:
+        state = html.P(f"❌ Seizure detection failed: {progress['error']}", style={'color': '#e74c3c'})
+    elif progress['done']:
+        state = html.P(f"✅ EDF file processed: {os.path.basename(dm.edf_file)}", style={'color': '#27ae60'})
+    else:
+        state = html.P(f"⏳ Running seizure detection: {progress['processed']}/{progress['total']} segments",
+                       style={'color': '#f39c12'})
+
+    return html.Div([
+        state,
+        html.P(f"📊 Total segments: {dm.n_segments}", style={'color': '#3498db'}),
+        html.P(f"⏱️ Signal duration: {signal_duration:.1f} seconds", style={'color': '#3498db'}),
+        html.P(f"⚠️ Seizures detected: {seizure_count}/{progress['processed']}",
+               style={'color': '#e74c3c' if seizure_count > 0 else '#27ae60'})
+    ])
+
+
 # -----------------------
 # Callbacks
 # -----------------------
 def app_callbacks(app):
+    @app.server.route('/eeg/progress')
+    def inference_progress():
+        """Segment inference progress of the loaded recording, as JSON."""
+        if data_manager is None:
+            return jsonify({'processed': 0, 'total': 0, 'done': False, 'error': None})
+        return jsonify(data_manager.progress())
+
     @app.callback(
         [Output('output-message', 'children'),
          Output('data-loaded', 'data'),
          Output('signal-duration', 'data'),
          Output('segment-dropdown', 'options'),
-         Output('segment-dropdown', 'value')],
+         Output('segment-dropdown', 'value'),
+         Output('inference-progress-interval', 'disabled'),
+         Output('inference-progress', 'data')],
         [Input('upload-data', 'contents'),
          Input('upload-data', 'filename')]
     )
@@ -30,7 +77,7 @@ def app_callbacks(app):
         global data_manager, plot_generator
 
         if contents is None:
-            return html.Div("No files uploaded yet.", style={'color': '#7f8c8d'}), False, 0, [], None
+            return html.Div("No files uploaded yet.", style={'color': '#7f8c8d'}), False, 0, [], None, True, 0
 
         _, content_string = contents.split(',')
         decoded = base64.b64decode(content_string)
@@ -52,45 +99,68 @@ def app_callbacks(app):
 
                 if edf_file is None:
                     return html.Div("No EDF file found in the archive.",
-                                    style={'color': '#e74c3c'}), False, [], [], None
+                                    style={'color': '#e74c3c'}), False, [], [], None, True, 0
 
-                # Initialize global instances
-                data_manager = DataManager(edf_file)
+                # Initialize global instances; segments are predicted in the background
+                data_manager = DataManager(edf_file, background=True)
                 plot_generator = PlotGenerator(data_manager)
 
+                # Histogram every channel pair in the background so the CRP view is instant
+                plot_generator.crp_cache.start_precompute()
+
                 # Calculate signal duration
                 signal_duration = data_manager.total_samples / data_manager.original_sfreq
 
-                # Create segment dropdown options
-                segment_options = [
-                    {
-                        'label': f"Segment {i} ({s['start_time']:.1f}-{s['end_time']:.1f}s) - {'SEIZURE' if data_manager.segment_predictions[i]['is_seizure'] else 'Normal'}",
-                        'value': i
-                    }
-                    for i, s in enumerate(data_manager.segments)
-                ]
-
-                # Count seizures
-                seizure_count = sum(1 for p in data_manager.segment_predictions if p['is_seizure'])
-
-                return html.Div([
-                    html.P(f"✅ EDF file processed: {os.path.basename(edf_file)}", style={'color': '#27ae60'}),
-                    html.P(f"📊 Total segments: {data_manager.n_segments}", style={'color': '#3498db'}),
-                    html.P(f"⏱️ Signal duration: {signal_duration:.1f} seconds", style={'color': '#3498db'}),
-                    html.P(f"⚠️ Seizures detected: {seizure_count}/{data_manager.n_segments}",
-                           style={'color': '#e74c3c' if seizure_count > 0 else '#27ae60'})
-                ]), True, signal_duration, segment_options, 0
+                return (status_message(data_manager, data_manager.progress()), True, signal_duration,
+                        segment_options(data_manager), None, False, 0)
 
     @app.callback(
-        Output("summary-plot", "figure"),
-        Input("data-loaded", "data")
+        [Output("summary-plot", "figure"),
+         Output('segment-dropdown', 'options', allow_duplicate=True),
+         Output('segment-dropdown', 'value', allow_duplicate=True),
+         Output('output-message', 'children', allow_duplicate=True),
+         Output('inference-progress-interval', 'disabled', allow_duplicate=True),
+         Output('inference-progress', 'data', allow_duplicate=True)],
+        [Input('inference-progress-interval', 'n_intervals'),
+         Input("data-loaded", "data")],
+        [State('inference-progress', 'data'),
+         State('segment-dropdown', 'value')],
+        prevent_initial_call=True
     )
-    def update_summary(data_loaded):
+    def update_summary(n_intervals, data_loaded, shown, segment_idx):
         global plot_generator
 
-        if data_loaded and plot_generator:
-            return plot_generator.create_summary_plot()
-        return {}
+        if not (data_loaded and plot_generator):
+            return {}, [], None, dash.no_update, True, 0
+
+        # Only redraw when a new batch of predictions has landed
+        progress = data_manager.progress()
+        if progress['processed'] == shown and not progress['done']:
+            raise PreventUpdate
+
+        if segment_idx is None and progress['processed'] > 0:
+            segment_idx = 0
+
+        return (plot_generator.create_summary_plot(),
+                segment_options(data_manager),
+                segment_idx,
+                status_message(data_manager, progress),
+                progress['done'],
+                progress['processed'])
+
+    @app.callback(
+        [Output('window-length', 'max'),
+         Output('window-length', 'marks')],
+        Input('signal-duration', 'data')
+    )
+    def update_window_length_range(duration):
+        # The envelope pyramid keeps any window cheap, so allow the whole recording
+        if not duration:
+            raise PreventUpdate
+
+        max_length = max(1, int(np.ceil(duration)))
+        marks = {int(v): f'{int(v)}x' for v in np.linspace(1, max_length, 5)}
+        return max_length, marks
 
     @app.callback(
         [Output('interval-component', 'disabled'),
@@ -140,18 +210,34 @@ def app_callbacks(app):
         return new_start
 
     @app.callback(
-        Output("continuous-viewer", "figure"),
+        [Output("continuous-viewer", "figure"),
+         Output("continuous-viewer-state", "data")],
         [Input("continuous-channel", "value"),
          Input("window-start", "value"),
          Input("window-length", "value"),
-         Input("data-loaded", "data")]
+         Input("data-loaded", "data")],
+        State("continuous-viewer-state", "data")
     )
-    def update_continuous_viewer(channel_idx, window_start, window_length, data_loaded):
+    def update_continuous_viewer(channel_idx, window_start, window_length, data_loaded, drawn):
         global plot_generator
 
-        if data_loaded and plot_generator:
-            return plot_generator.create_continuous_viewer(channel_idx, window_start, window_length)
-        return {}
+        if not (data_loaded and plot_generator):
+            return {}, None
+
+        # Playback only moves the window: patch the traces of the figure already
+        # drawn for this channel and window length instead of rebuilding it
+        view = {'loaded': data_loaded, 'channel': channel_idx, 'window_length': window_length}
+        if dash.ctx.triggered_id == "window-start" and drawn == view:
+            window = plot_generator.continuous_window(channel_idx, window_start, window_length)
+            patched = Patch()
+            patched['data'][0]['x'] = window['time']
+            patched['data'][0]['y'] = window['signal']
+            patched['data'][1]['r'] = window['signal']
+            patched['data'][1]['theta'] = window['theta']
+            patched['layout']['xaxis']['range'] = window['range']
+            return patched, dash.no_update
+
+        return plot_generator.create_continuous_viewer(channel_idx, window_start, window_length), view
 
     @app.callback(
         Output("segment-plots", "figure"),
@@ -170,8 +256,8 @@ def app_callbacks(app):
         Output("crp-plot", "figure"),
         [Input("channel-1-dropdown", "value"),
          Input("channel-2-dropdown", "value"),
-         Input("data-loaded", "data"),
-         Input("ecg-colormap-select", "value")]
+         Input("data-loaded", "data")],
+        State("ecg-colormap-select", "value")
     )
     def update_crp(ch1_idx, ch2_idx, data_loaded,color):
         global plot_generator
@@ -179,6 +265,26 @@ def app_callbacks(app):
         if data_loaded and plot_generator:
             return plot_generator.create_crp_plot(ch1_idx, ch2_idx,color)
         return {}
+
+    # Colormap changes only restyle the heatmap, so keep them in the browser
+    app.clientside_callback(
+        """
+        function(colormap, figure) {
+            if (!colormap || !figure || !figure.data || !figure.data.length) {
+                return window.dash_clientside.no_update;
+            }
+            var updated = Object.assign({}, figure);
+            updated.data = figure.data.map(function(trace) {
+                return Object.assign({}, trace, {colorscale: colormap});
+            });
+            return updated;
+        }
+        """,
+        Output("crp-plot", "figure", allow_duplicate=True),
+        Input("ecg-colormap-select", "value"),
+        State("crp-plot", "figure"),
+        prevent_initial_call=True
+    )
     
     @app.callback(
     Output("xor-graph", "figure"),
@@ -99,8 +99,9 @@ def app_layout():
             children=html.Div(id='output-message', style=custom_styles['output']),
         ),
 
-        # Summary plot
+        # Summary plot, filled in while segments are predicted
         dcc.Graph(id="summary-plot"),
+        dcc.Interval(id='inference-progress-interval', interval=1000, disabled=True),
 
         # Continuous Viewer Section
         html.Div([
@@ -290,5 +291,7 @@ def app_layout():
         dcc.Store(id="data-loaded", data=False),
         dcc.Store(id="playback-state", data={'playing': False, 'current_time': 0}),
         dcc.Store(id="signal-duration", data=0),
+        dcc.Store(id="continuous-viewer-state", data=None),  # what the drawn figure shows
+        dcc.Store(id="inference-progress", data=0),
 
     ], style=custom_styles['container'])
\ No newline at end of file
@@ -0,0 +1,226 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+# -----------------------
+# Constants
+# -----------------------
+CRP_BIN_UV = 100  # amplitude bin width in μV (same grid as rounding to hundreds)
+CRP_CACHE_SIZE = 32  # channel pairs kept per recording
+CRP_CHUNK_SAMPLES = 2 ** 18  # samples per background task (~17 min at 256 Hz)
+
+
+def quantize(signal, bin_size=CRP_BIN_UV, dtype=np.int64):
+    """Map amplitudes to integer bin numbers (bin k is centred on k * bin_size)."""
+    return np.rint(np.asarray(signal) / bin_size).astype(dtype)
+
+
+def code_dtype(lows, highs):
+    """Smallest signed integer type holding every bin number in [lows, highs]"""
+    for dtype in (np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= np.min(lows) and np.max(highs) <= info.max:
+            return dtype
+    return np.int64
+
+
+def recurrence_histogram(q1, q2):
+    """
+    Joint histogram of two quantized signals in O(N) with np.bincount
+
+    Args:
+        q1 (np.ndarray): Bin numbers of the first channel
+        q2 (np.ndarray): Bin numbers of the second channel
+
+    Returns:
+        tuple: (offsets, counts) - the bin numbers of counts[0, 0] for each
+            channel and the (n_bins_1, n_bins_2) count matrix
+    """
+    lo1, lo2 = int(q1.min()), int(q2.min())
+    n1, n2 = int(q1.max()) - lo1 + 1, int(q2.max()) - lo2 + 1
+
+    flat = (q1 - lo1) * n2 + (q2 - lo2)
+    counts = np.bincount(flat, minlength=n1 * n2).reshape(n1, n2)
+    return (lo1, lo2), counts
+
+
+def _chunk_histograms(q_chunk, lows, sizes, pairs):
+    """Process pool task: sparse joint histograms of every pair over one time chunk"""
+    results = []
+    for i, j in pairs:
+        flat = (q_chunk[i].astype(np.int64) - lows[i]) * sizes[j] + (q_chunk[j].astype(np.int64) - lows[j])
+        counts = np.bincount(flat, minlength=sizes[i] * sizes[j])
+        idx = np.flatnonzero(counts)
+        results.append((idx, counts[idx].astype(np.uint32)))
+    return results
+
+
+def all_pair_histograms(signals, bin_size=CRP_BIN_UV, max_workers=None, chunk_samples=CRP_CHUNK_SAMPLES):
+    """
+    Joint histograms of every channel pair i < j in one pass over the recording
+
+    The recording is split into time chunks that are quantized one at a time
+    to the smallest integer type that fits, so the bin codes never exist for
+    the whole recording at once. Each worker histograms all pairs of its chunk
+    and the partial counts are summed. Workers are spawned rather than forked,
+    since the parent may hold TensorFlow and other threaded state.
+
+    Returns:
+        tuple: (lows, histograms) - the bin number of row/column 0 per channel
+            and a {(i, j): scipy.sparse.csr_matrix (uint32)} dict
+    """
+    n_channels, n_samples = signals.shape
+    # Rounding is monotonic, so the extreme bins are those of the extreme samples
+    lows = quantize(np.min(signals, axis=1), bin_size)
+    highs = quantize(np.max(signals, axis=1), bin_size)
+    sizes = highs - lows + 1
+    dtype = code_dtype(lows, highs)
+    pairs = list(itertools.combinations(range(n_channels), 2))
+
+    # Bound the chunks waiting in the pool's queue, each holds its codes
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = 2 * max_workers
+
+    parts = {pair: ([], []) for pair in pairs}
+
+    def collect(done):
+        for future in done:
+            for pair, (idx, counts) in zip(pairs, future.result()):
+                parts[pair][0].append(idx)
+                parts[pair][1].append(counts)
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        pending = set()
+        for start in range(0, n_samples, chunk_samples):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            q_chunk = quantize(signals[:, start:start + chunk_samples], bin_size, dtype)
+            pending.add(executor.submit(_chunk_histograms, q_chunk, lows, sizes, pairs))
+        collect(wait(pending).done)
+
+    histograms = {}
+    for (i, j), (idx, counts) in parts.items():
+        idx = np.concatenate(idx)
+        # Duplicate (row, col) entries from different chunks are summed by tocsr()
+        histograms[(i, j)] = sparse.coo_matrix(
+            (np.concatenate(counts), (idx // sizes[j], idx % sizes[j])),
+            shape=(sizes[i], sizes[j]), dtype=np.uint32
+        ).tocsr()
+    return lows, histograms
+
+
+def similarity_matrix(histograms, n_channels):
+    """
+    Normalized mutual information of every channel pair
+
+    Args:
+        histograms (dict): {(i, j): count matrix} for all pairs i < j
+        n_channels (int): Number of channels
+
+    Returns:
+        np.ndarray: Symmetric (n_channels, n_channels) matrix in [0, 1], 1 on the diagonal
+    """
+    def entropy(p):
+        p = p[p > 0]
+        return -np.sum(p * np.log(p))
+
+    similarity = np.eye(n_channels)
+    for (i, j), counts in histograms.items():
+        counts = sparse.csr_matrix(counts)
+        total = counts.sum()
+        p_i = np.asarray(counts.sum(axis=1)).ravel() / total
+        p_j = np.asarray(counts.sum(axis=0)).ravel() / total
+        h_i, h_j = entropy(p_i), entropy(p_j)
+
+        # MI = H(i) + H(j) - H(i, j)
+        mutual_info = h_i + h_j - entropy(counts.data / total)
+        norm = np.sqrt(h_i * h_j)
+        similarity[i, j] = similarity[j, i] = mutual_info / norm if norm > 0 else 0.0
+    return similarity
+
+
+class RecurrenceCache:
+    """Cross-recurrence histograms of one recording, cached per channel pair"""
+
+    def __init__(self, signals, bin_size=CRP_BIN_UV, max_pairs=CRP_CACHE_SIZE):
+        self.signals = signals
+        self.bin_size = bin_size
+        self.max_pairs = max_pairs
+        self._pairs = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Filled by the background all-pairs job
+        self._lows = None
+        self._all_pairs = {}
+        self.similarity = None
+        self.ready = threading.Event()
+
+    def start_precompute(self, max_workers=None):
+        """Compute every channel pair in a background thread"""
+        def run():
+            try:
+                lows, histograms = all_pair_histograms(self.signals, self.bin_size, max_workers)
+                similarity = similarity_matrix(histograms, self.signals.shape[0])
+                with self._lock:
+                    self._lows, self._all_pairs = lows, histograms
+                    self.similarity = similarity
+                logger.info(f"Cross-recurrence histograms ready for {len(histograms)} channel pairs")
+            except Exception:
+                logger.exception("Cross-recurrence precomputation failed")
+            finally:
+                self.ready.set()
+
+        threading.Thread(target=run, name='crp-precompute', daemon=True).start()
+
+    def get(self, ch1_idx, ch2_idx):
+        """
+        Return the histogram of a channel pair
+
+        Returns:
+            tuple: (x_centers, y_centers, counts) - bin centres in μV of ch1 and
+                ch2 and the (len(x_centers), len(y_centers)) count matrix
+        """
+        with self._lock:
+            key = (ch1_idx, ch2_idx)
+            if key in self._pairs:
+                self._pairs.move_to_end(key)
+                return self._pairs[key]
+
+            swapped = self._pairs.get((ch2_idx, ch1_idx))
+            if self._all_pairs and ch1_idx != ch2_idx:
+                # Precomputed by the background job
+                i, j = sorted((ch1_idx, ch2_idx))
+                counts = self._all_pairs[(i, j)].toarray()
+                if ch1_idx > ch2_idx:
+                    counts = counts.T
+                x_centers = (self._lows[ch1_idx] + np.arange(counts.shape[0])) * self.bin_size
+                y_centers = (self._lows[ch2_idx] + np.arange(counts.shape[1])) * self.bin_size
+                result = (x_centers, y_centers, counts)
+            elif swapped is not None:
+                # The swapped pair is the same histogram transposed
+                x_centers, y_centers, counts = swapped
+                result = (y_centers, x_centers, counts.T)
+            else:
+                (lo1, lo2), counts = recurrence_histogram(
+                    quantize(self.signals[ch1_idx], self.bin_size),
+                    quantize(self.signals[ch2_idx], self.bin_size)
+                )
+                x_centers = (lo1 + np.arange(counts.shape[0])) * self.bin_size
+                y_centers = (lo2 + np.arange(counts.shape[1])) * self.bin_size
+                result = (x_centers, y_centers, counts)
+
+            self._pairs[key] = result
+            while len(self._pairs) > self.max_pairs:
+                self._pairs.popitem(last=False)
+            return result
+
@@ -1,6 +1,7 @@
 import os
 import numpy as np
 import logging
+from functools import lru_cache
 
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 
@@ -8,6 +9,9 @@ import yaml
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 
+from viewers.EEG.recurrence import RecurrenceCache
+from viewers.common.xor_engine import xor_chunks, xor_trace
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,6 +30,15 @@ DOWNSAMPLING_FACTOR = config['DOWNSAMPLING_FACTOR']
 SFREQ = config['SFREQ']
 CH_LABELS = config['CH_LABELS']
 SEGMENT_SIZE = config['SEGMENT_SIZE']
+VIEWER_BINS = 800  # ~ width of one continuous viewer subplot in pixels
+
+
+@lru_cache(maxsize=32)
+def polar_theta(n_points):
+    """Evenly spaced polar angles for a trace of n_points, shared between calls."""
+    theta = np.linspace(0, 360, n_points)
+    theta.flags.writeable = False
+    return theta
 
 
 # -----------------------
@@ -36,9 +49,15 @@ class PlotGenerator:
 
     def __init__(self, data_manager):
         self.dm = data_manager
+        self.crp_cache = RecurrenceCache(data_manager.temp_signals)
 
-    def create_continuous_viewer(self, channel_idx, window_start, window_length):
-        """Create continuous-time signal viewer with viewport control."""
+    def continuous_window(self, channel_idx, window_start, window_length):
+        """
+        Trace data of the continuous viewer for one window
+
+        Returns:
+            dict: 'time', 'signal' and 'theta' arrays plus the x-axis 'range'
+        """
 
         # Calculate sample indices
         start_sample = int(window_start * self.dm.original_sfreq)
@@ -51,10 +70,21 @@ class PlotGenerator:
         if start_sample < 0:
             start_sample = 0
 
-        # Get signal for selected channel
-        signal = self.dm.temp_signals[channel_idx, start_sample:end_sample]
-        time_axis = self.dm.time_axis[start_sample:end_sample]
-        theta = np.linspace(0, 360, len(signal))
+        # Get a min/max envelope of the selected channel sized to the plot width
+        indices, signal = self.dm.pyramid.envelope(channel_idx, start_sample, end_sample, VIEWER_BINS)
+
+        return {
+            'time': indices / self.dm.original_sfreq,
+            'signal': signal,
+            'theta': polar_theta(len(signal)),
+            'range': [start_sample / self.dm.original_sfreq,
+                      (end_sample - 1) / self.dm.original_sfreq]
+        }
+
+    def create_continuous_viewer(self, channel_idx, window_start, window_length):
+        """Create continuous-time signal viewer with viewport control."""
+
+        window = self.continuous_window(channel_idx, window_start, window_length)
         
         fig = make_subplots(
             rows=1, cols=2,
@@ -66,9 +96,9 @@ class PlotGenerator:
         )
         
         # Amplitude-Time
-        fig.add_trace(go.Scatter(
-            x=time_axis,
-            y=signal,
+        fig.add_trace(go.Scattergl(
+            x=window['time'],
+            y=window['signal'],
             mode='lines',
             name=f'{CH_LABELS[channel_idx]}',
             line=dict(color='blue', width=1)
@@ -78,9 +108,9 @@ class PlotGenerator:
         
         # Polar plot
         fig.add_trace(
-            go.Scatterpolar(
-                r=signal,
-                theta=theta,
+            go.Scatterpolargl(
+                r=window['signal'],
+                theta=window['theta'],
                 mode="lines",
                 name=f"Polar {CH_LABELS[channel_idx]}",
                 line=dict(width=1, color='green')
@@ -98,7 +128,7 @@ class PlotGenerator:
         # Update x-axis label for amplitude plot
         fig.update_xaxes(title_text="Time (s)", row=1, col=1)
         fig.update_yaxes(title_text="Amplitude (μV)", row=1, col=1)
-        fig.update_xaxes(dict(range=[time_axis[0], time_axis[-1]]))
+        fig.update_xaxes(dict(range=window['range']))
         return fig
 
     def create_segment_plots(self, segment_idx, channel_idx):
@@ -172,33 +202,26 @@ class PlotGenerator:
     def create_crp_plot(self, ch1_idx, ch2_idx,color):
         """Cross recurrence matrix for the entire signal."""
 
-        signals = self.dm.temp_signals
-        amps = np.round(np.column_stack(
-            (signals[ch1_idx, :], signals[ch2_idx, :])
-        ), -2)
+        x_centers, y_centers, counts = self.crp_cache.get(ch1_idx, ch2_idx)
 
-        unique_points, counts = np.unique(amps, axis=0, return_counts=True)
+        # Empty cells stay transparent, as with the old point cloud
+        z = np.where(counts > 0, counts, np.nan).T
 
         fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=unique_points[:, 0],
-            y=unique_points[:, 1],
-            mode="markers",
-            marker=dict(
-                size=5,
-                color=counts,
-                colorscale=color,
-                showscale=True,
-                colorbar=dict(title="Count")
-            ),
-            text=counts,
-            hovertemplate='%{text}<extra></extra>'
+        fig.add_trace(go.Heatmap(
+            x=x_centers,
+            y=y_centers,
+            z=z,
+            colorscale=color,
+            showscale=True,
+            colorbar=dict(title="Count"),
+            hovertemplate='%{z}<extra></extra>'
         ))
 
         fig.update_layout(
             title=f"Cross Recurrence Plot: {CH_LABELS[ch1_idx]} vs {CH_LABELS[ch2_idx]} (Entire Signal)",
-            xaxis_title=f"{CH_LABELS[ch2_idx]} Amplitude (μV)",
-            yaxis_title=f"{CH_LABELS[ch1_idx]} Amplitude (μV)",
+            xaxis_title=f"{CH_LABELS[ch1_idx]} Amplitude (μV)",
+            yaxis_title=f"{CH_LABELS[ch2_idx]} Amplitude (μV)",
             width=700, height=700,
             template="plotly_white"
         )
@@ -238,47 +261,24 @@ class PlotGenerator:
         return fig
     
     def create_xor_graph(self, channel_idx, chunk_width,Time,threshold):
-        """Create XOR graph with overlapping chunks."""
+        """Create XOR graph of every pair of consecutive chunks."""
         
         chunk_samples = int(chunk_width * self.dm.original_sfreq)
         Window_size = int(Time * self.dm.original_sfreq)
         n_sample = self.dm.temp_signals[channel_idx,:Window_size]
-        n_chunks = n_sample.shape[0] // chunk_samples
-        
-        fig = go.Figure()
         
-        # Initialize with first chunk
-        accumulated = n_sample[:chunk_samples]
-        time_axis = np.linspace(0, Time)
+        # All consecutive chunk differences in one pass, drawn as one WebGL trace
+        n_chunks, pair, sample, value = xor_chunks(n_sample, chunk_samples, threshold)
         
-        # XOR with subsequent chunks
-        for i in range(0, min(n_chunks, 5)):  # Limit to 5 chunks for visibility
-            start_idx = i * chunk_samples
-            end_idx = start_idx + chunk_samples
-            
-            if end_idx > n_sample.shape[0]:
-                break
-            
-            chunk = n_sample[start_idx:end_idx]
-            
-            # Simple XOR-like operation: difference between chunks
-            xor_result = np.abs(chunk - accumulated)
-            accumulated = chunk.copy()
-            
-            threshold = threshold
-            xor_result = xor_result[xor_result >= threshold]
-            
-            fig.add_trace(go.Scatter(
-                x=time_axis,
-                y=xor_result,
-                mode='markers',
-                name=f'XOR Chunk {i}',
-                marker=dict(size=4, opacity=0.7),
-                showlegend=True
-            ))
+        fig = go.Figure()
+        if len(value) > 0:
+            fig.add_trace(xor_trace(pair, sample, value, self.dm.original_sfreq))
+        elif n_chunks < 2:
+            fig.add_annotation(text="Need at least 2 chunks for XOR comparison",
+                               xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False)
         
         fig.update_layout(
-            title=f"XOR Graph - Channel: {CH_LABELS[channel_idx]} (Chunk width: {chunk_width}s)",
+            title=f"XOR Graph - Channel: {CH_LABELS[channel_idx]} (Chunk width: {chunk_width}s, {n_chunks} chunks)",
             xaxis_title="Time within chunk (s)",
             yaxis_title="XOR Amplitude (μV)",
             height=500,
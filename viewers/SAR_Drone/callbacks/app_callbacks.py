@@ -5,31 +5,59 @@ import os
 import librosa
 import librosa.display
 import plotly.graph_objs as go
-from dash import Input, Output, State,html
+import dash_bootstrap_components as dbc
+from dash import Input, Output, State, Patch, html
+from dash.exceptions import PreventUpdate
 
-from viewers.SAR_Drone.models.earthquake_predictor import predict_damage
-from viewers.SAR_Drone.models.audio_classifier import classify_audio
+from viewers.common.audio_store import audio_store
+from viewers.common.background import background_manager
+from viewers.common.inference_pool import inference_pool
+from viewers.SAR_Drone.models.earthquake_predictor import get_model, predict_damage
+from viewers.SAR_Drone.models.audio_classifier import bird_segments
+from viewers.SAR_Drone.models.classifier_engine import get_default_engine
 from viewers.SAR_Drone.models.sar_analyzer import analyze_sar_file
+from viewers.SAR_Drone.waveform import (
+    WAVEFORM_SAMPLE_RATE,
+    waveform_store,
+    waveform_trace_data,
+    create_waveform_figure,
+    visible_range
+)
 
 
 def register_SAR_drone_callback(app):
 
+    # The damage model stays loaded in the inference pool between uploads
+    inference_pool.register('sar-damage', predict_damage, warmup=get_model)
+
+    # Runs as a background job so the model never holds a web worker
     @app.callback(
         Output('sar-result', 'children'),
         Input('upload-sar', 'contents'),
-        State('upload-sar', 'filename')
+        State('upload-sar', 'filename'),
+        background=True,
+        manager=background_manager,
+        progress=Output('sar-status', 'children'),
+        running=[
+            (Output('upload-sar', 'disabled'), True, False),
+            (Output('sar-cancel', 'style'), {'display': 'inline-block'}, {'display': 'none'})
+        ],
+        cancel=[Input('sar-cancel', 'n_clicks')],
+        prevent_initial_call=True
     )
-    def classify_sar(contents, filename):
+    def classify_sar(set_progress, contents, filename):
         if contents is None:
             return html.Div("No file uploaded", className="text-muted")
         try:
             _, content_string = contents.split(',')
             decoded = base64.b64decode(content_string)
             sar_data = np.load(io.BytesIO(decoded))
-            result = predict_damage(sar_data)
+            result = inference_pool.run('sar-damage', sar_data, set_progress=set_progress)
             return dbc.Alert(f"Result: {result}", color="info")
         except Exception as e:
             return dbc.Alert(f"❌ Error: {e}", color="danger")
+        finally:
+            set_progress("")
     
     
     @app.callback(
@@ -66,28 +94,25 @@ def register_SAR_drone_callback(app):
                 f.write(decoded)
     
             #classification
-            result = classify_audio(temp_path)
+            classification = get_default_engine().classify(temp_path)
+            result = classification['label']
     
-            y, sr = librosa.load(temp_path, sr=22050, mono=True)
+            y, sr = librosa.load(temp_path, sr=WAVEFORM_SAMPLE_RATE, mono=True)
             duration = librosa.get_duration(y=y, sr=sr)
-            time_array = np.linspace(0, duration, num=len(y))
-    
-            #build a waveform
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=time_array,
-                y=y,
-                mode='lines',
-                name='Amplitude',
-                line=dict(color='blue', width=1)
-            ))
-            fig.update_xaxes(title_text='Time (s)', range=[0, duration])
-            fig.update_yaxes(title_text='Amplitude', range=[-1.05, 1.05])
+
+            #build a decimated waveform, finer detail is fetched on zoom
+            waveform_key = waveform_store.put(y)
+            fig = create_waveform_figure(y, sr, duration, uirevision=waveform_key)
+
+            # shade the segments YAMNet attributes to birds
+            frames = classification['bird_frames']
+            for start, end in bird_segments(frames['times'], frames['probs']):
+                fig.add_vrect(x0=start, x1=min(end, duration), fillcolor='green',
+                              opacity=0.2, line_width=0, layer='below')
     
             # build the audio player
-            b64_audio = base64.b64encode(open(temp_path, "rb").read()).decode()
-            mime = "audio/wav" if filename.lower().endswith(".wav") else "audio/mpeg"
-            audio_src = f"data:{mime};base64,{b64_audio}"
+            extension = ".wav" if filename.lower().endswith(".wav") else ".mp3"
+            audio_src = audio_store.put(decoded, extension)
             audio_player = html.Audio(
                 src=audio_src,
                 controls=True,
@@ -101,8 +126,7 @@ def register_SAR_drone_callback(app):
                 dbc.Alert(f"Classification Result: {result}", color="success"),
                 [audio_player],
                 fig,
-                None
-                # {'duration': duration} # Store duration for the synchronization cursor
+                {'key': waveform_key, 'sr': sr, 'duration': duration}
             )
     
         except Exception as e:
@@ -120,6 +144,35 @@ def register_SAR_drone_callback(app):
             )
     
     
+    @app.callback(
+        Output('spectrogram-graph', 'figure', allow_duplicate=True),
+        Input('spectrogram-graph', 'relayoutData'),
+        State('spectrogram-data', 'data'),
+        prevent_initial_call=True
+    )
+    def zoom_waveform(relayout_data, waveform_info):
+        """Re-decimate the waveform for the visible range after a zoom or pan."""
+        x_range = visible_range(relayout_data)
+        if x_range is False or not waveform_info:
+            raise PreventUpdate
+
+        y = waveform_store.get(waveform_info['key'])
+        if y is None:
+            raise PreventUpdate
+
+        # An autorange reset comes back as (None, None): restore the whole clip
+        t0, t1 = x_range
+        t, values = waveform_trace_data(y, waveform_info['sr'], t0, t1)
+        patched = Patch()
+        patched['data'][0]['x'] = t
+        patched['data'][0]['y'] = values
+        if t0 is None:
+            patched['layout']['xaxis']['range'] = [0, waveform_info['duration']]
+        else:
+            patched['layout']['xaxis']['range'] = [t0, t1]
+        return patched
+    
+    
     @app.callback(
         [Output('vv-status', 'children'),
          Output('vv-store', 'data'),
@@ -44,7 +44,11 @@ def SAR_app_layout():
                         },
                         accept='.npy'
                     ),
-                    html.Div(id='sar-result', className="mt-3")
+                    html.Div(id='sar-status', className="mt-2 text-muted small"),
+                    dbc.Button("✖ Cancel", id='sar-cancel', color="secondary", outline=True,
+                               size="sm", className="mt-2", style={'display': 'none'}),
+                    html.Div(html.Div("No file uploaded", className="text-muted"),
+                             id='sar-result', className="mt-3")
                 ])
             ], className="shadow-sm")
         ], md=4),
@@ -1,26 +1,12 @@
-import tensorflow as tf
-import tensorflow_hub as hub
+import threading
 import librosa
 import numpy as np
-import pandas as pd
 import torch
-from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
 
-#load drone model
-extractor = AutoFeatureExtractor.from_pretrained("preszzz/drone-audio-detection-05-17-trial-0")
-drone_model = AutoModelForAudioClassification.from_pretrained("preszzz/drone-audio-detection-05-17-trial-0")
+from viewers.SAR_Drone.models.model_registry import get_drone_model, get_bird_model, get_class_map
 
-
-#load YAMNet(bird) model
-bird_model = hub.load("https://tfhub.dev/google/yamnet/1")
-
-#load class labels
-class_map_path = tf.keras.utils.get_file(
-    "yamnet_class_map.csv",
-    "https://raw.githubusercontent.com/tensorflow/models/master/research/audioset/yamnet/yamnet_class_map.csv"
-)
-#convert it to a panadas dataframe
-class_map_df = pd.read_csv(class_map_path)
+# Models and the class map are resolved lazily from the local artifact cache
+# (see model_registry.py), so importing this module needs no network access.
 
 #map classes to Drone/Bird
 bird_classes = [
@@ -42,48 +28,115 @@ bird_classes = [
     "Lark, meadowlark"
 ]
 
-def is_bird(filepath):
-    waveform, sr = librosa.load(filepath, sr=16000, mono=True)
-    scores, _, _ = bird_model(waveform)
-    mean_scores = np.mean(scores, axis=0)
+YAMNET_SAMPLE_RATE = 16000
+YAMNET_FRAME_SECONDS = 0.96  # YAMNet analysis window
+YAMNET_HOP_SECONDS = 0.48  # YAMNet frame hop
+BIRD_THRESHOLD = 0.3
+
+_bird_mask = None
+_drone_label_id = None
+_index_lock = threading.Lock()
+
+
+def get_bird_class_mask():
+    """Return a (num_classes,) 0/1 mask selecting the YAMNet bird classes"""
+    global _bird_mask
+    with _index_lock:
+        if _bird_mask is None:
+            class_map_df = get_class_map()
+            _bird_mask = class_map_df['display_name'].isin(bird_classes).to_numpy(dtype=np.float32)
+        return _bird_mask
+
+
+def get_drone_label_id():
+    """Return the index of the "drone" label in the drone model output"""
+    global _drone_label_id
+    with _index_lock:
+        if _drone_label_id is None:
+            _, drone_model = get_drone_model()
+            _drone_label_id = next(i for i, label in drone_model.config.id2label.items() if label == 'drone')
+        return _drone_label_id
+
+
+def bird_frame_scores(waveform):
+    """
+    Score a 16 kHz mono waveform with YAMNet and group the classes into bird/other
+
+    Args:
+        waveform (np.ndarray): Mono waveform sampled at YAMNET_SAMPLE_RATE
+
+    Returns:
+        tuple: (bird_score, frame_times, frame_probs) - the clip-level bird score,
+            the start time of each YAMNet frame and the bird probability of each frame
+    """
+    scores, _, _ = get_bird_model()(waveform)
+    scores = np.asarray(scores)  # (n_frames, n_classes)
 
-    # Normalize so they sum to 1
-    mean_scores = mean_scores / np.sum(mean_scores)
+    # Bird mass and total mass per frame in one matrix product each
+    frame_bird = scores @ get_bird_class_mask()
+    frame_total = scores.sum(axis=1)
 
-    #Map predictions to classes
-    predictions = {class_map_df['display_name'][i]: mean_scores[i]
-                   for i in range(len(mean_scores))}
+    frame_probs = frame_bird / np.maximum(frame_total, np.finfo(np.float32).tiny)
+    frame_times = np.arange(len(frame_probs)) * YAMNET_HOP_SECONDS
 
-    # Group into bird/not_bird
-    bird_score = sum([predictions.get(c, 0) for c in bird_classes ])
-    other_score = 1 - bird_score
+    # Same as normalising the mean score vector and summing the bird classes
+    bird_score = float(frame_bird.sum() / max(frame_total.sum(), np.finfo(np.float32).tiny))
+    return bird_score, frame_times, frame_probs
 
-    categories = {"bird": bird_score, "not_bird": other_score}
-    prediction = "bird" if bird_score > 0.3 else "not_bird"
-    return prediction
 
+def bird_probability(waveform):
+    """Return the aggregated bird score of a 16 kHz mono waveform."""
+    return bird_frame_scores(waveform)[0]
 
-def is_drone(filepath):
-    audio, sr = librosa.load(filepath, sr=extractor.sampling_rate)
-    inputs = extractor(audio, sampling_rate=extractor.sampling_rate, return_tensors="pt")
+
+def bird_segments(frame_times, frame_probs, threshold=BIRD_THRESHOLD):
+    """
+    Merge consecutive bird frames into time segments
+
+    Args:
+        frame_times (np.ndarray): Start time of each YAMNet frame (seconds)
+        frame_probs (np.ndarray): Bird probability of each frame
+        threshold (float): Minimum probability for a frame to count as bird
+
+    Returns:
+        list: (start, end) pairs in seconds
+    """
+    frame_times = np.asarray(frame_times, dtype=float)
+    is_bird_frame = np.asarray(frame_probs) > threshold
+    if not is_bird_frame.any():
+        return []
+
+    # Rising/falling edges of the boolean mask delimit the segments
+    edges = np.diff(np.concatenate(([0], is_bird_frame.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return [(float(frame_times[s]), float(frame_times[e] + YAMNET_FRAME_SECONDS))
+            for s, e in zip(starts, ends)]
+
+
+def drone_probability(waveform, sr):
+    """Return the drone-model probability of the "drone" label for a mono waveform."""
+    extractor, drone_model = get_drone_model()
+    if sr != extractor.sampling_rate:
+        waveform = librosa.resample(waveform, orig_sr=sr, target_sr=extractor.sampling_rate)
+    inputs = extractor(waveform, sampling_rate=extractor.sampling_rate, return_tensors="pt")
 
     #Run inference
     with torch.no_grad():
         outputs = drone_model(**inputs)
-        logits = outputs.logits
-        probs = torch.softmax(logits, dim=-1)
+        probs = torch.softmax(outputs.logits, dim=-1)
 
-    #Get prediction
-    predicted_class = probs.argmax(dim=-1).item()
-    label = drone_model.config.id2label[predicted_class]
-    confidence = probs[0, predicted_class].item()
-    return label
+    return probs[0, get_drone_label_id()].item()
 
-def classify_audio(filepath):
-    if is_bird(filepath) == 'bird':
-        return 'Bird'
-    elif is_drone(filepath) == 'drone':
-        return 'Drone'
-    else:
-        return 'Other'
 
+def is_bird(filepath):
+    """Return 'bird' or 'not_bird' for an audio file, from its YAMNet bird score."""
+    waveform, _ = librosa.load(filepath, sr=YAMNET_SAMPLE_RATE, mono=True)
+    bird_score, _, _ = bird_frame_scores(waveform)
+    return "bird" if bird_score > BIRD_THRESHOLD else "not_bird"
+
+
+def classify_audio(filepath):
+    """Classify an audio file as 'Bird', 'Drone' or 'Other'."""
+    from viewers.SAR_Drone.models.classifier_engine import get_default_engine
+    return get_default_engine().classify(filepath)['label']
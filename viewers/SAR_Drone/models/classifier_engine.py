@@ -0,0 +1,186 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import librosa
+import numpy as np
+
+from viewers.SAR_Drone.models.audio_classifier import (
+    YAMNET_SAMPLE_RATE,
+    BIRD_THRESHOLD,
+    bird_frame_scores,
+    drone_probability
+)
+
+# Engine defaults
+WINDOW_SECONDS = 10.0  # length of each scored window
+MIN_WINDOW_SECONDS = 1.0  # shorter tails are merged into the previous window
+DRONE_THRESHOLD = 0.5
+POLICIES = ('parallel', 'cascade')
+AGGREGATIONS = ('max', 'mean')
+
+
+def split_windows(n_samples, sr, window_seconds=WINDOW_SECONDS, hop_seconds=None):
+    """
+    Split a clip into fixed-length windows
+
+    Args:
+        n_samples (int): Number of samples in the clip
+        sr (int): Sampling rate
+        window_seconds (float): Window length in seconds
+        hop_seconds (float): Hop between window starts (None = window length)
+
+    Returns:
+        list: (start_sample, end_sample) pairs covering the clip
+    """
+    window = max(1, int(window_seconds * sr))
+    hop = max(1, int((hop_seconds or window_seconds) * sr))
+    min_tail = int(MIN_WINDOW_SECONDS * sr)
+
+    if n_samples <= window:
+        return [(0, n_samples)]
+
+    bounds = []
+    for start in range(0, n_samples, hop):
+        end = min(start + window, n_samples)
+        if bounds and end - start < min_tail:
+            # Fold a short tail into the previous window
+            bounds[-1] = (bounds[-1][0], end)
+            break
+        bounds.append((start, end))
+        if end == n_samples:
+            break
+    return bounds
+
+
+class AudioClassifierEngine:
+    """Runs the bird (YAMNet) and drone (HuggingFace) models over windowed audio"""
+
+    def __init__(self, policy='parallel', early_exit=True, window_seconds=WINDOW_SECONDS,
+                 hop_seconds=None, aggregation='max', bird_threshold=BIRD_THRESHOLD,
+                 drone_threshold=DRONE_THRESHOLD, max_workers=2):
+        """
+        Args:
+            policy (str): 'parallel' runs both models concurrently, 'cascade' runs
+                the bird model first and the drone model only when needed
+            early_exit (bool): Stop drone scoring as soon as the clip is known to be a bird
+            window_seconds (float): Window length used to score long clips
+            hop_seconds (float): Hop between windows (None = non-overlapping)
+            aggregation (str): How window scores are combined ('max' or 'mean')
+            bird_threshold (float): Aggregated bird score above which the clip is a bird
+            drone_threshold (float): Aggregated drone probability above which the clip is a drone
+            max_workers (int): Thread pool size used by the parallel policy
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {POLICIES}")
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{aggregation}', expected one of {AGGREGATIONS}")
+
+        self.policy = policy
+        self.early_exit = early_exit
+        self.window_seconds = window_seconds
+        self.hop_seconds = hop_seconds
+        self.aggregation = aggregation
+        self.bird_threshold = bird_threshold
+        self.drone_threshold = drone_threshold
+        # TF and torch release the GIL inside their kernels, so threads are enough
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='audio-classifier')
+
+    def classify(self, filepath):
+        """Classify an audio file (see classify_waveform)"""
+        waveform, sr = librosa.load(filepath, sr=YAMNET_SAMPLE_RATE, mono=True)
+        return self.classify_waveform(waveform, sr)
+
+    def classify_waveform(self, waveform, sr=YAMNET_SAMPLE_RATE):
+        """
+        Score a mono waveform window by window and aggregate the result
+
+        Args:
+            waveform (np.ndarray): Mono waveform sampled at YAMNET_SAMPLE_RATE
+            sr (int): Sampling rate of the waveform
+
+        Returns:
+            dict: 'label' ('Bird', 'Drone' or 'Other'), aggregated 'bird' and 'drone'
+                scores, 'windows', a list of per-window score dicts, and 'bird_frames',
+                the per-frame bird probability over time ('times', 'probs')
+        """
+        bounds = split_windows(len(waveform), sr, self.window_seconds, self.hop_seconds)
+        windows = [waveform[start:end] for start, end in bounds]
+        bird_scores = [None] * len(windows)
+        drone_scores = [None] * len(windows)
+        frame_times = [None] * len(windows)
+        frame_probs = [None] * len(windows)
+        is_bird_clip = threading.Event()
+
+        def score_birds():
+            for i, window in enumerate(windows):
+                bird_scores[i], times, frame_probs[i] = bird_frame_scores(window)
+                frame_times[i] = times + bounds[i][0] / sr
+                if self.aggregation == 'max' and bird_scores[i] > self.bird_threshold:
+                    # Bird wins regardless of the remaining windows
+                    is_bird_clip.set()
+            if self._aggregate(bird_scores) > self.bird_threshold:
+                is_bird_clip.set()
+
+        def score_drones():
+            for i, window in enumerate(windows):
+                if self.early_exit and is_bird_clip.is_set():
+                    return
+                drone_scores[i] = drone_probability(window, sr)
+
+        if self.policy == 'parallel':
+            futures = [self._executor.submit(score_birds), self._executor.submit(score_drones)]
+            for future in futures:
+                future.result()
+        else:
+            score_birds()
+            score_drones()
+
+        bird_score = self._aggregate(bird_scores)
+        drone_score = self._aggregate(drone_scores)
+
+        if bird_score > self.bird_threshold:
+            label = 'Bird'
+        elif drone_score is not None and drone_score > self.drone_threshold:
+            label = 'Drone'
+        else:
+            label = 'Other'
+
+        return {
+            'label': label,
+            'bird': bird_score,
+            'drone': drone_score,
+            'windows': [
+                {
+                    'start': start / sr,
+                    'end': end / sr,
+                    'bird': bird_scores[i],
+                    'drone': drone_scores[i]
+                }
+                for i, (start, end) in enumerate(bounds)
+            ],
+            'bird_frames': {
+                'times': np.concatenate(frame_times),
+                'probs': np.concatenate(frame_probs)
+            }
+        }
+
+    def _aggregate(self, scores):
+        """Combine window scores, ignoring windows that were skipped"""
+        scored = [s for s in scores if s is not None]
+        if not scored:
+            return None
+        return float(np.max(scored) if self.aggregation == 'max' else np.mean(scored))
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_default_engine():
+    """Return the process-wide engine used by classify_audio"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = AudioClassifierEngine()
+        return _default_engine
@@ -4,6 +4,7 @@ import torch.nn.functional as F
 from torchgeo.models import ResNet50_Weights, resnet50
 import numpy as np
 import os
+import threading
 
 #recieve pretrained model
 def create_model():
@@ -22,6 +23,7 @@ def create_model():
 
 
 _MODEL = None
+_MODEL_LOCK = threading.Lock()
 _DEVICE = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
 def load_model(model_filename='quake_sar_classifier_FINAL.pth'):
@@ -35,7 +37,14 @@ def load_model(model_filename='quake_sar_classifier_FINAL.pth'):
     _MODEL.to(_DEVICE)
     _MODEL.eval()
 
-load_model()#load model once
+
+#load the model once per inference pool process (see viewers.common.inference_pool),
+#so web workers never run torch before they are forked
+def get_model():
+    with _MODEL_LOCK:
+        if _MODEL is None:
+            load_model()
+    return _MODEL
 
 #preprocess input sar image
 def preprocess(sar_image):
@@ -61,7 +70,7 @@ def predict_damage(sar_image):
     sar_tensor = preprocess(sar_image)
 
     with torch.no_grad():
-        output = _MODEL(sar_tensor)
+        output = get_model()(sar_tensor)
         probs = F.softmax(output, dim=1)
         prediction_id = torch.argmax(probs, dim=1).item()
 
@@ -0,0 +1,393 @@
+"""
+Local, versioned cache for the audio classifier artifacts.
+
+Artifacts are fetched once with
+
+    python -m viewers.SAR_Drone.models.model_registry prefetch
+
+and afterwards resolved from disk only, so workers start without network access.
+Each artifact is downloaded at a pinned revision into
+<MODEL_CACHE_DIR>/<name>/<revision>/ and checked against the SHA-256 of every
+file recorded in artifact_pins.json before it is loaded.
+
+The pins are committed with the code and reviewed like it. They are written
+from a trusted download with
+
+    python -m viewers.SAR_Drone.models.model_registry pin
+
+which resolves the current upstream revision of every artifact. An artifact
+without a pin is still served: it is downloaded at its tracked reference and
+the checksums of that first download are recorded in its manifest and
+verified from then on (trust on first use), with a warning to pin it.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_DIR = os.environ.get(
+    'SAR_MODEL_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+)
+# Set to 1 to let a cold cache download missing artifacts instead of failing
+ALLOW_DOWNLOAD = os.environ.get('SAR_MODELS_ALLOW_DOWNLOAD', '0') == '1'
+# Set to 0 to skip checksum verification when loading
+VERIFY_CHECKSUMS = os.environ.get('SAR_MODELS_VERIFY', '1') == '1'
+
+MANIFEST_NAME = 'manifest.json'
+VERIFIED_NAME = '.verified.json'  # size/mtime of files that last passed verification
+PINS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifact_pins.json')
+
+# 'track' is the moving upstream reference `pin` resolves to a fixed revision
+ARTIFACTS = {
+    'drone_model': {
+        'kind': 'huggingface',
+        'source': 'preszzz/drone-audio-detection-05-17-trial-0',
+        'track': 'main'
+    },
+    'yamnet': {
+        'kind': 'tfhub',
+        'source': 'https://tfhub.dev/google/yamnet/{revision}',
+        'track': '1'  # TF Hub model versions are immutable
+    },
+    'yamnet_class_map': {
+        'kind': 'file',
+        'source': 'https://raw.githubusercontent.com/tensorflow/models/{revision}/research/audioset/yamnet/yamnet_class_map.csv',
+        'repo': 'tensorflow/models',
+        'path': 'research/audioset/yamnet/yamnet_class_map.csv',
+        'track': 'master',
+        'filename': 'yamnet_class_map.csv'
+    }
+}
+
+
+class ArtifactError(RuntimeError):
+    """Raised when an artifact is missing from the cache or fails verification"""
+
+
+def load_pins():
+    """Return {name: {'revision': ..., 'files': {path: sha256}}} from PINS_FILE"""
+    if not os.path.exists(PINS_FILE):
+        return {}
+    with open(PINS_FILE) as f:
+        return json.load(f)
+
+
+def get_pin(name):
+    """Return the pinned revision and file hashes of an artifact, or None if it is not pinned"""
+    pin = load_pins().get(name)
+    if not pin or not pin.get('revision') or not pin.get('files'):
+        return None
+    return pin
+
+
+def artifact_revision(name):
+    """Pinned revision of an artifact, or its tracked reference while it is unpinned"""
+    pin = get_pin(name)
+    return pin['revision'] if pin else ARTIFACTS[name]['track']
+
+
+def _warn_unpinned(name):
+    logger.warning(
+        "Artifact '%s' has no pinned revision and checksums in %s; using the checksums of its first "
+        "download. Run: python -m viewers.SAR_Drone.models.model_registry pin, then review and commit the file",
+        name, PINS_FILE
+    )
+
+
+def artifact_dir(name, revision=None):
+    """Return the cache directory of an artifact at its pinned (or the given) revision"""
+    revision = revision or artifact_revision(name)
+    return os.path.join(MODEL_CACHE_DIR, name, revision)
+
+
+def _sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _hash_tree(root):
+    """Map every file below root (relative path) to its SHA-256"""
+    hashes = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename in (MANIFEST_NAME, VERIFIED_NAME):
+                continue
+            path = os.path.join(dirpath, filename)
+            hashes[os.path.relpath(path, root).replace(os.sep, '/')] = _sha256(path)
+    return hashes
+
+
+def _stat_tree(root):
+    """Map every file below root (relative path) to [size, mtime_ns]"""
+    stats = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename in (MANIFEST_NAME, VERIFIED_NAME):
+                continue
+            path = os.path.join(dirpath, filename)
+            st = os.stat(path)
+            stats[os.path.relpath(path, root).replace(os.sep, '/')] = [st.st_size, st.st_mtime_ns]
+    return stats
+
+
+def resolve_revision(name):
+    """Resolve the tracked upstream reference of an artifact to a fixed revision (needs network)"""
+    spec = ARTIFACTS[name]
+    if spec['kind'] == 'huggingface':
+        from huggingface_hub import HfApi
+        return HfApi().model_info(spec['source'], revision=spec['track']).sha
+    if spec['kind'] == 'file':
+        url = f"https://api.github.com/repos/{spec['repo']}/commits/{spec['track']}"
+        with urllib.request.urlopen(url) as response:
+            return json.load(response)['sha']
+    return spec['track']
+
+
+def _download(name, target, revision):
+    """Download an artifact at a fixed revision into an empty target directory"""
+    spec = ARTIFACTS[name]
+
+    if spec['kind'] == 'huggingface':
+        from huggingface_hub import snapshot_download
+        snapshot_download(repo_id=spec['source'], revision=revision, local_dir=target)
+        # Drop the hub's bookkeeping folder, it is not part of the model
+        shutil.rmtree(os.path.join(target, '.cache'), ignore_errors=True)
+    elif spec['kind'] == 'tfhub':
+        import tensorflow_hub as hub
+        shutil.copytree(hub.resolve(spec['source'].format(revision=revision)), target, dirs_exist_ok=True)
+    elif spec['kind'] == 'file':
+        urllib.request.urlretrieve(spec['source'].format(revision=revision),
+                                   os.path.join(target, spec['filename']))
+    else:
+        raise ArtifactError(f"Unknown artifact kind '{spec['kind']}' for {name}")
+
+
+def pin(names=None):
+    """
+    Resolve each artifact's current upstream revision, download it and record
+    its file hashes in PINS_FILE
+
+    Only run this from a trusted network, then review and commit the file.
+    """
+    pins = load_pins()
+    for name in names or ARTIFACTS:
+        revision = resolve_revision(name)
+        staging = tempfile.mkdtemp(prefix=f'.{name}-pin-')
+        try:
+            _download(name, staging, revision)
+            pins[name] = {'revision': revision, 'files': _hash_tree(staging)}
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    with open(PINS_FILE, 'w') as f:
+        json.dump(pins, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return pins
+
+
+def prefetch(names=None, force=False):
+    """
+    Download artifacts at their pinned revisions into the local cache
+
+    Downloads whose files do not match the pinned checksums are discarded.
+    Unpinned artifacts are downloaded at their tracked reference and the
+    checksums of that download are recorded in the manifest.
+
+    Args:
+        names (list): Artifact names (None = all)
+        force (bool): Re-download artifacts that are already cached
+
+    Returns:
+        dict: Artifact name -> cache directory
+    """
+    paths = {}
+    for name in names or ARTIFACTS:
+        pin = get_pin(name)
+        revision = artifact_revision(name)
+        target = artifact_dir(name, revision)
+        if os.path.exists(os.path.join(target, MANIFEST_NAME)) and not force:
+            paths[name] = target
+            continue
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f'.{name}-', dir=os.path.dirname(target))
+        try:
+            _download(name, staging, revision)
+            if pin:
+                _check_hashes(name, staging, pin['files'])
+            else:
+                _warn_unpinned(name)
+            manifest = {
+                'name': name,
+                'source': ARTIFACTS[name]['source'],
+                'revision': revision,
+                'pinned': pin is not None,
+                'files': _hash_tree(staging)
+            }
+            with open(os.path.join(staging, MANIFEST_NAME), 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            # Swap the finished download in so readers never see a partial artifact
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            os.replace(staging, target)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        paths[name] = target
+    return paths
+
+
+def _check_hashes(name, root, expected):
+    """Compare the files below root with the expected checksums, raising ArtifactError on mismatch"""
+    actual = _hash_tree(root)
+    if actual != expected:
+        bad = sorted(set(expected.items()) ^ set(actual.items()))
+        raise ArtifactError(f"Checksum mismatch for '{name}': {sorted({path for path, _ in bad})}")
+
+
+def verify(name):
+    """
+    Check a cached artifact against its pinned checksums, raising ArtifactError on mismatch
+
+    Unpinned artifacts are checked against the checksums recorded when they
+    were downloaded.
+
+    A successful check records the size and mtime of every file, so later
+    starts only rehash when a file changed.
+    """
+    target = artifact_dir(name)
+    if not os.path.exists(os.path.join(target, MANIFEST_NAME)):
+        raise ArtifactError(
+            f"Artifact '{name}' is not cached in {target}. "
+            f"Run: python -m viewers.SAR_Drone.models.model_registry prefetch"
+        )
+
+    pin = get_pin(name)
+    if pin:
+        expected = pin['files']
+    else:
+        _warn_unpinned(name)
+        with open(os.path.join(target, MANIFEST_NAME)) as f:
+            expected = json.load(f).get('files')
+        if not expected:
+            raise ArtifactError(f"Artifact '{name}' is neither pinned nor has recorded checksums; prefetch it again")
+
+    stamp_path = os.path.join(target, VERIFIED_NAME)
+    stats = _stat_tree(target)
+    try:
+        with open(stamp_path) as f:
+            stamp = json.load(f)
+        if stamp['files'] == stats and stamp['expected'] == expected:
+            return target
+    except (OSError, ValueError, KeyError):
+        pass
+
+    _check_hashes(name, target, expected)
+    with open(stamp_path, 'w') as f:
+        json.dump({'files': stats, 'expected': expected}, f)
+    return target
+
+
+_verified = set()
+_verify_lock = threading.Lock()
+
+
+def resolve(name):
+    """Return the verified cache directory of an artifact (downloading only if allowed)"""
+    with _verify_lock:
+        if name in _verified:
+            return artifact_dir(name)
+
+        if ALLOW_DOWNLOAD and not os.path.exists(os.path.join(artifact_dir(name), MANIFEST_NAME)):
+            prefetch([name])
+
+        target = verify(name) if VERIFY_CHECKSUMS else artifact_dir(name)
+        if not os.path.exists(os.path.join(target, MANIFEST_NAME)):
+            raise ArtifactError(f"Artifact '{name}' is not cached in {target}")
+        _verified.add(name)
+        return target
+
+
+# -----------------------
+# Lazy loaders
+# -----------------------
+_loaded = {}
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+
+
+def _load_once(key, loader):
+    """Load an artifact once; different artifacts load concurrently"""
+    if key in _loaded:
+        return _loaded[key]
+    with _key_locks_lock:
+        lock = _key_locks.setdefault(key, threading.Lock())
+    with lock:
+        if key not in _loaded:
+            _loaded[key] = loader()
+        return _loaded[key]
+
+
+def get_drone_model():
+    """Return (feature_extractor, model) for the drone classifier"""
+    def load():
+        from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
+        path = resolve('drone_model')
+        extractor = AutoFeatureExtractor.from_pretrained(path, local_files_only=True)
+        model = AutoModelForAudioClassification.from_pretrained(path, local_files_only=True)
+        model.eval()
+        return extractor, model
+    return _load_once('drone_model', load)
+
+
+def get_bird_model():
+    """Return the YAMNet model"""
+    def load():
+        import tensorflow_hub as hub
+        return hub.load(resolve('yamnet'))
+    return _load_once('yamnet', load)
+
+
+def get_class_map():
+    """Return the YAMNet class map as a pandas DataFrame"""
+    def load():
+        import pandas as pd
+        spec = ARTIFACTS['yamnet_class_map']
+        return pd.read_csv(os.path.join(resolve('yamnet_class_map'), spec['filename']))
+    return _load_once('yamnet_class_map', load)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the audio classifier model cache")
+    parser.add_argument('command', choices=['pin', 'prefetch', 'verify'])
+    parser.add_argument('names', nargs='*', help="Artifact names (default: all)")
+    parser.add_argument('--force', action='store_true', help="Re-download cached artifacts")
+    args = parser.parse_args(argv)
+
+    names = args.names or list(ARTIFACTS)
+    if args.command == 'pin':
+        for name, pinned in pin(names).items():
+            if name in names:
+                print(f"{name}: {pinned['revision']} ({len(pinned['files'])} files) -> {PINS_FILE}")
+        return
+    if args.command == 'prefetch':
+        for name, path in prefetch(names, force=args.force).items():
+            print(f"{name}: {path}")
+    for name in names:
+        verify(name)
+        print(f"{name}: OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import threading
+import uuid
+
+import numpy as np
+import plotly.graph_objs as go
+
+from viewers.common.decimation import minmax_envelope
+
+WAVEFORM_SAMPLE_RATE = 22050
+WAVEFORM_BINS = 1500  # ~ plot width in pixels, each bin sends a min and a max point
+WAVEFORM_STORE_DIR = os.path.join(tempfile.gettempdir(), 'sar_waveforms')
+WAVEFORM_STORE_MAX_FILES = 16
+
+
+class WaveformStore:
+    """Keeps decoded waveforms on disk so any worker can serve zoomed views"""
+
+    def __init__(self, root=WAVEFORM_STORE_DIR, max_files=WAVEFORM_STORE_MAX_FILES):
+        self.root = root
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def put(self, y):
+        """Store a waveform and return its key"""
+        key = uuid.uuid4().hex
+        np.save(self._path(key), np.asarray(y, dtype=np.float32))
+        self._evict()
+        return key
+
+    def get(self, key):
+        """Return a memory-mapped waveform, or None if it was evicted"""
+        path = self._path(key)
+        if not key or not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def _path(self, key):
+        # Keys are generated by put(); reject anything that could escape the store
+        safe_key = ''.join(c for c in str(key) if c.isalnum())
+        return os.path.join(self.root, f"{safe_key}.npy")
+
+    def _evict(self):
+        with self._lock:
+            files = [os.path.join(self.root, f) for f in os.listdir(self.root) if f.endswith('.npy')]
+            files.sort(key=os.path.getmtime)
+            for path in files[:max(0, len(files) - self.max_files)]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+waveform_store = WaveformStore()
+
+
+def waveform_trace_data(y, sr, t0=None, t1=None, n_bins=WAVEFORM_BINS):
+    """
+    Min/max envelope of the visible part of a waveform
+
+    Args:
+        y (np.ndarray): Waveform samples
+        sr (int): Sampling rate
+        t0 (float): Start of the visible range in seconds (None = start)
+        t1 (float): End of the visible range in seconds (None = end)
+        n_bins (int): Number of envelope bins
+
+    Returns:
+        tuple: (time_array, amplitude_array)
+    """
+    start = 0 if t0 is None else int(np.floor(t0 * sr))
+    stop = len(y) if t1 is None else int(np.ceil(t1 * sr)) + 1
+
+    # Pad by one bin on each side so panning does not reveal empty edges
+    pad = max(1, (stop - start) // n_bins)
+    indices, values = minmax_envelope(y, n_bins, start - pad, stop + pad)
+    return indices / sr, values
+
+
+def create_waveform_figure(y, sr, duration, uirevision=None):
+    """
+    Create the decimated waveform figure for a whole clip
+
+    Args:
+        uirevision: Stable per clip (e.g. its store key), so zoom and pan
+            survive the figure patches sent while the clip is explored
+    """
+    t, values = waveform_trace_data(y, sr)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=t,
+        y=values,
+        mode='lines',
+        name='Amplitude',
+        line=dict(color='blue', width=1)
+    ))
+    fig.update_xaxes(title_text='Time (s)', range=[0, duration])
+    fig.update_yaxes(title_text='Amplitude', range=[-1.05, 1.05])
+    fig.update_layout(uirevision=uirevision)
+    return fig
+
+
+def visible_range(relayout_data):
+    """
+    Extract the x-axis range from a relayoutData event
+
+    Returns:
+        tuple: (t0, t1) for a zoom, (None, None) for a reset, or False if the
+            event does not touch the x-axis
+    """
+    if not relayout_data:
+        return False
+    if relayout_data.get('xaxis.autorange'):
+        return None, None
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return float(relayout_data['xaxis.range[0]']), float(relayout_data['xaxis.range[1]'])
+    if 'xaxis.range' in relayout_data:
+        t0, t1 = relayout_data['xaxis.range']
+        return float(t0), float(t1)
+    return False
@@ -0,0 +1,11 @@
+"""
+Helpers shared by several viewers
+"""
+from .decimation import minmax_envelope, MinMaxPyramid
+from .audio_store import AudioStore, audio_store
+from .xor_engine import xor_chunks, xor_trace
+from .background import background_manager
+from .inference_pool import InferenceError, InferencePool, inference_pool
+
+__all__ = ['minmax_envelope', 'MinMaxPyramid', 'AudioStore', 'audio_store', 'xor_chunks', 'xor_trace',
+           'background_manager', 'InferenceError', 'InferencePool', 'inference_pool']
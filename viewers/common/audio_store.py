@@ -0,0 +1,125 @@
+import base64
+import hashlib
+import os
+import tempfile
+import threading
+
+from flask import abort, send_file
+
+AUDIO_STORE_DIR = os.environ.get(
+    'AUDIO_STORE_DIR',
+    os.path.join(tempfile.gettempdir(), 'signal_viewer_audio')
+)
+AUDIO_ROUTE = '/audio-assets'
+AUDIO_STORE_MAX_BYTES = 512 * 1024 * 1024  # oldest assets are evicted past this size
+AUDIO_CACHE_MAX_AGE = 24 * 3600  # seconds; assets are content-addressed, so they never change
+
+AUDIO_MIMETYPES = {
+    '.wav': 'audio/wav',
+    '.mp3': 'audio/mpeg'
+}
+
+
+class AudioStore:
+    """
+    Content-addressed audio files served from the Flask server behind Dash
+
+    Callbacks store the audio bytes once and hand the browser a short URL
+    instead of a base64 data URI. Files live on disk so every gunicorn worker
+    can serve them, and responses support HTTP range requests so the audio
+    element can seek without downloading the whole file.
+    """
+
+    def __init__(self, root=AUDIO_STORE_DIR, max_bytes=AUDIO_STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def put(self, data, extension='.wav'):
+        """
+        Store audio bytes and return the URL they are served from
+
+        Args:
+            data (bytes): Encoded audio file (WAV or MP3)
+            extension (str): File extension, selects the served mimetype
+
+        Returns:
+            str: URL of the asset
+        """
+        extension = extension.lower()
+        if extension not in AUDIO_MIMETYPES:
+            raise ValueError(f"Unsupported audio type '{extension}'")
+
+        asset_id = hashlib.sha256(data).hexdigest()[:32] + extension
+        path = os.path.join(self.root, asset_id)
+
+        if os.path.exists(path):
+            os.utime(path)  # refresh for eviction
+        else:
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.part')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._evict()
+
+        return f"{AUDIO_ROUTE}/{asset_id}"
+
+    def put_upload(self, contents, filename):
+        """Store the contents of a dcc.Upload and return the asset URL"""
+        _, content_string = contents.split(',', 1)
+        extension = os.path.splitext(filename or '')[1] or '.wav'
+        return self.put(base64.b64decode(content_string), extension)
+
+    def path(self, asset_id):
+        """Return the file path of an asset, or None if it is unknown"""
+        name, extension = os.path.splitext(asset_id)
+        if not name.isalnum() or extension not in AUDIO_MIMETYPES:
+            return None
+        path = os.path.join(self.root, asset_id)
+        return path if os.path.exists(path) else None
+
+    def register(self, server):
+        """Add the asset route to a Flask server"""
+
+        @server.route(f"{AUDIO_ROUTE}/<asset_id>")
+        def serve_audio_asset(asset_id):
+            path = self.path(asset_id)
+            if path is None:
+                abort(404)
+
+            # conditional=True answers Range and If-None-Match requests
+            response = send_file(
+                path,
+                mimetype=AUDIO_MIMETYPES[os.path.splitext(asset_id)[1]],
+                conditional=True,
+                etag=True,
+                max_age=AUDIO_CACHE_MAX_AGE
+            )
+            response.headers['Accept-Ranges'] = 'bytes'
+            response.headers['Cache-Control'] = f"public, max-age={AUDIO_CACHE_MAX_AGE}, immutable"
+            return response
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.root):
+                path = os.path.join(self.root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+audio_store = AudioStore()
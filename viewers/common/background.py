@@ -0,0 +1,17 @@
+import os
+import tempfile
+
+import diskcache
+from dash import DiskcacheManager
+
+BACKGROUND_CACHE_DIR = os.environ.get(
+    'BACKGROUND_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'signal_viewer_jobs')
+)
+INFERENCE_CONCURRENCY = int(os.environ.get('INFERENCE_CONCURRENCY', 2))  # inference processes, all workers
+JOB_RESULT_EXPIRE = 3600  # seconds a finished job's result is kept
+
+# The cache lives on disk, so every gunicorn worker shares the same jobs and inference queue
+background_cache = diskcache.Cache(BACKGROUND_CACHE_DIR)
+background_manager = DiskcacheManager(background_cache, expire=JOB_RESULT_EXPIRE)
+
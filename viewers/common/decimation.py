@@ -0,0 +1,145 @@
+import numpy as np
+
+
+def minmax_envelope(y, n_bins, start=0, stop=None):
+    """
+    Reduce a signal range to a min/max envelope for plotting
+
+    The range is split into n_bins equal bins and each bin is replaced by its
+    minimum and maximum sample, kept in their original order so the trace still
+    follows the waveform. Ranges that already fit are returned untouched.
+
+    Args:
+        y (np.ndarray): 1-D signal
+        n_bins (int): Number of bins (the output holds at most 2 * n_bins points)
+        start (int): First sample of the range
+        stop (int): End of the range (exclusive, None = end of signal)
+
+    Returns:
+        tuple: (indices, values) - sample indices and values of the envelope points
+    """
+    stop = len(y) if stop is None else min(int(stop), len(y))
+    start = max(0, min(int(start), stop))
+    n = stop - start
+
+    if n <= 2 * n_bins:
+        indices = np.arange(start, stop)
+        return indices, np.asarray(y[start:stop])
+
+    bin_size = int(np.ceil(n / n_bins))
+    n_full = n // bin_size
+    bins = np.asarray(y[start:start + n_full * bin_size]).reshape(n_full, bin_size)
+    arg_min = bins.argmin(axis=1)
+    arg_max = bins.argmax(axis=1)
+    offsets = start + np.arange(n_full) * bin_size
+
+    indices = np.empty(2 * n_full, dtype=np.int64)
+    indices[0::2] = offsets + np.minimum(arg_min, arg_max)
+    indices[1::2] = offsets + np.maximum(arg_min, arg_max)
+
+    tail_start = start + n_full * bin_size
+    if tail_start < stop:
+        tail = np.asarray(y[tail_start:stop])
+        tail_idx = tail_start + np.sort([tail.argmin(), tail.argmax()])
+        indices = np.concatenate([indices, tail_idx])
+
+    return indices, np.asarray(y[indices])
+
+
+class MinMaxPyramid:
+    """
+    Precomputed min/max envelopes of a multi-channel signal at power-of-two bin sizes
+
+    Level k holds, for every bin of BASE_BIN * 2**k samples, the position and
+    value of its minimum and maximum. When a level has an odd number of bins the
+    last one is carried up unmerged, so every level spans the whole signal (the
+    last bin of a level may be shorter). Building it costs about one pass over the
+    signal; a query then picks the coarsest level that still gives at least
+    n_bins bins over the requested range, so its cost depends on the output
+    size rather than on the length of the range.
+
+    Zooms finer than two BASE_BIN bins per output bin are served from the raw
+    samples by minmax_envelope, so the pyramid only has to cover the coarse end;
+    starting at 64-sample bins keeps it at a few percent of the signal's size.
+    """
+
+    BASE_BIN = 64
+
+    def __init__(self, signals):
+        """
+        Args:
+            signals (np.ndarray): (n_channels, n_samples) signal matrix
+        """
+        self.signals = signals
+        self.n_samples = signals.shape[1]
+        self.n_covered = 0  # samples spanned by the levels, the rest is a sub-BASE_BIN tail
+        index_dtype = np.int32 if self.n_samples < np.iinfo(np.int32).max else np.int64
+        self.levels = []
+
+        # Level 0 straight from the samples
+        n_bins = self.n_samples // self.BASE_BIN
+        if n_bins == 0:
+            return
+        self.n_covered = n_bins * self.BASE_BIN
+        bins = np.asarray(signals[:, :n_bins * self.BASE_BIN]).reshape(signals.shape[0], n_bins, self.BASE_BIN)
+        offsets = (np.arange(n_bins) * self.BASE_BIN)[np.newaxis, :]
+        arg_min = offsets + bins.argmin(axis=2)
+        arg_max = offsets + bins.argmax(axis=2)
+        self.levels.append((arg_min.astype(index_dtype), bins.min(axis=2),
+                            arg_max.astype(index_dtype), bins.max(axis=2)))
+
+        # Each further level merges pairs of bins of the previous one
+        while self.levels[-1][0].shape[1] >= 2:
+            arg_min, v_min, arg_max, v_max = self.levels[-1]
+            if arg_min.shape[1] % 2:
+                # Pair the odd last bin with itself so it is carried up
+                arg_min, v_min, arg_max, v_max = (np.concatenate([a, a[:, -1:]], axis=1)
+                                                  for a in (arg_min, v_min, arg_max, v_max))
+            n_pairs = arg_min.shape[1] // 2
+            rows = np.arange(arg_min.shape[0])[:, np.newaxis]
+
+            pick_min = v_min[:, 1:2 * n_pairs:2] < v_min[:, 0:2 * n_pairs:2]
+            pick_max = v_max[:, 1:2 * n_pairs:2] > v_max[:, 0:2 * n_pairs:2]
+            min_col = 2 * np.arange(n_pairs) + pick_min
+            max_col = 2 * np.arange(n_pairs) + pick_max
+
+            self.levels.append((arg_min[rows, min_col], v_min[rows, min_col],
+                                arg_max[rows, max_col], v_max[rows, max_col]))
+
+    def envelope(self, channel, start, stop, n_bins):
+        """
+        Min/max envelope of one channel over [start, stop)
+
+        Returns between 2 * n_bins and 4 * n_bins points (plus up to four for
+        partial bins at the edges), in the same (indices, values) form as
+        minmax_envelope.
+        """
+        stop = min(int(stop), self.n_samples)
+        start = max(0, min(int(start), stop))
+        samples_per_bin = (stop - start) / max(n_bins, 1)
+
+        if samples_per_bin < 2 * self.BASE_BIN or not self.levels:
+            return minmax_envelope(self.signals[channel], n_bins, start, stop)
+
+        # Coarsest level whose bins are no wider than a target bin
+        level = min(int(np.log2(samples_per_bin / self.BASE_BIN)), len(self.levels) - 1)
+        bin_size = self.BASE_BIN << level
+        first = -(-start // bin_size)
+        last = min(stop // bin_size, self.levels[level][0].shape[1])
+
+        arg_min, v_min, arg_max, v_max = (a[channel, first:last] for a in self.levels[level])
+        min_first = arg_min <= arg_max
+
+        indices = np.empty(2 * len(arg_min), dtype=np.int64)
+        values = np.empty(2 * len(arg_min), dtype=v_min.dtype)
+        indices[0::2] = np.where(min_first, arg_min, arg_max)
+        indices[1::2] = np.where(min_first, arg_max, arg_min)
+        values[0::2] = np.where(min_first, v_min, v_max)
+        values[1::2] = np.where(min_first, v_max, v_min)
+
+        # Partial bins at either edge are read from the samples; a carried last
+        # bin ends at n_covered rather than at a multiple of bin_size
+        head = minmax_envelope(self.signals[channel], 1, start, first * bin_size)
+        tail = minmax_envelope(self.signals[channel], 1, min(last * bin_size, self.n_covered), stop)
+        return (np.concatenate([head[0], indices, tail[0]]),
+                np.concatenate([head[1], values, tail[1]]))
@@ -0,0 +1,205 @@
+"""
+Long-lived model processes for background jobs
+
+Dash's DiskcacheManager starts a new process for every background job, so a
+job running a model itself would import TensorFlow or torch and load the
+weights again each time. Jobs instead hand their inputs to a bounded pool of
+inference processes that keep every model loaded between requests. Requests
+and results travel through the shared background cache:
+
+    inference_pool.register('sar-damage', predict_damage, warmup=get_model)
+    inference_pool.start()  # once, after every task is registered
+
+    # inside a background job
+    label = inference_pool.run('sar-damage', sar_data, set_progress=set_progress)
+
+Only the web worker holding the pool lease in the shared cache runs the pool;
+if it stops renewing the lease another worker starts its own.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+
+from viewers.common.background import background_cache, INFERENCE_CONCURRENCY, JOB_RESULT_EXPIRE
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_LEASE_SECONDS = 15  # a pool whose web worker stopped is replaced after this long
+INFERENCE_REQUEST_EXPIRE = 600  # seconds a request may wait for its result
+INFERENCE_POLL_SECONDS = 0.1
+
+
+class InferenceError(RuntimeError):
+    """A task failed in the pool, or no pool process answered"""
+
+
+class InferencePool:
+    """
+    Bounded pool of processes serving registered model tasks
+
+    The processes are forked from the web worker holding the lease, so they
+    inherit the registered functions; web workers never import TensorFlow or
+    torch, so no threaded state is inherited with them. Every process runs the
+    warmup functions once when it starts, then serves requests one at a time,
+    so at most `processes` models run at once across all workers.
+    """
+
+    LEASE_KEY = 'inference-pool-lease'
+    QUEUE = 'inference-queue'
+
+    def __init__(self, processes=INFERENCE_CONCURRENCY, cache=background_cache,
+                 lease_seconds=INFERENCE_LEASE_SECONDS):
+        self.processes = processes
+        self.cache = cache
+        self.lease_seconds = lease_seconds
+        self.owner_id = uuid.uuid4().hex
+        self._tasks = {}
+        self._workers = []
+        self._lease_thread = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def register(self, name, fn, warmup=None):
+        """
+        Make fn(*args, **kwargs) available as task `name`
+
+        Args:
+            name (str): Task name passed to run()
+            fn (callable): Runs the task in a pool process
+            warmup (callable): Called once in every pool process when it
+                starts, e.g. to load the model
+        """
+        if self._lease_thread is not None:
+            raise RuntimeError("Inference tasks must be registered before the pool starts")
+        self._tasks[name] = (fn, warmup)
+
+    def start(self):
+        """Join the web workers competing for the pool lease"""
+        with self._start_lock:
+            if self._lease_thread is None:
+                self._stop.clear()
+                self._renew_lease()  # the pool is up when start() returns
+                self._lease_thread = threading.Thread(target=self._hold_lease, name='inference-pool-lease',
+                                                      daemon=True)
+                self._lease_thread.start()
+
+    def stop(self):
+        """Stop the pool processes of this worker and release the lease"""
+        with self._start_lock:
+            thread, self._lease_thread = self._lease_thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def _renew_lease(self):
+        """Take or renew the lease; run the pool while holding it"""
+        with self.cache.transact():
+            owner = self.cache.get(self.LEASE_KEY)
+            is_owner = owner in (None, self.owner_id)
+            if is_owner:
+                self.cache.set(self.LEASE_KEY, self.owner_id, expire=self.lease_seconds)
+
+        if is_owner:
+            self._ensure_workers()
+        else:
+            self._stop_workers()
+
+    def _hold_lease(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            self._renew_lease()
+
+        self._stop_workers()
+        with self.cache.transact():
+            if self.cache.get(self.LEASE_KEY) == self.owner_id:
+                self.cache.delete(self.LEASE_KEY)
+
+    def _ensure_workers(self):
+        """Replace pool processes that exited"""
+        for worker in self._workers:
+            if not worker.is_alive():
+                logger.warning("Inference process %s exited with code %s", worker.pid, worker.exitcode)
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+
+        context = multiprocessing.get_context('fork')
+        while len(self._workers) < self.processes:
+            worker = context.Process(target=self._serve, name='inference-pool', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _stop_workers(self):
+        for worker in self._workers:
+            worker.terminate()
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def _serve(self):
+        """Pool process: warm up, then run queued requests until the web worker goes away"""
+        parent = os.getppid()
+        for name, (_, warmup) in self._tasks.items():
+            if warmup is not None:
+                try:
+                    warmup()
+                except Exception:
+                    logger.exception("Warming up inference task %s failed", name)
+
+        while os.getppid() == parent:
+            _, request = self.cache.pull(prefix=self.QUEUE)
+            if request is None:
+                time.sleep(INFERENCE_POLL_SECONDS)
+                continue
+
+            job_id, name, args, kwargs = request
+            self.cache.set(f'{self.QUEUE}-started-{job_id}', True, expire=INFERENCE_REQUEST_EXPIRE)
+            try:
+                if name not in self._tasks:
+                    raise KeyError(f"Unknown inference task {name!r}")
+                result = (True, self._tasks[name][0](*args, **kwargs))
+            except Exception as e:
+                logger.exception("Inference task %s failed", name)
+                result = (False, str(e))
+            self.cache.set(f'{self.QUEUE}-result-{job_id}', result, expire=JOB_RESULT_EXPIRE)
+
+    def run(self, name, *args, set_progress=None, timeout=INFERENCE_REQUEST_EXPIRE, **kwargs):
+        """
+        Run a registered task in the pool and wait for its result
+
+        Args:
+            name (str): Registered task name
+            *args, **kwargs: Arguments of the task, pickled into the shared cache
+            set_progress (callable): Progress setter of a background callback,
+                told when the request is queued and when a process picks it up
+            timeout (float): Seconds to wait before giving up
+
+        Raises:
+            InferenceError: If the task raised, or no pool process answered in time
+        """
+        if self.cache.get(self.LEASE_KEY) is None:
+            raise InferenceError("The inference pool is not running")
+
+        job_id = uuid.uuid4().hex
+        self.cache.push((job_id, name, args, kwargs), prefix=self.QUEUE, expire=timeout)
+        if set_progress:
+            set_progress("⏳ Waiting for a free inference process...")
+
+        started = False
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            result = self.cache.pop(f'{self.QUEUE}-result-{job_id}')
+            if result is not None:
+                success, value = result
+                if not success:
+                    raise InferenceError(value)
+                return value
+            if set_progress and not started and self.cache.get(f'{self.QUEUE}-started-{job_id}'):
+                started = True
+                set_progress("⚙️ Running model...")
+            time.sleep(INFERENCE_POLL_SECONDS)
+        raise InferenceError(f"No inference process answered within {timeout:.0f} s")
+
+
+# Shared by every viewer; started by main_app once all callbacks are registered
+inference_pool = InferencePool()
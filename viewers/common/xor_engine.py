@@ -0,0 +1,73 @@
+import numpy as np
+import plotly.graph_objs as go
+
+from viewers.common.decimation import minmax_envelope
+
+XOR_MAX_POINTS = 200000  # markers sent to the browser; denser results keep a min/max envelope
+
+
+def xor_chunks(signal, chunk_samples, threshold):
+    """
+    XOR of every pair of consecutive chunks in one vectorized pass
+
+    The signal is viewed as an (n_chunks, chunk_samples) matrix (a trailing
+    partial chunk is dropped). Consecutive rows are differenced at once and a
+    sample "survives the XOR" where the rows differ by at least threshold.
+
+    Args:
+        signal (np.ndarray): 1-D signal
+        chunk_samples (int): Samples per chunk
+        threshold (float): Differences below this value count as matching
+
+    Returns:
+        tuple: (n_chunks, pair, sample, value) - the number of chunks, and for
+            every differing point the pair index (chunk i vs i + 1), its sample
+            offset within the chunk and the absolute difference
+    """
+    signal = np.asarray(signal)
+    n_chunks = len(signal) // chunk_samples if chunk_samples > 0 else 0
+    if n_chunks < 2:
+        empty = np.array([], dtype=np.int64)
+        return n_chunks, empty, empty, np.array([], dtype=float)
+
+    chunks = signal[:n_chunks * chunk_samples].reshape(n_chunks, chunk_samples)
+    diff = np.abs(np.diff(chunks, axis=0))
+    pair, sample = np.nonzero(diff >= threshold)
+    return n_chunks, pair, sample, diff[pair, sample]
+
+
+def xor_trace(pair, sample, value, fs, max_points=XOR_MAX_POINTS, colorbar_title="Chunk pair"):
+    """
+    Single WebGL trace of an XOR result, colored by chunk pair
+
+    Args:
+        pair, sample, value (np.ndarray): Output of xor_chunks
+        fs (float): Sampling frequency, converts sample offsets to seconds
+        max_points (int): Upper bound on the markers drawn (about); denser
+            results are reduced to the min/max envelope of the differences in
+            (pair, sample) order, so peaks survive the thinning
+
+    Returns:
+        go.Scattergl: Markers at (time within chunk, difference)
+    """
+    if len(value) > max_points:
+        keep, _ = minmax_envelope(value, max_points // 2)
+        pair, sample, value = pair[keep], sample[keep], value[keep]
+
+    return go.Scattergl(
+        x=sample / fs,
+        y=value,
+        mode='markers',
+        name='XOR',
+        marker=dict(
+            size=4,
+            opacity=0.7,
+            color=pair + 1,  # pair k compares chunk k + 1 with chunk k + 2
+            colorscale='Turbo',
+            colorbar=dict(title=colorbar_title),
+            showscale=True
+        ),
+        customdata=pair + 1,
+        hovertemplate="Chunk %{customdata} ⊕ next<br>t = %{x:.3f}s<br>|Δ| = %{y:.3f}<extra></extra>",
+        showlegend=False
+    )
@@ -0,0 +1,285 @@
+"""
+Batch tools for the Doppler viewer
+
+Render grids of simulated pass-by scenarios to WAV files:
+
+    python -m viewers.doppler.batch generate --freqs 500 800 --speeds 40 60 80 \
+        --laterals 10 30 --out doppler_scenarios
+
+Estimate source frequency and speed for a directory (or zip) of recordings:
+
+    python -m viewers.doppler.batch analyze recordings.zip --out results.csv
+"""
+import argparse
+import csv
+import io
+import itertools
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from scipy.io import wavfile
+
+from viewers.doppler.callbacks.doppler_callbacks import (
+    generate_doppler_audio,
+    extract_smooth_doppler_frequencies,
+    predict_vehicle_speed,
+    estimate_source_frequency
+)
+
+SAMPLE_RATE = 44100
+PROFILE_POINTS = 2000  # rows written to each frequency profile CSV
+ANALYSIS_COLUMNS = [
+    'file', 'dominant_freq_hz', 'time_at_max_amp_s', 'source_freq_hz',
+    'predicted_speed_kmh', 'status', 'elapsed_s'
+]
+
+
+def _run_bounded(executor, fn, items, max_in_flight):
+    """Submit fn(*item) for each item, keeping at most max_in_flight pending; yield results"""
+    items = iter(items)
+    pending = set()
+    while True:
+        for item in itertools.islice(items, max_in_flight - len(pending)):
+            pending.add(executor.submit(fn, *item))
+        if not pending:
+            return
+
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def scenario_grid(source_freqs, speeds, laterals, speed_unit='kmh'):
+    """
+    Build every combination of source frequency, speed and lateral offset
+
+    Args:
+        source_freqs (list): Source frequencies in Hz
+        speeds (list): Vehicle speeds in speed_unit
+        laterals (list): Lateral distances from the road in meters
+        speed_unit (str): 'kmh' or 'ms'
+
+    Returns:
+        list: Scenario dicts with 'source_freq', 'speed_ms' and 'lateral'
+    """
+    scale = 1 / 3.6 if speed_unit == 'kmh' else 1.0
+    return [
+        {'source_freq': float(f), 'speed_ms': float(v) * scale, 'lateral': float(d)}
+        for f, v, d in itertools.product(source_freqs, speeds, laterals)
+    ]
+
+
+def scenario_name(scenario):
+    """File name stem of a scenario, e.g. doppler_800Hz_60kmh_30m"""
+    return (f"doppler_{scenario['source_freq']:g}Hz_"
+            f"{scenario['speed_ms'] * 3.6:g}kmh_{scenario['lateral']:g}m")
+
+
+def render_scenario(scenario, output_dir, sample_rate=SAMPLE_RATE, profile_points=PROFILE_POINTS):
+    """
+    Render one scenario to <name>.wav and a decimated <name>_profile.csv
+
+    Only small statistics are returned, so the audio never travels back to the
+    parent process.
+    """
+    start = time.perf_counter()
+    audio_data, freq_profile, time_array = generate_doppler_audio(
+        scenario['source_freq'], scenario['speed_ms'], scenario['lateral'], sample_rate
+    )
+
+    name = scenario_name(scenario)
+    wavfile.write(os.path.join(output_dir, f"{name}.wav"), sample_rate, audio_data)
+
+    idx = np.unique(np.linspace(0, len(freq_profile) - 1, profile_points).astype(int))
+    np.savetxt(
+        os.path.join(output_dir, f"{name}_profile.csv"),
+        np.column_stack((time_array[idx], freq_profile[idx])),
+        delimiter=',', header='time_s,observed_freq_hz', comments='', fmt='%.6f'
+    )
+
+    return {
+        **scenario,
+        'name': name,
+        'audio_seconds': len(audio_data) / sample_rate,
+        'elapsed': time.perf_counter() - start
+    }
+
+
+def generate_batch(scenarios, output_dir, workers=None, sample_rate=SAMPLE_RATE,
+                   profile_points=PROFILE_POINTS, max_in_flight=None, progress=None):
+    """
+    Render scenarios over a process pool
+
+    Args:
+        scenarios (list): Scenario dicts, see scenario_grid
+        output_dir (str): Directory receiving the WAV and CSV files
+        workers (int): Number of worker processes (None = CPU count)
+        sample_rate (int): Audio sample rate
+        profile_points (int): Rows written to each frequency profile CSV
+        max_in_flight (int): Maximum submitted but unfinished scenarios
+            (None = 2 per worker); bounds the memory held by pending results
+        progress (callable): Called with each finished scenario's result
+
+    Returns:
+        dict: 'results' plus throughput figures ('elapsed', 'scenarios_per_second',
+            'audio_seconds', 'realtime_factor')
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+
+    start = time.perf_counter()
+    results = []
+    jobs = ((scenario, output_dir, sample_rate, profile_points) for scenario in scenarios)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in _run_bounded(executor, render_scenario, jobs, max_in_flight):
+            results.append(result)
+            if progress:
+                progress(result)
+
+    elapsed = time.perf_counter() - start
+    audio_seconds = sum(r['audio_seconds'] for r in results)
+    return {
+        'results': results,
+        'elapsed': elapsed,
+        'scenarios_per_second': len(results) / elapsed if elapsed else 0.0,
+        'audio_seconds': audio_seconds,
+        'realtime_factor': audio_seconds / elapsed if elapsed else 0.0
+    }
+
+
+def list_recordings(source):
+    """
+    List the WAV recordings in a directory or zip archive
+
+    Returns:
+        list: (archive, path) pairs; archive is the zip file and path the member
+            inside it, or archive is None and path is a file on disk
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            members = [m for m in zf.namelist() if m.lower().endswith('.wav')]
+        return [(source, m) for m in sorted(members)]
+
+    paths = []
+    for root, _, files in os.walk(source):
+        paths.extend(os.path.join(root, f) for f in files if f.lower().endswith('.wav'))
+    return [(None, p) for p in sorted(paths)]
+
+
+def analyze_recording(archive, path, nperseg=512):
+    """
+    Extract the Doppler frequency of one recording and estimate its speed
+
+    Errors are reported in the 'status' column so one bad file does not stop a batch.
+    """
+    start = time.perf_counter()
+    row = dict.fromkeys(ANALYSIS_COLUMNS)
+    row['file'] = path
+
+    try:
+        if archive is None:
+            sample_rate, audio_data = wavfile.read(path)
+        else:
+            with zipfile.ZipFile(archive) as zf:
+                sample_rate, audio_data = wavfile.read(io.BytesIO(zf.read(path)))
+
+        _, _, _, freq_at_max_amp, time_at_max_amp = \
+            extract_smooth_doppler_frequencies(audio_data, sample_rate, nperseg)
+        row['dominant_freq_hz'] = round(float(freq_at_max_amp), 3)
+        row['time_at_max_amp_s'] = round(float(time_at_max_amp), 3)
+
+        predicted_speed_kmh = predict_vehicle_speed(os.path.basename(path))
+        row['predicted_speed_kmh'] = round(predicted_speed_kmh, 2)
+        row['source_freq_hz'] = round(estimate_source_frequency(freq_at_max_amp, predicted_speed_kmh), 2)
+        row['status'] = 'ok'
+    except Exception as e:
+        row['status'] = str(e)
+
+    row['elapsed_s'] = round(time.perf_counter() - start, 4)
+    return row
+
+
+def analyze_batch(source, output_csv, workers=None, nperseg=512, max_in_flight=None, progress=None):
+    """
+    Analyze every recording in a directory or zip and write one CSV row per file
+
+    Rows are written as soon as each file finishes, so memory stays bounded for
+    large collections; they therefore appear in completion order.
+
+    Returns:
+        dict: 'files', 'failed', 'elapsed' and 'files_per_second'
+    """
+    recordings = list_recordings(source)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+
+    start = time.perf_counter()
+    n_files = n_failed = 0
+    jobs = ((archive, path, nperseg) for archive, path in recordings)
+
+    with open(output_csv, 'w', newline='') as f, ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(f, fieldnames=ANALYSIS_COLUMNS)
+        writer.writeheader()
+        for row in _run_bounded(executor, analyze_recording, jobs, max_in_flight):
+            writer.writerow(row)
+            n_files += 1
+            n_failed += row['status'] != 'ok'
+            if progress:
+                progress(row)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'files': n_files,
+        'failed': n_failed,
+        'elapsed': elapsed,
+        'files_per_second': n_files / elapsed if elapsed else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch tools for the Doppler viewer")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="Render a grid of simulated pass-bys")
+    generate.add_argument('--freqs', type=float, nargs='+', default=[800.0], help="Source frequencies (Hz)")
+    generate.add_argument('--speeds', type=float, nargs='+', default=[60.0], help="Vehicle speeds")
+    generate.add_argument('--speed-unit', choices=['kmh', 'ms'], default='kmh')
+    generate.add_argument('--laterals', type=float, nargs='+', default=[30.0], help="Lateral offsets (m)")
+    generate.add_argument('--out', required=True, help="Output directory")
+    generate.add_argument('--workers', type=int, default=None)
+    generate.add_argument('--sample-rate', type=int, default=SAMPLE_RATE)
+
+    analyze = commands.add_parser('analyze', help="Estimate speeds for a directory or zip of recordings")
+    analyze.add_argument('source', help="Directory or zip of Vehicle_speed.wav recordings")
+    analyze.add_argument('--out', required=True, help="Output CSV file")
+    analyze.add_argument('--workers', type=int, default=None)
+    analyze.add_argument('--nperseg', type=int, default=512, help="Spectrogram segment length")
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        scenarios = scenario_grid(args.freqs, args.speeds, args.laterals, args.speed_unit)
+        summary = generate_batch(
+            scenarios, args.out, workers=args.workers, sample_rate=args.sample_rate,
+            progress=lambda r: print(f"{r['name']}: {r['audio_seconds']:.1f} s of audio "
+                                     f"in {r['elapsed']:.2f} s")
+        )
+        print(f"{len(summary['results'])} scenarios in {summary['elapsed']:.2f} s "
+              f"({summary['scenarios_per_second']:.2f} scenarios/s, "
+              f"{summary['realtime_factor']:.1f}x realtime)")
+
+    elif args.command == 'analyze':
+        summary = analyze_batch(
+            args.source, args.out, workers=args.workers, nperseg=args.nperseg,
+            progress=lambda r: print(f"{r['file']}: {r['status']} ({r['elapsed_s']:.2f} s)")
+        )
+        print(f"{summary['files']} files ({summary['failed']} failed) in {summary['elapsed']:.2f} s "
+              f"({summary['files_per_second']:.2f} files/s) -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,5 @@
-import dash
 from dash import dcc, html, Input, Output, State
 import dash_bootstrap_components as dbc
-import h5py
 import numpy as np
 import base64
 import io
@@ -10,8 +8,11 @@ from scipy.io import wavfile
 from scipy import signal
 from werkzeug.utils import secure_filename
 import plotly.graph_objs as go
+import json
 import math
 import time
+from viewers.common.audio_store import audio_store
+from viewers.doppler.speed_index import SpeedIndex
 from viewers.doppler.layout.doppler_layout import*
 
 
@@ -41,15 +42,25 @@ VEHICLE_NAME_MAP = {
     "VWPassat": "VWPassat"
 }
 
+MAX_TIMELINE_FRAMES = 10000  # keeps the timeline store small for very slow trips
+
+CAR_STYLE = {
+    'position': 'absolute',
+    'left': '10%',
+    'top': '50%',
+    'fontSize': '50px',
+    'transform': 'translateY(-50%)',
+    'filter': 'drop-shadow(2px 2px 4px rgba(0,0,0,0.3))',
+    'transition': 'left 0.04s linear'
+}
+
 
 # =============================================================================
 # DATA LOADING
 # =============================================================================
 
-try:
-    hf = h5py.File(H5_FILENAME, 'r')
-except:
-    hf = None
+# Vehicles are read lazily; the H5 file is never held open across workers
+speed_index = SpeedIndex(H5_FILENAME)
 
 
 # =============================================================================
@@ -86,71 +97,42 @@ def generate_doppler_audio(source_freq, speed_ms, lateral_offset, sample_rate=44
     car_positions = START_X + speed_ms * time_array
     
     # Calculate observed frequency and spatial parameters at each position
-    freq_profile = np.zeros(num_samples)
-    pan_profile = np.zeros(num_samples)  # -1 (left) to +1 (right)
-    distance_profile = np.zeros(num_samples)
+    freq_profile, _, distance_profile = compute_observed_freq_profile(
+        source_freq, speed_ms, car_positions, OBSERVER_X, lateral_offset
+    )
     
-    for i, car_x in enumerate(car_positions):
-        f_obs, _, r = compute_observed_freq(
-            source_freq, speed_ms, car_x, OBSERVER_X, lateral_offset
-        )
-        freq_profile[i] = f_obs
-        distance_profile[i] = r
-        
-        # Calculate stereo panning based on car position
-        # When car is at START_X (left), pan = -1
-        # When car is at OBSERVER_X (center), pan = 0
-        # When car is at END_X (right), pan = +1
-        pan_profile[i] = (car_x - OBSERVER_X) / (TOTAL_DISTANCE / 2)
-        pan_profile[i] = np.clip(pan_profile[i], -1, 1)
+    # Calculate stereo panning based on car position
+    # When car is at START_X (left), pan = -1
+    # When car is at OBSERVER_X (center), pan = 0
+    # When car is at END_X (right), pan = +1
+    pan_profile = np.clip((car_positions - OBSERVER_X) / (TOTAL_DISTANCE / 2), -1, 1)
     
     # Normalize distance for amplitude calculation (closer = louder)
     min_distance = np.min(distance_profile)
     max_distance = np.max(distance_profile)
     
-    # Generate audio with varying frequency using phase accumulation
-    phase = 0
-    audio_mono = np.zeros(num_samples)
-    
-    for i in range(num_samples):
-        # Current instantaneous frequency
-        inst_freq = freq_profile[i]
-        
-        # Generate sample
-        audio_mono[i] = np.sin(phase)
-        
-        # Update phase for next sample
-        phase += 2 * np.pi * inst_freq / sample_rate
-        
-        # Keep phase in reasonable range to prevent numerical issues
-        if phase > 2 * np.pi * 1000:
-            phase = phase % (2 * np.pi)
+    # Generate audio with varying frequency using phase accumulation:
+    # each sample uses the phase accumulated by all previous samples
+    phase_step = 2 * np.pi * freq_profile / sample_rate
+    phase = np.concatenate(([0.0], np.cumsum(phase_step)[:-1]))
+    audio_mono = np.sin(np.mod(phase, 2 * np.pi))
     
     # Apply distance-based amplitude envelope (inverse square law simplified)
-    amplitude_profile = np.zeros(num_samples)
-    for i in range(num_samples):
-        # Normalize distance to 0-1 range, then invert for amplitude
-        norm_dist = (distance_profile[i] - min_distance) / max(max_distance - min_distance, 1)
-        amplitude_profile[i] = 1.0 - 0.6 * norm_dist  # Reduce amplitude by up to 60% at max distance
+    # Normalize distance to 0-1 range, then invert for amplitude
+    norm_dist = (distance_profile - min_distance) / max(max_distance - min_distance, 1)
+    amplitude_profile = 1.0 - 0.6 * norm_dist  # Reduce amplitude by up to 60% at max distance
     
     audio_mono = audio_mono * amplitude_profile
     
-    # Create stereo audio with panning
-    audio_stereo = np.zeros((num_samples, 2))
-    
-    for i in range(num_samples):
-        pan = pan_profile[i]  # -1 to +1
-        
-        # Equal power panning law
-        # pan = -1: full left (L=1, R=0)
-        # pan = 0: center (L=0.707, R=0.707)
-        # pan = +1: full right (L=0, R=1)
-        pan_angle = (pan + 1) * np.pi / 4  # Convert to 0 to pi/2
-        left_gain = np.cos(pan_angle)
-        right_gain = np.sin(pan_angle)
-        
-        audio_stereo[i, 0] = audio_mono[i] * left_gain   # Left channel
-        audio_stereo[i, 1] = audio_mono[i] * right_gain  # Right channel
+    # Create stereo audio with equal power panning law
+    # pan = -1: full left (L=1, R=0)
+    # pan = 0: center (L=0.707, R=0.707)
+    # pan = +1: full right (L=0, R=1)
+    pan_angle = (pan_profile + 1) * np.pi / 4  # Convert to 0 to pi/2
+    audio_stereo = np.column_stack((
+        audio_mono * np.cos(pan_angle),  # Left channel
+        audio_mono * np.sin(pan_angle)   # Right channel
+    ))
     
     # Normalize audio to prevent clipping
     max_val = np.max(np.abs(audio_stereo))
@@ -163,13 +145,11 @@ def generate_doppler_audio(source_freq, speed_ms, lateral_offset, sample_rate=44
     return audio_data_int16, freq_profile, time_array
 
 
-def audio_array_to_base64(audio_data, sample_rate=44100):
-    """Convert audio numpy array to base64 encoded WAV string."""
+def audio_array_to_url(audio_data, sample_rate=44100):
+    """Write audio numpy array to the audio store and return its URL."""
     buffer = io.BytesIO()
     wavfile.write(buffer, sample_rate, audio_data)
-    buffer.seek(0)
-    audio_base64 = base64.b64encode(buffer.read()).decode()
-    return f"data:audio/wav;base64,{audio_base64}"
+    return audio_store.put(buffer.getvalue(), '.wav')
 
 
 # =============================================================================
@@ -298,181 +278,104 @@ def compute_observed_freq(source_f, speed_ms, car_x, observer_x, lateral):
     
     return f_obs, v_radial, r
 
-def compute_source_frequency(filename, freq_at_max_amp):
-    """Compute source frequency and predicted velocity from filename and observed frequency."""
-    if hf is None:
-        return "H5 file not available", "N/A"
+def estimate_source_frequency(freq_observed, speed_kmh):
+    """Invert the Doppler shift at closest approach: f_source = f_observed * (c - v) / c."""
+    speed_ms = speed_kmh / 3.6
+    return freq_observed * (SOUND_SPEED - speed_ms) / SOUND_SPEED
+
+def predict_vehicle_speed(filename):
+    """
+    Look up the model's predicted speed (km/h) for a `Vehicle_speed.wav` recording.
+    
+    Raises:
+        ValueError: With a user-facing message if no prediction is available
+    """
+    if not speed_index.available:
+        raise ValueError("H5 file not available")
     
     basename = secure_filename(filename)
     match = re.match(r"([A-Za-z0-9]+)_(\d+)", basename)
     
     if not match:
-        return "Invalid filename format", "N/A"
+        raise ValueError("Invalid filename format")
     
     vehicle_name, gt_speed_str = match.groups()
     gt_speed = int(gt_speed_str)
     
     if vehicle_name not in VEHICLE_NAME_MAP:
-        return "Vehicle is not present", "N/A"
+        raise ValueError("Vehicle is not present")
     
     vehicle_h5_key = VEHICLE_NAME_MAP[vehicle_name]
     
     try:
-        speed_est = np.array(hf[vehicle_h5_key + '_speeds_est_all'], dtype=np.float64)
-        speed_gt = np.array(hf[vehicle_h5_key + '_speeds_gt'], dtype=int)
-    except:
-        return "Data not found in H5 file", "N/A"
+        predicted_speed_kmh = speed_index.lookup(vehicle_h5_key, gt_speed)
+    except (KeyError, OSError):
+        raise ValueError("Data not found in H5 file")
     
-    if gt_speed not in speed_gt:
-        return "GT speed not found in H5", "N/A"
+    if predicted_speed_kmh is None:
+        raise ValueError("GT speed not found in H5")
     
-    # Get predicted speed
-    gt_index = np.where(speed_gt == gt_speed)[0][0]
-    predicted_speed_kmh = speed_est[19][gt_index]
-    predicted_speed_ms = predicted_speed_kmh / 3.6
+    return predicted_speed_kmh
+
+def compute_source_frequency(filename, freq_at_max_amp):
+    """Compute source frequency and predicted velocity from filename and observed frequency."""
+    try:
+        predicted_speed_kmh = predict_vehicle_speed(filename)
+    except ValueError as e:
+        return str(e), "N/A"
     
-    # Doppler formula: f_source = f_observed * (c - v) / c
-    source_freq = freq_at_max_amp * (SOUND_SPEED - predicted_speed_ms) / SOUND_SPEED
+    source_freq = estimate_source_frequency(freq_at_max_amp, predicted_speed_kmh)
     
     return (
         f"{source_freq:.2f} Hz",
         f"{predicted_speed_kmh:.2f} km/h"
     )
 
-def get_initial_animation_state():
-    """Return initial animation state."""
-    style = {
-        'position': 'absolute',
-        'left': '10%',
-        'top': '50%',
-        'fontSize': '50px',
-        'transform': 'translateY(-50%)',
-        'filter': 'drop-shadow(2px 2px 4px rgba(0,0,0,0.3))',
-        'transition': 'left 0.04s linear'
-    }
-    return (
-        True,
-        'stopped',
-        '0',
-        f"{START_X:.1f} m",
-        "0.00 s",
-        "--- Hz",
-        "Click START",
-        style
-    )
-
-
-def handle_start_stop(anim_state, speed_val, speed_unit, speed_ms, 
-                      lateral, source_f):
-    """Handle start/stop button press."""
-    style = {
-        'position': 'absolute',
-        'left': '10%',
-        'top': '50%',
-        'fontSize': '50px',
-        'transform': 'translateY(-50%)',
-        'filter': 'drop-shadow(2px 2px 4px rgba(0,0,0,0.3))',
-        'transition': 'left 0.04s linear'
-    }
+def compute_observed_freq_profile(source_f, speed_ms, car_x, observer_x, lateral):
+    """Vectorized compute_observed_freq over an array of car positions."""
+    dx = observer_x - np.asarray(car_x, dtype=np.float64)
+    r = np.hypot(dx, lateral)
     
-    if anim_state == 'stopped':
-        # Start animation
-        ts = time.time()
-        car_x0 = START_X
-        f0, _, _ = compute_observed_freq(source_f, speed_ms, car_x0, OBSERVER_X, lateral)
-        
-        info = ""
-        
-        return (
-            False,
-            'running',
-            str(ts),
-            f"{car_x0:.1f} m",
-            "0.00 s",
-            f"{f0:.2f} Hz",
-            info,
-            style
-        )
-    else:
-        # Stop animation
-        return (
-            True,
-            'stopped',
-            '0',
-            f"{START_X:.1f} m",
-            "0.00 s",
-            "--- Hz",
-            "",
-            style
-        )
+    # Calculate radial velocity component
+    v_radial = np.where(r == 0, 0.0, speed_ms * dx / np.where(r == 0, 1.0, r))
+    
+    # Doppler formula: f_obs = f_source * (c / (c - v_radial))
+    denom = SOUND_SPEED - v_radial
+    denom = np.where(np.abs(denom) < 1e-9, np.copysign(1e-9, denom), denom)
+    
+    f_obs = source_f * (SOUND_SPEED / denom)
+    
+    return f_obs, v_radial, r
 
 
-def handle_animation_step(start_ts, n_intervals, speed_ms, source_f, lateral):
-    """Handle animation step during running state."""
-    # Calculate elapsed time
-    try:
-        ts = float(start_ts)
-        t = time.time() - ts
-    except:
-        t = n_intervals / DISPLAY_HZ
-    
-    # Calculate car position
-    car_x = START_X + speed_ms * t
-    
-    # Check if trip is finished
-    if speed_ms > 0 and car_x >= END_X:
-        style = {
-            'position': 'absolute',
-            'left': '90%',
-            'top': '50%',
-            'fontSize': '50px',
-            'transform': 'translateY(-50%)',
-            'filter': 'drop-shadow(2px 2px 4px rgba(0,0,0,0.3))',
-            'transition': 'left 0.04s linear'
-        }
-        trip_duration = (END_X - START_X) / max(speed_ms, 1e-9)
-        return (
-            True,
-            'stopped',
-            '0',
-            f"{END_X:.1f} m",
-            f"{trip_duration:.2f} s",
-            "--- Hz",
-            "",
-            style
-        )
+def compute_animation_timeline(source_f, speed_ms, lateral, display_hz=DISPLAY_HZ):
+    """
+    Precompute car position, observed frequency and screen position for a whole trip.
     
-    # Calculate observed frequency
-    f_obs, v_radial, r = compute_observed_freq(
-        source_f, speed_ms, car_x, OBSERVER_X, lateral
-    )
+    The timeline is sampled at display_hz (capped at MAX_TIMELINE_FRAMES frames) and
+    played back in the browser, so the server is not polled while the car moves.
+    """
+    if speed_ms <= 0:
+        speed_ms = 0.01  # Prevent division by zero, as generate_doppler_audio does
     
-    # Update car position on screen
-    frac = (car_x - START_X) / TOTAL_DISTANCE
-    left_pct = 10 + frac * 80
-    
-    style = {
-        'position': 'absolute',
-        'left': f'{left_pct}%',
-        'top': '50%',
-        'fontSize': '50px',
-        'transform': 'translateY(-50%)',
-        'filter': 'drop-shadow(2px 2px 4px rgba(0,0,0,0.3))',
-        'transition': 'left 0.04s linear'
+    trip_duration = TOTAL_DISTANCE / speed_ms
+    n_frames = min(int(trip_duration * display_hz) + 1, MAX_TIMELINE_FRAMES)
+    time_array = np.linspace(0, trip_duration, n_frames)
+    
+    car_x = START_X + speed_ms * time_array
+    f_obs, _, _ = compute_observed_freq_profile(source_f, speed_ms, car_x, OBSERVER_X, lateral)
+    left_pct = 10 + (car_x - START_X) / TOTAL_DISTANCE * 80
+    
+    return {
+        'started': time.time(),  # makes every START a new store value
+        'dt': trip_duration / max(n_frames - 1, 1),
+        'duration': trip_duration,
+        'x': np.round(car_x, 1).tolist(),
+        'f': np.round(f_obs, 3).tolist(),
+        'left': np.round(left_pct, 2).tolist(),
+        'style': CAR_STYLE
     }
-    
-    info = ""
-    
-    return (
-        False,
-        'running',
-        start_ts,
-        f"{car_x:.1f} m",
-        f"{t:.2f} s",
-        f"{f_obs:.3f} Hz",
-        info,
-        style
-    )
+
 
 # =============================================================================
 # CALLBACKS
@@ -607,7 +510,8 @@ def doppler_callbacks(app):
             return html.Div(), ""
         
         try:
-            # Store the audio data
+            # Store the audio once and let the browser stream it by URL
+            audio_url = audio_store.put_upload(contents, filename)
             return (
                 dbc.Card([
                     dbc.CardBody([
@@ -721,7 +625,7 @@ def doppler_callbacks(app):
                             # Hidden HTML5 audio element
                             html.Audio(
                                 id='html5-audio-player',
-                                src=contents,
+                                src=audio_url,
                                 style={'display': 'none'}
                             ),
                             
@@ -734,7 +638,7 @@ def doppler_callbacks(app):
                         ])
                     ])
                 ], style={**CARD_STYLE, 'background': 'linear-gradient(145deg, #ffffff 0%, #f8f9fa 100%)'}),
-                contents
+                audio_url
             )
             
         except Exception as e:
@@ -771,15 +675,16 @@ def doppler_callbacks(app):
                 source_f, speed_ms, lateral
             )
             
-            # Convert to base64 for audio player
-            audio_base64 = audio_array_to_base64(audio_data)
+            # Store the WAV and hand the player its URL
+            audio_url = audio_array_to_url(audio_data)
             
             # Create audio player
             audio_player = html.Div([
                 html.H4("Generated Doppler Audio (Stereo)", style={'color': 'green'}),
                 html.P("🎧 Use headphones for best spatial effect!", style={'fontStyle': 'italic', 'color': '#666'}),
                 html.Audio(
-                    src=audio_base64,
+                    id='generated-audio-player',
+                    src=audio_url,
                     controls=True,
                     style={'width': '80%'}
                 )
@@ -848,48 +753,22 @@ def doppler_callbacks(app):
             return go.Figure(), "", f"Error: {str(e)}", ""
 
     @app.callback(
-        [
-            Output('interval', 'disabled'),
-            Output('animation-state', 'children'),
-            Output('start-ts', 'children'),
-            Output('car-pos-display', 'children'),
-            Output('time-display', 'children'),
-            Output('freq-display', 'children'),
-            Output('info', 'children'),
-            Output('car-emoji', 'style')
-        ],
-        [
-            Input('start-button', 'n_clicks'),
-            Input('interval', 'n_intervals')
-        ],
+        Output('animation-timeline', 'data'),
+        Input('start-button', 'n_clicks'),
         [
             State('animation-state', 'children'),
             State('speed-input', 'value'),
             State('speed-unit', 'value'),
             State('source-freq', 'value'),
-            State('lateral-input', 'value'),
-            State('start-ts', 'children')
-        ]
+            State('lateral-input', 'value')
+        ],
+        prevent_initial_call=True
     )
-    def update_animation(
-        n_clicks,
-        n_intervals,
-        anim_state,
-        speed_input,
-        speed_unit,
-        source_freq,
-        lateral_offset,
-        start_ts
-    ):
-        """Update animation state and car position."""
-        ctx = dash.callback_context
-        
-        # Initial state
-        if not ctx.triggered:
-            return get_initial_animation_state()
-        
-        # Parse trigger
-        trig = ctx.triggered[0]['prop_id'].split('.')[0]
+    def toggle_animation(n_clicks, anim_state, speed_input, speed_unit,
+                         source_freq, lateral_offset):
+        """Compute the trip timeline on START, clear it on STOP."""
+        if anim_state == 'running':
+            return None
         
         # Parse inputs with defaults
         try:
@@ -901,14 +780,96 @@ def doppler_callbacks(app):
         
         speed_ms = speed_val / 3.6 if speed_unit == 'kmh' else speed_val
         
-        # Handle start/stop button
-        if trig == 'start-button':
-            return handle_start_stop(anim_state, speed_val, speed_unit, speed_ms, 
-                                    lateral, source_f)
-        
-        # Handle animation step
-        if trig == 'interval' and anim_state == 'running':
-            return handle_animation_step(start_ts, n_intervals, speed_ms, 
-                                        source_f, lateral)
-        
-        return dash.no_update
\ No newline at end of file
+        return compute_animation_timeline(source_f, speed_ms, lateral)
+
+    # Client-side callback that starts or resets playback when the timeline changes
+    app.clientside_callback(
+        """
+        function(timeline) {
+            var audio = document.getElementById('generated-audio-player');
+            if (!timeline) {
+                if (audio) {
+                    audio.pause();
+                }
+                return [true, 'stopped', '0', '__START_X__ m', '0.00 s', '--- Hz',
+                        'Click START', __CAR_STYLE__];
+            }
+            
+            // Play the generated audio from the start so sound and car stay in sync
+            if (audio) {
+                audio.currentTime = 0;
+                var playing = audio.play();
+                if (playing) {
+                    playing.catch(function() {});
+                }
+            }
+            
+            var style = Object.assign({}, timeline.style, {'left': timeline.left[0] + '%'});
+            return [false, 'running', String(Date.now() / 1000),
+                    timeline.x[0].toFixed(1) + ' m', '0.00 s',
+                    timeline.f[0].toFixed(2) + ' Hz', '', style];
+        }
+        """.replace('__START_X__', f"{START_X:.1f}").replace('__CAR_STYLE__', json.dumps(CAR_STYLE)),
+        [
+            Output('interval', 'disabled'),
+            Output('animation-state', 'children'),
+            Output('start-ts', 'children'),
+            Output('car-pos-display', 'children'),
+            Output('time-display', 'children'),
+            Output('freq-display', 'children'),
+            Output('info', 'children'),
+            Output('car-emoji', 'style')
+        ],
+        Input('animation-timeline', 'data')
+    )
+
+    # Client-side callback that plays the timeline back at DISPLAY_HZ
+    app.clientside_callback(
+        """
+        function(n_intervals, timeline, animState, startTs) {
+            var noUpdate = window.dash_clientside.no_update;
+            if (!timeline || animState !== 'running') {
+                return [noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate];
+            }
+            
+            // Follow the generated audio while it plays, otherwise the wall clock
+            var t;
+            var audio = document.getElementById('generated-audio-player');
+            if (audio && !audio.paused && !audio.ended) {
+                t = audio.currentTime;
+            } else {
+                t = Date.now() / 1000 - parseFloat(startTs);
+            }
+            
+            var style = Object.assign({}, timeline.style);
+            
+            // Check if trip is finished
+            if (t >= timeline.duration) {
+                style.left = '90%';
+                return [true, 'stopped', '__END_X__ m',
+                        timeline.duration.toFixed(2) + ' s', '--- Hz', '', style];
+            }
+            
+            var i = Math.min(Math.max(Math.round(t / timeline.dt), 0), timeline.x.length - 1);
+            style.left = timeline.left[i] + '%';
+            return [false, noUpdate, timeline.x[i].toFixed(1) + ' m', t.toFixed(2) + ' s',
+                    timeline.f[i].toFixed(3) + ' Hz', noUpdate, style];
+        }
+        """.replace('__END_X__', f"{END_X:.1f}"),
+        [
+            Output('interval', 'disabled', allow_duplicate=True),
+            Output('animation-state', 'children', allow_duplicate=True),
+            Output('car-pos-display', 'children', allow_duplicate=True),
+            Output('time-display', 'children', allow_duplicate=True),
+            Output('freq-display', 'children', allow_duplicate=True),
+            Output('info', 'children', allow_duplicate=True),
+            Output('car-emoji', 'style', allow_duplicate=True)
+        ],
+        Input('interval', 'n_intervals'),
+        [
+            State('animation-timeline', 'data'),
+            State('animation-state', 'children'),
+            State('start-ts', 'children')
+        ],
+        prevent_initial_call=True
+    )
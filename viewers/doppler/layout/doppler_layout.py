@@ -569,6 +569,7 @@ def create_generation_layout():
             n_intervals=0,
             disabled=True
         ),
+        dcc.Store(id='animation-timeline'),
         html.Div(id='animation-state', children='stopped', style={'display': 'none'}),
         html.Div(id='start-ts', children='0', style={'display': 'none'}),
         
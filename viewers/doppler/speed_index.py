@@ -0,0 +1,60 @@
+import os
+import threading
+
+import h5py
+import numpy as np
+from viewers.doppler.layout.doppler_layout import H5_FILENAME
+
+ESTIMATE_ROW = 19  # row of _speeds_est_all holding the final model's predictions
+
+
+class SpeedIndex:
+    """
+    Ground-truth speed -> predicted speed lookup for every vehicle in the H5 file
+
+    Each vehicle is read the first time it is requested and kept as a plain
+    dict, so later lookups are O(1). The H5 file is only opened while a vehicle
+    is being loaded, so no file handle is shared between forked workers.
+    """
+
+    def __init__(self, filename=H5_FILENAME):
+        self.filename = filename
+        self._vehicles = {}
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        """Whether the H5 file exists"""
+        return os.path.exists(self.filename)
+
+    def speeds(self, vehicle):
+        """
+        Return the {gt_speed: predicted_speed_kmh} map of a vehicle
+
+        Raises:
+            KeyError: If the vehicle has no speed datasets in the H5 file
+        """
+        speeds = self._vehicles.get(vehicle)
+        if speeds is not None:
+            return speeds
+
+        with self._lock:
+            if vehicle not in self._vehicles:
+                self._vehicles[vehicle] = self._load(vehicle)
+            return self._vehicles[vehicle]
+
+    def lookup(self, vehicle, gt_speed):
+        """Return the predicted speed (km/h) for a ground-truth speed, or None"""
+        return self.speeds(vehicle).get(int(gt_speed))
+
+    def _load(self, vehicle):
+        with h5py.File(self.filename, 'r') as hf:
+            speed_est = np.asarray(hf[vehicle + '_speeds_est_all'][ESTIMATE_ROW], dtype=np.float64)
+            speed_gt = np.asarray(hf[vehicle + '_speeds_gt'], dtype=int)
+
+        speeds = {}
+        for gt, predicted in zip(speed_gt.tolist(), speed_est.tolist()):
+            # Keep the first entry for repeated speeds, as np.where(...)[0][0] did
+            speeds.setdefault(gt, predicted)
+        return speeds
+
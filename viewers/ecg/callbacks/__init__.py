@@ -4,6 +4,7 @@ Callbacks package initialization for ECG Viewer
 from .interval import register_interval_callbacks
 from .ui_control import register_ui_callbacks
 from .graph import register_graph_callbacks
+from .records import register_record_callbacks
 
 
 def register_all_callbacks(app, data_loader, predictor):
@@ -18,11 +19,13 @@ def register_all_callbacks(app, data_loader, predictor):
     register_interval_callbacks(app)
     register_ui_callbacks(app)
     register_graph_callbacks(app, data_loader, predictor)
+    register_record_callbacks(app, data_loader)
 
 
 __all__ = [
     'register_interval_callbacks',
     'register_ui_callbacks',
     'register_graph_callbacks',
+    'register_record_callbacks',
     'register_all_callbacks'
 ]
\ No newline at end of file
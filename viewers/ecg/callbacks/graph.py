@@ -1,8 +1,12 @@
 import os
+import time
 import dash
 import numpy as np
 import plotly.graph_objs as go
-from dash import Input, Output, State
+from dash import Input, Output, State, html
+from flask import jsonify
+from viewers.common.background import background_manager
+from viewers.common.inference_pool import InferenceError, inference_pool
 from viewers.ecg.config import (
     SAMPLING_FREQUENCY,
     STATIC_DURATION,
@@ -16,26 +20,55 @@ from viewers.ecg.config import (
     DEFAULT_COLORMAP,
     XOR_CHUNKS_DEFAULT_PERIOD,
     XOR_CHUNKS_DEFAULT_DURATION,
-    POLAR_DEFAULT_WINDOW
+    POLAR_DEFAULT_WINDOW,
+    GRID_PAGE_SIZE,
+    STREAM_BPM_SECONDS
 )
 from viewers.ecg.utils.signal_processing import get_heartbeat_info
+from viewers.ecg.utils.polar_buffer import PolarBufferStore
+from viewers.ecg.utils.figure_cache import FigureCache
+from viewers.ecg.models.prediction_cache import PredictionCache
+from viewers.ecg.callbacks.records import search_records
+from viewers.ecg.data.stream import LiveECGStream
 from viewers.ecg.utils.visualization import (
     create_static_dynamic_plot,
     create_continuous_plot,
     create_xor_chunks_plot,
     create_polar_new_plot,
-    create_phase_space_plot_with_colormap, create_polar_time_domain_plot
+    create_phase_space_plot_with_colormap, create_polar_time_domain_plot,
+    create_grid_plot
 )
 
 
 def register_graph_callbacks(app, data_loader, predictor):
     """Register all graph callbacks"""
 
+    # Cumulative polar history stays on the server, one ring buffer per browser session
+    # in the cache shared by all workers
+    polar_buffers = PolarBufferStore()
+
+    # Live feed behind the 'live' data source, started when it is first selected;
+    # the buffer is shared by all workers and a single one ingests the source
+    live_stream = LiveECGStream()
+
+    # Static, XOR and phase space figures only depend on the record and their own controls
+    figure_cache = FigureCache()
+
+    @app.server.route('/ecg/figure-cache')
+    def figure_cache_stats():
+        """Figure cache size and hit/miss counters, as JSON"""
+        return jsonify(figure_cache.stats())
+
+    @app.server.route('/ecg/model-timing')
+    def model_timing_stats():
+        """Model load and inference times of all diagnosis jobs, as JSON"""
+        return jsonify(predictor.timing_stats())
+
     # File upload handler
     @app.callback(
         [Output('ecg-upload-status', 'children'),
          Output('ecg-upload-status', 'style'),
-         Output('ecg-record-select', 'options'),
+         Output('ecg-dataset-version', 'data'),
          Output('ecg-record-select', 'value')],
         Input('ecg-upload-data', 'contents'),
         State('ecg-upload-data', 'filename')
@@ -68,11 +101,10 @@ def register_graph_callbacks(app, data_loader, predictor):
                                                                'display': 'block'}, dash.no_update, dash.no_update
 
             if success:
-                # Update record options
+                # Bump the dataset version so the record picker reloads its page
                 num_records = data_loader.get_num_records()
-                options = [{"label": f"Record {i}", "value": i} for i in range(num_records)]
                 return f"✅ {message} - {num_records} records loaded", {'color': 'green',
-                                                                           'display': 'block'}, options, 0
+                                                                           'display': 'block'}, time.time(), 0
             else:
                 return f"❌ {message}", {'color': 'red', 'display': 'block'}, dash.no_update, dash.no_update
 
@@ -81,7 +113,7 @@ def register_graph_callbacks(app, data_loader, predictor):
 
 
     @app.callback(
-        [Output('ecg-record-select', 'options', allow_duplicate=True),
+        [Output('ecg-dataset-version', 'data', allow_duplicate=True),
          Output('ecg-record-select', 'value', allow_duplicate=True),
          Output('ecg-upload-status', 'children', allow_duplicate=True),
          Output('ecg-upload-status', 'style', allow_duplicate=True)],
@@ -95,12 +127,15 @@ def register_graph_callbacks(app, data_loader, predictor):
 
             if success:
                 num_records = data_loader.get_num_records()
-                options = [{"label": f"Record {i}", "value": i} for i in range(num_records)]
-                return options, 0, f"✅ Preloaded data restored - {num_records} records", {'color': 'green',
+                return time.time(), 0, f"✅ Preloaded data restored - {num_records} records", {'color': 'green',
                                                                                           'display': 'block'}
             else:
                 return dash.no_update, dash.no_update, "❌ Error loading preloaded data", {'color': 'red',
                                                                                           'display': 'block'}
+        elif source == 'live':
+            live_stream.start()
+            return dash.no_update, dash.no_update, f"🔴 Live stream from {live_stream.description}", {
+                'color': '#c0392b', 'display': 'block'}
         else:
             # Switching to upload mode - clear status
             return dash.no_update, dash.no_update, "", {'display': 'none'}
@@ -153,186 +188,432 @@ def register_graph_callbacks(app, data_loader, predictor):
             return new_position
         return dash.no_update
 
-    # Main graph callback
+    def load_signal(record_index):
+        """Non-scaled signal of a record (a view into the loader's arrays), or None"""
+        try:
+            return data_loader.get_record(record_index)[1]
+        except Exception:
+            return None
+
+    def error_figure(error):
+        import traceback
+        traceback.print_exc()
+        fig = go.Figure()
+        fig.add_annotation(text=f"Error: {error}", xref="paper", yref="paper",
+                           x=0.5, y=0.5, showarrow=False, font=dict(color="red"))
+        return fig
+
+    # === Record info ===
     @app.callback(
-        [Output("ecg-graph", "figure"),
-         Output("ecg-diagnosis-output", "children"),
-         Output("ecg-bpm-output", "children"),
-         Output("ecg-polar-cumulative-data", "data", allow_duplicate=True),
-         Output("ecg-polar-time-graph", "figure"),
-         Output("ecg-graph", "style")],
-        [Input("ecg-interval", "n_intervals"),
-         Input("ecg-channel-select", "value"),
-         Input("ecg-mode-select", "value"),
-         Input("ecg-diagnose-btn", "n_clicks"),
+        Output("ecg-bpm-output", "children"),
+        Input("ecg-record-select", "value")
+    )
+    def update_bpm(record_index):
+        signal = load_signal(record_index)
+        if signal is None:
+            return "BPM: N/A"
+        _, _, bpm = get_heartbeat_info(signal, SAMPLING_FREQUENCY, lead=1)
+        return f"BPM: {bpm:.1f}" if bpm else "BPM: N/A"
+
+    # Diagnoses are cached per dataset, record and model; only misses start a job,
+    # which hands the record to the inference pool, where the model is loaded and
+    # traced when each process starts
+    prediction_cache = PredictionCache()
+    inference_pool.register('ecg-diagnosis', predictor.predict, warmup=predictor.warm_up)
+
+    def diagnosis_key(record_index):
+        return [data_loader.get_dataset_hash(), int(record_index), predictor.model_hash]
+
+    def diagnosis_text(result):
+        if not result['success']:
+            return f"Diagnosis Error: {result['error']}"
+        probabilities = " · ".join(f"{label} {p:.0%}" for label, p in result['probabilities'].items())
+        return [f"Diagnosis: {result['label']} ({result['confidence']:.0%})",
+                html.Br(),
+                html.Small(probabilities)]
+
+    @app.callback(
+        [Output("ecg-diagnosis-output", "children"),
+         Output("ecg-diagnosis-request", "data")],
+        Input("ecg-diagnose-btn", "n_clicks"),
+        State("ecg-record-select", "value"),
+        prevent_initial_call=True
+    )
+    def request_diagnosis(diagnose_clicks, record_index):
+        if not diagnose_clicks or record_index is None:
+            return dash.no_update, dash.no_update
+        try:
+            key = diagnosis_key(record_index)
+        except Exception as e:
+            return f"Error: {e}", dash.no_update
+
+        cached = prediction_cache.get(key)
+        if cached is not None:
+            return diagnosis_text(cached), dash.no_update
+        return dash.no_update, {'key': key, 'record': record_index, 'clicks': diagnose_clicks}
+
+    # Inference runs as a background job so it never holds a web worker
+    @app.callback(
+        Output("ecg-diagnosis-result", "data"),
+        Input("ecg-diagnosis-request", "data"),
+        background=True,
+        manager=background_manager,
+        progress=Output("ecg-diagnosis-status", "children"),
+        running=[
+            (Output("ecg-diagnose-btn", "disabled"), True, False),
+            (Output("ecg-diagnose-cancel", "style"), {'width': '100%', 'marginTop': '8px'}, {'display': 'none'})
+        ],
+        cancel=[Input("ecg-diagnose-cancel", "n_clicks")],
+        prevent_initial_call=True
+    )
+    def run_diagnosis(set_progress, request):
+        if not request:
+            return dash.no_update
+        try:
+            # The job's process may hold other data than the worker that keyed the
+            # request (an upload served by another worker); never cache it under that key
+            if data_loader.get_dataset_hash() != request['key'][0]:
+                raise ValueError("The dataset changed since the diagnosis was requested, please retry")
+            metadata, _, signal_scaled, _ = data_loader.get_record(request['record'])
+        except Exception as e:
+            return {'key': request['key'],
+                    'result': {'success': False, 'error': str(e)}}
+
+        try:
+            result = inference_pool.run('ecg-diagnosis', metadata, signal_scaled, set_progress=set_progress)
+        except InferenceError as e:
+            result = {'success': False, 'error': str(e)}
+        set_progress("")
+
+        if result['success']:
+            prediction_cache.put(request['key'], result)  # shared disk tier
+        return {'key': request['key'], 'result': result}
+
+    @app.callback(
+        Output("ecg-diagnosis-output", "children", allow_duplicate=True),
+        Input("ecg-diagnosis-result", "data"),
+        prevent_initial_call=True
+    )
+    def show_diagnosis(payload):
+        if not payload:
+            return dash.no_update
+        result = payload['result']
+        if result['success']:
+            prediction_cache.put(payload['key'], result, persist=False)
+        return diagnosis_text(result)
+
+    # === Per-mode graph callbacks ===
+    # Each mode listens only to its own controls and returns no_update while
+    # another mode is shown, so a slider or playback tick renders one figure.
+    @app.callback(
+        Output("ecg-graph", "figure", allow_duplicate=True),
+        [Input("ecg-mode-select", "value"),
+         Input("ecg-record-select", "value"),
+         Input("ecg-channel-select", "value")],
+        prevent_initial_call='initial_duplicate'
+    )
+    def update_static_graph(mode, record_index, selected_channels):
+        if mode != 'static':
+            return dash.no_update
+        signal = load_signal(record_index)
+        if signal is None or not selected_channels:
+            return go.Figure()
+
+        fs = SAMPLING_FREQUENCY
+        try:
+            window_size = int(STATIC_DURATION * fs)
+            start_idx, end_idx = 0, min(window_size, len(signal))
+            t = np.arange(start_idx, end_idx) / fs
+            signal_window = signal[start_idx:end_idx, :]
+            return figure_cache.get(
+                (data_loader.dataset_id, record_index, mode, tuple(selected_channels)),
+                lambda: create_static_dynamic_plot(signal_window, t, selected_channels, record_index,
+                                                   start_idx, end_idx, fs, 'static')
+            )
+        except Exception as e:
+            return error_figure(e)
+
+    @app.callback(
+        Output("ecg-graph", "figure", allow_duplicate=True),
+        [Input("ecg-mode-select", "value"),
          Input("ecg-record-select", "value"),
+         Input("ecg-channel-select", "value"),
          Input("ecg-continuous-position", "value"),
          Input("ecg-continuous-zoom", "value"),
-         Input("ecg-continuous-speed", "value"),
-         Input("ecg-xor-chunks-channel", "value"),
-         Input("ecg-xor-chunk-period", "value"),
-         Input("ecg-xor-duration", "value"),
-         Input("ecg-xor-chunks-threshold", "value"),
-         Input("ecg-polar-channel", "value"),
-         Input("ecg-polar-window", "value"),
-         Input("ecg-polar-mode", "value"),
-         Input("ecg-polar-playing", "data"),
-         Input("ecg-polar-position", "data"),
-         Input("ecg-phase-space-channel-1", "value"),
-         Input("ecg-phase-space-channel-2", "value"),
-         Input("ecg-phase-space-resolution", "value"),
-         Input("ecg-colormap-select", "value")],
-        [State("ecg-diagnosis-output", "children"),
-         State("ecg-bpm-output", "children"),
-         State("ecg-polar-cumulative-data", "data")],
+         Input("ecg-continuous-speed", "value")],
+        State("ecg-data-source-select", "value"),
         prevent_initial_call='initial_duplicate'
     )
-    def update_graph(n_intervals, selected_channels, mode, diagnose_clicks, record_index,
-                     continuous_position, continuous_zoom, continuous_speed,
-                     xor_channel, xor_period, xor_duration, xor_threshold,
-                     polar_channel, polar_window, polar_mode, polar_playing,
-                     polar_position,phase_ch1, phase_ch2, phase_resolution, colormap,
-                     current_diagnosis, current_bpm, polar_cumulative):
-
-        """Main graph update"""
-        if mode == 'polar_new':
-            graph_style = {
-                'height': '70vh',
-                'border': '2px solid #dee2e6',
-                'borderRadius': '8px',
-                'backgroundColor': 'white'
-            }
-        else:
-            graph_style = {
-                'height': '70vh',
-                'border': '2px solid #dee2e6',
-                'borderRadius': '8px',
-                'backgroundColor': 'white'
-            }
-
-        ctx = dash.callback_context
-        triggered_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else None
+    def update_continuous_graph(mode, record_index, selected_channels,
+                                continuous_position, continuous_zoom, continuous_speed, source):
+        if mode != 'continuous' or source == 'live':
+            return dash.no_update
+        signal = load_signal(record_index)
+        if signal is None or not selected_channels:
+            return go.Figure()
 
-        # Set defaults - handle None values
         continuous_position = continuous_position if continuous_position is not None else 0
         continuous_zoom = continuous_zoom if continuous_zoom is not None else CONTINUOUS_DEFAULT_WINDOW
         continuous_speed = continuous_speed if continuous_speed is not None else 1.0
+        fs = SAMPLING_FREQUENCY
+
+        try:
+            window_size = int(continuous_zoom * fs)
+            start_idx = int(continuous_position * fs)
+            end_idx = min(start_idx + window_size, len(signal))
+            if end_idx >= len(signal):
+                end_idx, start_idx = len(signal), max(0, end_idx - window_size)
+            t = np.arange(start_idx, end_idx) / fs
+            signal_window = signal[start_idx:end_idx, :]
+            return create_continuous_plot(signal_window, t, selected_channels, record_index,
+                                          start_idx, end_idx, fs, continuous_zoom, continuous_speed)
+        except Exception as e:
+            return error_figure(e)
+
+    # Live source: the continuous view follows the head of the stream
+    @app.callback(
+        [Output("ecg-graph", "figure", allow_duplicate=True),
+         Output("ecg-bpm-output", "children", allow_duplicate=True)],
+        [Input("ecg-live-interval", "n_intervals"),
+         Input("ecg-mode-select", "value"),
+         Input("ecg-data-source-select", "value"),
+         Input("ecg-channel-select", "value"),
+         Input("ecg-continuous-zoom", "value")],
+        prevent_initial_call='initial_duplicate'
+    )
+    def update_live_graph(n_intervals, mode, source, selected_channels, continuous_zoom):
+        if mode != 'continuous' or source != 'live':
+            return dash.no_update, dash.no_update
+        live_stream.start()
+
+        continuous_zoom = continuous_zoom if continuous_zoom is not None else CONTINUOUS_DEFAULT_WINDOW
+        fs = SAMPLING_FREQUENCY
+
+        try:
+            start_idx, signal_window = live_stream.buffer.latest(int(continuous_zoom * fs))
+            if len(signal_window) < 2:
+                fig = go.Figure()
+                error = live_stream.error
+                fig.add_annotation(text=f"Waiting for samples from {live_stream.description}"
+                                        + (f"<br>{error}" if error else ""),
+                                   xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False)
+                return fig, "BPM: N/A"
+            if not selected_channels:
+                return go.Figure(), dash.no_update
+
+            end_idx = start_idx + len(signal_window)
+            t = np.arange(start_idx, end_idx) / fs
+            fig = create_continuous_plot(signal_window, t, selected_channels, "(live)",
+                                         start_idx, end_idx, fs, continuous_zoom, 1.0)
+
+            _, recent = live_stream.buffer.latest(int(STREAM_BPM_SECONDS * fs))
+            _, _, bpm = get_heartbeat_info(recent, fs, lead=1)
+            return fig, f"BPM: {bpm:.1f} (live)"
+        except Exception as e:
+            return error_figure(e), dash.no_update
+
+    @app.callback(
+        Output("ecg-graph", "figure", allow_duplicate=True),
+        [Input("ecg-mode-select", "value"),
+         Input("ecg-record-select", "value"),
+         Input("ecg-xor-chunks-channel", "value"),
+         Input("ecg-xor-chunk-period", "value"),
+         Input("ecg-xor-duration", "value"),
+         Input("ecg-xor-chunks-threshold", "value")],
+        prevent_initial_call='initial_duplicate'
+    )
+    def update_xor_graph(mode, record_index, xor_channel, xor_period, xor_duration, xor_threshold):
+        if mode != 'xor_chunks':
+            return dash.no_update
+        signal = load_signal(record_index)
+        if signal is None:
+            return go.Figure()
+
         xor_channel = xor_channel if xor_channel is not None else 0
         xor_period = xor_period if xor_period is not None else XOR_CHUNKS_DEFAULT_PERIOD
         xor_duration = xor_duration if xor_duration is not None else XOR_CHUNKS_DEFAULT_DURATION
         xor_threshold = xor_threshold if xor_threshold is not None else 0.05
+        fs = SAMPLING_FREQUENCY
+
+        try:
+            return figure_cache.get(
+                (data_loader.dataset_id, record_index, mode,
+                 xor_channel, xor_period, xor_duration, xor_threshold),
+                lambda: create_xor_chunks_plot(signal, fs, xor_channel, xor_period, xor_duration,
+                                               xor_threshold, record_index)
+            )
+        except Exception as e:
+            return error_figure(e)
+
+    @app.callback(
+        [Output("ecg-graph", "figure", allow_duplicate=True),
+         Output("ecg-polar-cumulative-data", "data", allow_duplicate=True),
+         Output("ecg-polar-time-graph", "figure")],
+        [Input("ecg-mode-select", "value"),
+         Input("ecg-record-select", "value"),
+         Input("ecg-polar-channel", "value"),
+         Input("ecg-polar-window", "value"),
+         Input("ecg-polar-mode", "value"),
+         Input("ecg-polar-position", "data")],
+        [State("ecg-polar-cumulative-data", "data"),
+         State("ecg-session-id", "data")],
+        prevent_initial_call='initial_duplicate'
+    )
+    def update_polar_graph(mode, record_index, polar_channel, polar_window, polar_mode, polar_position,
+                           polar_cumulative, session_id):
+        if mode != 'polar_new':
+            return dash.no_update, dash.no_update, dash.no_update
+        signal = load_signal(record_index)
+        if signal is None:
+            return go.Figure(), dash.no_update, dash.no_update
+
         polar_channel = polar_channel if polar_channel is not None else 0
         polar_window = polar_window if polar_window is not None else POLAR_DEFAULT_WINDOW
         polar_mode = polar_mode if polar_mode is not None else 'latest'
-        phase_ch1 = phase_ch1 if phase_ch1 is not None else DEFAULT_PHASE_SPACE_CHANNEL_1
-        phase_ch2 = phase_ch2 if phase_ch2 is not None else DEFAULT_PHASE_SPACE_CHANNEL_2
-        phase_resolution = phase_resolution if phase_resolution is not None else 0.1
-        colormap = colormap if colormap is not None else DEFAULT_COLORMAP
-        polar_cumulative = polar_cumulative if polar_cumulative is not None else []
         polar_position = polar_position if polar_position is not None else 0
-        try:
-            metadata, signal, signal_scaled, target = data_loader.get_record(record_index)
-        except Exception as e:
-            return go.Figure(), f"Error: {e}", "BPM: N/A", []
-
-        # BPM
-        if triggered_id == "ecg-record-select":
-            _, _, bpm = get_heartbeat_info(signal, SAMPLING_FREQUENCY, lead=1)
-            bpm_text = f"BPM: {bpm:.1f}" if bpm else "BPM: N/A"
-        else:
-            bpm_text = current_bpm if current_bpm else "BPM: N/A"
+        polar_cumulative = polar_cumulative or 0  # windows in this session's polar history
+        fs = SAMPLING_FREQUENCY
 
-        # Diagnosis
-        if triggered_id == "ecg-diagnose-btn" and diagnose_clicks > 0:
-            result = predictor.predict(metadata, signal_scaled)
-            if result['success']:
-                current_diagnosis = f"Diagnosis: {result['label']}"
-            else:
-                current_diagnosis = f"Diagnosis Error: {result['error']}"
+        try:
+            window_size = int(polar_window * fs)
+            start_idx = int(polar_position * fs)
+            end_idx = min(start_idx + window_size, len(signal))
 
-        # Channel check
-        if not selected_channels and mode not in ['xor_chunks', 'polar_new', 'phase_space']:
-            return go.Figure(), current_diagnosis or "", bpm_text, polar_cumulative, dash.no_update,graph_style
+            # Ensure valid window
+            if end_idx > len(signal):
+                start_idx = max(0, len(signal) - window_size)
+                end_idx = len(signal)
 
-        fs = SAMPLING_FREQUENCY
+            t = np.arange(start_idx, end_idx) / fs
+            signal_window = signal[start_idx:end_idx, :]
+            is_cumulative = (polar_mode == 'cumulative')
 
-        try:
-            # === MODE ROUTING ===
-            if mode == 'static':
-                window_size = int(STATIC_DURATION * fs)
-                start_idx, end_idx = 0, min(window_size, len(signal))
-                t = np.arange(start_idx, end_idx) / fs
-                signal_window = signal[start_idx:end_idx, :]
-                fig = create_static_dynamic_plot(signal_window, t, selected_channels, record_index,
-                                                start_idx, end_idx, fs, 'static')
-                return fig, current_diagnosis or "", bpm_text, polar_cumulative, dash.no_update, graph_style
-
-            elif mode == 'continuous':
-                window_size = int(continuous_zoom * fs)
-                start_idx = int(continuous_position * fs)
-                end_idx = min(start_idx + window_size, len(signal))
-                if end_idx >= len(signal):
-                    end_idx, start_idx = len(signal), max(0, end_idx - window_size)
-                t = np.arange(start_idx, end_idx) / fs
-                signal_window = signal[start_idx:end_idx, :]
-                fig = create_continuous_plot(signal_window, t, selected_channels, record_index,
-                                            start_idx, end_idx, fs, continuous_zoom, continuous_speed)
-                return fig, current_diagnosis or "", bpm_text, polar_cumulative, dash.no_update, graph_style
-
-            elif mode == 'xor_chunks':
-                fig = create_xor_chunks_plot(signal, fs, xor_channel, xor_period, xor_duration,
-                                            xor_threshold, record_index)
-                return fig, current_diagnosis or "", bpm_text, polar_cumulative, dash.no_update, graph_style
-
-            elif mode == 'polar_new':
-                window_size = int(polar_window * fs)
-
-                if polar_playing:
-                    # Use position-based playback
-                    start_idx = int(polar_position * fs)
-                    end_idx = min(start_idx + window_size, len(signal))
-
-                    # Ensure valid window
-                    if end_idx > len(signal):
-                        start_idx = max(0, len(signal) - window_size)
-                        end_idx = len(signal)
-                else:
-                    # Paused: keep current position
-                    start_idx = int(polar_position * fs)
-                    end_idx = min(start_idx + window_size, len(signal))
-
-                    if end_idx > len(signal):
-                        start_idx = max(0, len(signal) - window_size)
-                        end_idx = len(signal)
-
-                t = np.arange(start_idx, end_idx) / fs
-                signal_window = signal[start_idx:end_idx, :]
-                is_cumulative = (polar_mode == 'cumulative')
+            with polar_buffers.session(session_id) as polar_buffer:
+                if not polar_cumulative:
+                    polar_buffer.clear()  # history was reset in the browser
 
                 # Create polar plot
                 fig_polar, new_cumulative = create_polar_new_plot(signal_window, t, polar_channel, record_index,
                                                                   start_idx, end_idx, fs, is_cumulative,
-                                                                  polar_cumulative)
+                                                                  polar_buffer)
 
-                # Create time domain plot
-                fig_time = create_polar_time_domain_plot(signal_window, t, polar_channel, record_index,
-                                                         start_idx, end_idx, fs)
+            # Create time domain plot
+            fig_time = create_polar_time_domain_plot(signal_window, t, polar_channel, record_index,
+                                                     start_idx, end_idx, fs)
 
-                return fig_polar, current_diagnosis or "", bpm_text, new_cumulative, fig_time, graph_style
+            return fig_polar, new_cumulative, fig_time
+        except Exception as e:
+            return error_figure(e), dash.no_update, dash.no_update
 
+    @app.callback(
+        Output("ecg-graph", "figure", allow_duplicate=True),
+        [Input("ecg-mode-select", "value"),
+         Input("ecg-record-select", "value"),
+         Input("ecg-phase-space-channel-1", "value"),
+         Input("ecg-phase-space-channel-2", "value"),
+         Input("ecg-phase-space-resolution", "value"),
+         Input("ecg-colormap-select", "value")],
+        prevent_initial_call='initial_duplicate'
+    )
+    def update_phase_space_graph(mode, record_index, phase_ch1, phase_ch2, phase_resolution, colormap):
+        if mode != 'phase_space':
+            return dash.no_update
+        signal = load_signal(record_index)
+        if signal is None:
+            return go.Figure()
 
-            elif mode == 'phase_space':
-                window_size = int(PHASE_SPACE_WINDOW_DURATION * fs)
-                start_idx, end_idx = 0, min(window_size, len(signal))
-                signal_window = signal[start_idx:end_idx, :]
-                fig = create_phase_space_plot_with_colormap(signal_window, phase_ch1, phase_ch2, record_index,
-                                                            start_idx, end_idx, fs, phase_resolution, colormap)
-                return fig, current_diagnosis or "", bpm_text, polar_cumulative, dash.no_update, graph_style
+        phase_ch1 = phase_ch1 if phase_ch1 is not None else DEFAULT_PHASE_SPACE_CHANNEL_1
+        phase_ch2 = phase_ch2 if phase_ch2 is not None else DEFAULT_PHASE_SPACE_CHANNEL_2
+        phase_resolution = phase_resolution if phase_resolution is not None else 0.1
+        colormap = colormap if colormap is not None else DEFAULT_COLORMAP
+        fs = SAMPLING_FREQUENCY
 
-            else:
-                return go.Figure(), current_diagnosis or "", bpm_text, polar_cumulative, dash.no_update, graph_style
+        try:
+            window_size = int(PHASE_SPACE_WINDOW_DURATION * fs)
+            start_idx, end_idx = 0, min(window_size, len(signal))
+            signal_window = signal[start_idx:end_idx, :]
+            return figure_cache.get(
+                (data_loader.dataset_id, record_index, mode,
+                 phase_ch1, phase_ch2, phase_resolution, colormap),
+                lambda: create_phase_space_plot_with_colormap(signal_window, phase_ch1, phase_ch2,
+                                                              record_index, start_idx, end_idx, fs,
+                                                              phase_resolution, colormap)
+            )
+        except Exception as e:
+            return error_figure(e)
+
+    # === Grid mode ===
+    @app.callback(
+        Output("ecg-grid-page", "data"),
+        [Input("ecg-grid-prev", "n_clicks"),
+         Input("ecg-grid-next", "n_clicks"),
+         Input("ecg-record-label-filter", "value"),
+         Input("ecg-record-sex-filter", "value"),
+         Input("ecg-record-age-filter", "value"),
+         Input("ecg-record-bpm-filter", "value"),
+         Input("ecg-dataset-version", "data")],
+        State("ecg-grid-page", "data"),
+        prevent_initial_call=True
+    )
+    def update_grid_page(prev_clicks, next_clicks, labels, sex, age_range, bpm_range, version, page):
+        """Step through grid pages; new filters or data go back to the first page"""
+        triggered_id = dash.ctx.triggered_id
+        if triggered_id == "ecg-grid-prev":
+            return max(0, (page or 0) - 1)
+        if triggered_id == "ecg-grid-next":
+            return (page or 0) + 1  # clamped when the grid is built
+        return 0
 
+    @app.callback(
+        [Output("ecg-graph", "figure", allow_duplicate=True),
+         Output("ecg-grid-page-info", "children"),
+         Output("ecg-grid-records", "data")],
+        [Input("ecg-mode-select", "value"),
+         Input("ecg-grid-lead", "value"),
+         Input("ecg-grid-page", "data")],
+        [State("ecg-record-label-filter", "value"),
+         State("ecg-record-sex-filter", "value"),
+         State("ecg-record-age-filter", "value"),
+         State("ecg-record-bpm-filter", "value")],
+        prevent_initial_call='initial_duplicate'
+    )
+    def update_grid_graph(mode, lead, page, labels, sex, age_range, bpm_range):
+        if mode != 'grid':
+            return dash.no_update, dash.no_update, dash.no_update
+        record_index = data_loader.get_record_index()
+        if record_index is None:
+            return go.Figure(), "No data loaded", []
+
+        lead = lead if lead is not None else 1
+        try:
+            indices = search_records(record_index, None, labels, sex, age_range, bpm_range)
+            n_pages = max(1, -(-len(indices) // GRID_PAGE_SIZE))
+            page = min(max(page or 0, 0), n_pages - 1)
+            visible = [int(i) for i in indices[page * GRID_PAGE_SIZE:(page + 1) * GRID_PAGE_SIZE]]
+
+            fig = figure_cache.get(
+                (data_loader.dataset_id, 'grid', lead, tuple(visible)),
+                lambda: create_grid_plot(data_loader.get_records(visible, lead), visible, lead,
+                                         SAMPLING_FREQUENCY,
+                                         titles=[record_index.descriptions[i] for i in visible])
+            )
+            return fig, f"Page {page + 1}/{n_pages} · {len(indices)} records", visible
         except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return go.Figure(), f"Error: {str(e)}", bpm_text, polar_cumulative,dash.no_update,graph_style
\ No newline at end of file
+            return error_figure(e), dash.no_update, dash.no_update
+
+    @app.callback(
+        [Output("ecg-record-select", "value", allow_duplicate=True),
+         Output("ecg-mode-select", "value")],
+        Input("ecg-graph", "clickData"),
+        [State("ecg-mode-select", "value"),
+         State("ecg-grid-records", "data")],
+        prevent_initial_call=True
+    )
+    def open_grid_record(click_data, mode, grid_records):
+        """Clicking a grid panel opens that record in the static view"""
+        if mode != 'grid' or not click_data or not grid_records:
+            return dash.no_update, dash.no_update
+        curve = click_data['points'][0]['curveNumber']
+        if curve >= len(grid_records):
+            return dash.no_update, dash.no_update
+        return grid_records[curve], 'static'
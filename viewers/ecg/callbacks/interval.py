@@ -13,10 +13,12 @@ def register_interval_callbacks(app):
          Input("ecg-play-pause", "n_clicks"),
          Input("ecg-continuous-playing", "data"),
          Input("ecg-continuous-speed", "value"),
-         Input("ecg-polar-playing", "data")],
+         Input("ecg-polar-playing", "data"),
+         Input("ecg-data-source-select", "value")],
         State("ecg-interval", "disabled")
     )
-    def toggle_interval(mode, n_clicks_old, is_continuous_playing, continuous_speed, is_polar_playing, is_disabled):
+    def toggle_interval(mode, n_clicks_old, is_continuous_playing, continuous_speed, is_polar_playing, source,
+                        is_disabled):
         """Control interval based on mode and playback state"""
 
         # Static modes - no interval
@@ -25,6 +27,8 @@ def register_interval_callbacks(app):
 
         # Continuous Viewer
         if mode == 'continuous':
+            if source == 'live':
+                return True, CONTINUOUS_UPDATE_INTERVAL  # ecg-live-interval follows the stream
             if is_continuous_playing:
                 adjusted_interval = int(CONTINUOUS_UPDATE_INTERVAL / continuous_speed)
                 return False, adjusted_interval
@@ -36,4 +40,13 @@ def register_interval_callbacks(app):
                 return False, POLAR_UPDATE_INTERVAL
             return True, POLAR_UPDATE_INTERVAL
 
-        return True, 1000
\ No newline at end of file
+        return True, 1000
+
+    @app.callback(
+        Output("ecg-live-interval", "disabled"),
+        [Input("ecg-mode-select", "value"),
+         Input("ecg-data-source-select", "value")]
+    )
+    def toggle_live_interval(mode, source):
+        """Poll the live stream only while the continuous view shows it"""
+        return not (mode == 'continuous' and source == 'live')
\ No newline at end of file
@@ -0,0 +1,70 @@
+import dash
+from dash import Input, Output, State
+from viewers.ecg.config import RECORD_PAGE_SIZE, RECORD_AGE_RANGE, RECORD_BPM_RANGE
+
+
+def _open_range(value, bounds):
+    """Slider value as (min, max) filter bounds; a handle at the slider end means no bound"""
+    if not value:
+        return None
+    low, high = value
+    return (None if low <= bounds[0] else low,
+            None if high >= bounds[1] else high)
+
+
+def search_records(record_index, query, labels, sex, age_range, bpm_range):
+    """Run a RecordIndex search with the values of the record filter controls"""
+    return record_index.search(
+        query=query,
+        labels=labels,
+        sex=sex or None,
+        age_range=_open_range(age_range, RECORD_AGE_RANGE),
+        bpm_range=_open_range(bpm_range, RECORD_BPM_RANGE)
+    )
+
+
+def register_record_callbacks(app, data_loader):
+    """Register the record search callbacks"""
+
+    @app.callback(
+        [Output('ecg-record-select', 'options'),
+         Output('ecg-record-page', 'data'),
+         Output('ecg-record-page-info', 'children')],
+        [Input('ecg-record-select', 'search_value'),
+         Input('ecg-record-label-filter', 'value'),
+         Input('ecg-record-sex-filter', 'value'),
+         Input('ecg-record-age-filter', 'value'),
+         Input('ecg-record-bpm-filter', 'value'),
+         Input('ecg-record-prev', 'n_clicks'),
+         Input('ecg-record-next', 'n_clicks'),
+         Input('ecg-dataset-version', 'data')],
+        [State('ecg-record-page', 'data'),
+         State('ecg-record-select', 'value')]
+    )
+    def update_record_options(search_value, labels, sex, age_range, bpm_range,
+                              prev_clicks, next_clicks, version, page, selected):
+        """Send only the visible page of records matching the search and filters"""
+        triggered_id = dash.ctx.triggered_id
+
+        record_index = data_loader.get_record_index()
+        if record_index is None:
+            return [], 0, "No data loaded"
+
+        indices = search_records(record_index, search_value, labels, sex, age_range, bpm_range)
+
+        if triggered_id == 'ecg-record-prev':
+            page = (page or 0) - 1
+        elif triggered_id == 'ecg-record-next':
+            page = (page or 0) + 1
+        else:
+            page = 0  # new search or filter
+
+        options, page, n_pages = record_index.page(indices, page, RECORD_PAGE_SIZE)
+
+        # The dropdown only shows a value that is among its options
+        if selected is not None and selected < record_index.n_records \
+                and all(option['value'] != selected for option in options):
+            options = record_index.options([selected]) + options
+
+        info = f"Page {page + 1}/{n_pages} · {len(indices)} records"
+        return options, page, info
@@ -10,7 +10,8 @@ def register_ui_callbacks(app):
         [Output("ecg-continuous-controls", "style"),
          Output("ecg-xor-chunks-controls", "style"),
          Output("ecg-polar-controls", "style"),
-         Output("ecg-phase-space-controls", "style")],
+         Output("ecg-phase-space-controls", "style"),
+         Output("ecg-grid-controls", "style")],
         Input("ecg-mode-select", "value")
     )
     def show_mode_controls(mode):
@@ -19,8 +20,9 @@ def register_ui_callbacks(app):
         xor_style = {"display": "block"} if mode == 'xor_chunks' else {"display": "none"}
         polar_style = {"display": "block"} if mode == 'polar_new' else {"display": "none"}
         phase_style = {"display": "block"} if mode == 'phase_space' else {"display": "none"}
+        grid_style = {"display": "block"} if mode == 'grid' else {"display": "none"}
 
-        return continuous_style, xor_style, polar_style, phase_style
+        return continuous_style, xor_style, polar_style, phase_style, grid_style
 
 
     # === Continuous Viewer Controls ===
@@ -121,7 +123,23 @@ def register_ui_callbacks(app):
         prevent_initial_call=True
     )
     def reset_polar_cumulative(n_clicks):
-        return [], 0  # Reset
+        return 0, 0  # Reset (the server clears its buffer on the next frame)
+
+    # Give each browser tab an id for its server-side polar history
+    app.clientside_callback(
+        """
+        function(session_id) {
+            if (session_id) {
+                return window.dash_clientside.no_update;
+            }
+            return window.crypto && window.crypto.randomUUID
+                ? window.crypto.randomUUID()
+                : Date.now().toString(36) + Math.random().toString(36).slice(2);
+        }
+        """,
+        Output("ecg-session-id", "data"),
+        Input("ecg-session-id", "data")
+    )
 
     # === Phase Space Controls ===
     @app.callback(Output("ecg-phase-resolution-display", "children"), Input("ecg-phase-space-resolution", "value"))
@@ -10,6 +10,7 @@ from viewers.ecg.config import (
     CONTINUOUS_DEFAULT_SPEED,
     CONTINUOUS_MIN_SPEED,
     CONTINUOUS_MAX_SPEED,
+    CONTINUOUS_UPDATE_INTERVAL,
     XOR_CHUNKS_DEFAULT_PERIOD,
     XOR_CHUNKS_MIN_PERIOD,
     XOR_CHUNKS_MAX_PERIOD,
@@ -18,7 +19,10 @@ from viewers.ecg.config import (
     POLAR_MIN_WINDOW,
     POLAR_MAX_WINDOW,
     AVAILABLE_COLORMAPS,
-    DEFAULT_COLORMAP
+    DEFAULT_COLORMAP,
+    DIAGNOSIS_LABELS,
+    RECORD_AGE_RANGE,
+    RECORD_BPM_RANGE
 )
 
 ECG_LEAD_NAMES = [
@@ -119,7 +123,8 @@ def create_ecg_layout(num_records, num_leads):
                             id='ecg-data-source-select',
                             options=[
                                 {'label': ' Preloaded Data', 'value': 'preloaded'},
-                                {'label': ' Upload File', 'value': 'upload'}
+                                {'label': ' Upload File', 'value': 'upload'},
+                                {'label': ' Live Stream', 'value': 'live'}
                             ],
                             value='preloaded',
                             labelStyle={
@@ -175,14 +180,68 @@ def create_ecg_layout(num_records, num_leads):
                                     'marginBottom': '10px',
                                     'fontWeight': 'bold'
                                 }),
+                        # Options are served one page at a time by the record search callback
                         dcc.Dropdown(
                             id="ecg-record-select",
-                            options=[{"label": f"Record {i}", "value": i} for i in range(num_records)],
+                            options=[],
                             value=None,
-                            placeholder="Select a record...",
+                            placeholder="Search records (number, diagnosis, sex)...",
                             clearable=False,
                             style={'width': '100%'}
                         ),
+
+                        html.Label("Diagnosis", style={'fontWeight': '600', 'marginTop': '10px'}),
+                        dcc.Dropdown(
+                            id="ecg-record-label-filter",
+                            options=[{"label": label, "value": label} for label in DIAGNOSIS_LABELS],
+                            value=[],
+                            multi=True,
+                            placeholder="Any diagnosis"
+                        ),
+
+                        html.Label("Sex", style={'fontWeight': '600', 'marginTop': '10px'}),
+                        dcc.RadioItems(
+                            id="ecg-record-sex-filter",
+                            options=[
+                                {'label': ' Any', 'value': ''},
+                                {'label': ' F', 'value': 'F'},
+                                {'label': ' M', 'value': 'M'}
+                            ],
+                            value='',
+                            inline=True,
+                            labelStyle={'marginRight': '12px'}
+                        ),
+
+                        html.Label("Age (z-score)", style={'fontWeight': '600', 'marginTop': '10px'}),
+                        dcc.RangeSlider(
+                            id="ecg-record-age-filter",
+                            min=RECORD_AGE_RANGE[0],
+                            max=RECORD_AGE_RANGE[1],
+                            step=0.1,
+                            value=list(RECORD_AGE_RANGE),
+                            marks={v: str(v) for v in range(int(RECORD_AGE_RANGE[0]), int(RECORD_AGE_RANGE[1]) + 1)},
+                            tooltip={"placement": "bottom", "always_visible": False}
+                        ),
+
+                        html.Label("BPM", style={'fontWeight': '600', 'marginTop': '10px'}),
+                        dcc.RangeSlider(
+                            id="ecg-record-bpm-filter",
+                            min=RECORD_BPM_RANGE[0],
+                            max=RECORD_BPM_RANGE[1],
+                            step=5,
+                            value=list(RECORD_BPM_RANGE),
+                            marks={v: str(v) for v in range(RECORD_BPM_RANGE[0], RECORD_BPM_RANGE[1] + 1, 50)},
+                            tooltip={"placement": "bottom", "always_visible": False}
+                        ),
+
+                        # Result pages
+                        html.Div([
+                            dbc.Button("◀", id="ecg-record-prev", size="sm", color="secondary", n_clicks=0),
+                            html.Span(id="ecg-record-page-info",
+                                      style={'margin': '0 10px', 'fontSize': '12px', 'color': '#666'}),
+                            dbc.Button("▶", id="ecg-record-next", size="sm", color="secondary", n_clicks=0)
+                        ], style={'display': 'flex', 'alignItems': 'center', 'justifyContent': 'center',
+                                  'marginTop': '10px'}),
                     ], style={
                         'padding': '15px',
                         'backgroundColor': 'white',
@@ -253,6 +312,7 @@ def create_ecg_layout(num_records, num_leads):
                                 {'label': ' XOR ', 'value': 'xor_chunks'},
                                 {'label': ' Polar ', 'value': 'polar_new'},
                                 {'label': '  Cross Recurrence ', 'value': 'phase_space'},
+                                {'label': ' Grid ', 'value': 'grid'},
                             ],
                             value='static',
                             labelStyle={
@@ -462,12 +522,47 @@ def create_ecg_layout(num_records, num_leads):
                                                              'marginBottom': '20px',
                                                              'boxShadow': '0 2px 4px rgba(0,0,0,0.1)'}),
 
+                    # Grid Controls
+                    html.Div([
+                        html.H6("⚙️ Grid Controls",
+                                style={'color': '#2c3e50', 'marginBottom': '10px'}),
+
+                        html.Label("Lead:", style={'fontWeight': '600'}),
+                        dcc.Dropdown(
+                            id="ecg-grid-lead",
+                            options=[{'label': f'Lead {ECG_LEAD_NAMES[i]}', 'value': i}
+                                     for i in range(min(num_leads, 12))],
+                            value=1,
+                            clearable=False
+                        ),
+
+                        html.Div("Records follow the search filters; click a panel to open it.",
+                                 style={'fontSize': '12px', 'color': '#666', 'marginTop': '10px'}),
+
+                        html.Div([
+                            dbc.Button("◀", id="ecg-grid-prev", size="sm", color="secondary", n_clicks=0),
+                            html.Span(id="ecg-grid-page-info",
+                                      style={'margin': '0 10px', 'fontSize': '12px', 'color': '#666'}),
+                            dbc.Button("▶", id="ecg-grid-next", size="sm", color="secondary", n_clicks=0)
+                        ], style={'display': 'flex', 'alignItems': 'center', 'justifyContent': 'center',
+                                  'marginTop': '10px'}),
+                    ], id="ecg-grid-controls", style={'display': 'none', 'padding': '15px',
+                                                      'backgroundColor': 'white', 'borderRadius': '8px',
+                                                      'marginBottom': '20px',
+                                                      'boxShadow': '0 2px 4px rgba(0,0,0,0.1)'}),
+
                     # === DIAGNOSIS BUTTON ===
                     html.Div([
                         html.Button("🔬 Diagnose",
                                     id="ecg-diagnose-btn",
                                     className="btn btn-primary btn-lg",
                                     style={'width': '100%'}),
+                        html.Button("✖ Cancel",
+                                    id="ecg-diagnose-cancel",
+                                    className="btn btn-outline-secondary",
+                                    style={'display': 'none'}),
+                        html.Div(id="ecg-diagnosis-status",
+                                 style={'marginTop': '8px', 'fontSize': '13px', 'color': '#666'}),
                     ], style={
                         'padding': '15px',
                         'backgroundColor': 'white',
@@ -495,10 +590,18 @@ def create_ecg_layout(num_records, num_leads):
 
         # Hidden components
         dcc.Interval(id='ecg-interval', interval=1000, n_intervals=0, disabled=True),
+        dcc.Interval(id='ecg-live-interval', interval=CONTINUOUS_UPDATE_INTERVAL, n_intervals=0, disabled=True),
         dcc.Store(id='ecg-continuous-playing', data=False),
         dcc.Store(id='ecg-polar-playing', data=False),
         dcc.Store(id='ecg-signal-length', data=0),
-        dcc.Store(id='ecg-polar-cumulative-data', data=[]),
+        dcc.Store(id='ecg-polar-cumulative-data', data=0),
+        dcc.Store(id='ecg-session-id', storage_type='session'),
         dcc.Store(id='ecg-polar-position', data=0),
+        dcc.Store(id='ecg-record-page', data=0),
+        dcc.Store(id='ecg-grid-page', data=0),
+        dcc.Store(id='ecg-grid-records', data=[]),
+        dcc.Store(id='ecg-dataset-version', data=0),
+        dcc.Store(id='ecg-diagnosis-request'),
+        dcc.Store(id='ecg-diagnosis-result'),
         html.Button("Pause", id="ecg-play-pause", style={"display": "none"}),
     ])
\ No newline at end of file
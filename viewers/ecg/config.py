@@ -1,5 +1,7 @@
 
+import os
 import zipfile
+import tempfile
 import pandas as pd
 
 # Data paths
@@ -41,6 +43,10 @@ POLAR_MIN_WINDOW = 1.0  # minimum window
 POLAR_MAX_WINDOW = 20.0  # maximum window
 POLAR_CUMULATIVE_DEFAULT = False  # Start with latest mode (not cumulative)
 POLAR_UPDATE_INTERVAL = 100  # milliseconds for live mode
+POLAR_BUFFER_POINTS = 4000  # cumulative history kept per session (oldest windows dropped)
+POLAR_WINDOW_POINTS = 200  # points stored per window (min/max decimated)
+POLAR_BUFFER_TTL = 1800  # seconds an idle session's cumulative history is kept in the shared cache
+POLAR_FADE_LEVELS = 5  # opacity steps (one trace each) in cumulative mode
 
 # Phase Space Recurrence parameters
 PHASE_SPACE_WINDOW_DURATION = 10  # seconds to analyze
@@ -56,6 +62,40 @@ AVAILABLE_COLORMAPS = [
 ]
 DEFAULT_COLORMAP = 'Viridis'
 
+# Grid (small multiples) parameters
+GRID_PAGE_SIZE = 24  # records per grid page
+GRID_COLUMNS = 4
+GRID_POINT_BUDGET = 12000  # points sent for the whole grid, whatever the page size
+
+# Figure cache
+FIGURE_CACHE_SIZE = 64  # static, XOR and phase space figures kept in memory
+
+# Prediction cache
+PREDICTION_CACHE_SIZE = 256  # diagnoses kept per process
+# Shared on-disk tier for all workers; set ECG_PREDICTION_CACHE_DIR='' to disable it
+PREDICTION_CACHE_DIR = os.environ.get(
+    'ECG_PREDICTION_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'ecg_predictions')
+)
+
+# Live stream parameters
+# 'simulator', 'socket:HOST:PORT' or 'file:PATH' (see viewers/ecg/data/stream.py)
+STREAM_SOURCE = os.environ.get('ECG_STREAM_SOURCE', 'simulator')
+STREAM_BUFFER_SECONDS = 60  # most recent live samples kept
+# Memory-mapped ring buffer shared by all workers; one of them ingests the source
+STREAM_BUFFER_PATH = os.environ.get(
+    'ECG_STREAM_BUFFER',
+    os.path.join(tempfile.gettempdir(), 'ecg_stream.buf')
+)
+STREAM_LEASE_SECONDS = 6  # a stalled ingesting worker is replaced after this long
+STREAM_NUM_LEADS = 12
+STREAM_BPM_SECONDS = 10  # live samples used for the BPM estimate
+
+# Record picker parameters
+RECORD_PAGE_SIZE = 50  # dropdown options sent per page
+RECORD_AGE_RANGE = (-3.0, 3.0)  # standardized age slider bounds (open-ended at the ends)
+RECORD_BPM_RANGE = (30, 200)  # BPM slider bounds (open-ended at the ends)
+
 # Model parameters
 MODEL_INPUT_SIZE = 1000
 DIAGNOSIS_LABELS = ['NORM', 'MI', 'STTC', 'CD', 'HYP']
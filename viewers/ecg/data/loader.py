@@ -1,9 +1,26 @@
+import hashlib
+import logging
+import threading
 from io import BytesIO
 import numpy as np
-from viewers.ecg.config import DATA_PATH, zip_path
+from viewers.common.background import background_cache
+from viewers.ecg.config import DATA_PATH, SAMPLING_FREQUENCY, zip_path
+from viewers.ecg.data.record_index import RecordIndex, record_bpm
 import zipfile
 import os
 
+logger = logging.getLogger(__name__)
+
+
+def _content_hash(*arrays):
+    """Short sha256 of the shapes, dtypes and bytes of some arrays"""
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(array.data)
+    return digest.hexdigest()[:16]
+
 
 class ECGDataLoader:
     """Handles loading and accessing ECG data from .npz files"""
@@ -11,6 +28,11 @@ class ECGDataLoader:
     def __init__(self, data_path=DATA_PATH):
         """Load ECG data from specified path"""
         self.data = None
+        self._record_index = None
+        self._index_ready = threading.Event()
+        self._index_lock = threading.Lock()
+        self._dataset_hash = None
+        self.dataset_id = 0  # bumped whenever different data is loaded
         self.data_path = data_path
         self.original_data_path = data_path  # Store original path
         self.load_data(data_path)
@@ -24,6 +46,7 @@ class ECGDataLoader:
             self.Y = self.data['Y_test_non_scaled']  # ECG curves (non-scaled)
             self.Z = self.data['Z_test']  # Targets
             self.Y_scaled = self.data['Y_test']  # Scaled ECG curves
+            self._on_data_changed()
             return True
         except Exception as e:
             print(f"Error loading data: {e}")
@@ -48,6 +71,7 @@ class ECGDataLoader:
                 self.Y = self.data['Y_test_non_scaled']
                 self.Z = self.data['Z_test']
                 self.Y_scaled = self.data['Y_test']
+                self._on_data_changed()
                 return True, f"Loaded {npz_files[0]}"
         except Exception as e:
             return False, f"Error loading zip: {str(e)}"
@@ -60,6 +84,7 @@ class ECGDataLoader:
             self.Y = self.data['Y_test_non_scaled']
             self.Z = self.data['Z_test']
             self.Y_scaled = self.data['Y_test']
+            self._on_data_changed()
             return True, "Data loaded successfully"
         except Exception as e:
             return False, f"Error loading npz: {str(e)}"
@@ -84,6 +109,82 @@ class ECGDataLoader:
             self.Z[record_index]
         )
 
+    def _on_data_changed(self):
+        """Drop everything derived from the previous data and start indexing the new one"""
+        with self._index_lock:
+            self._record_index = None
+            self._index_ready = threading.Event()
+            self._dataset_hash = None
+            self.dataset_id += 1
+        self._start_record_index()
+
+    def _start_record_index(self):
+        """
+        Build the record search index in a background thread at load time
+
+        The per-record BPM estimates are the slow part; they are kept in the
+        shared background cache under a hash of the curves, so other gunicorn
+        workers and later restarts loading the same data reuse them.
+        """
+        dataset_id, ready = self.dataset_id, self._index_ready
+        X, Y, Z = self.X, self.Y, self.Z
+
+        def run():
+            try:
+                bpm_key = ('ecg-record-bpm', _content_hash(Y), SAMPLING_FREQUENCY)
+                bpm = background_cache.get(bpm_key)
+                if bpm is None:
+                    bpm = record_bpm(Y, SAMPLING_FREQUENCY)
+                    background_cache.set(bpm_key, bpm)
+                index = RecordIndex(X, Y, Z, bpm=bpm)
+                with self._index_lock:
+                    if self.dataset_id == dataset_id:
+                        self._record_index = index
+            except Exception:
+                logger.exception("Building the ECG record index failed")
+            finally:
+                ready.set()
+
+        threading.Thread(target=run, name='ecg-record-index', daemon=True).start()
+
+    def get_records(self, record_indices, lead):
+        """
+        Fetch one lead of several records in a single indexing operation
+
+        Returns:
+            np.ndarray: (len(record_indices), samples) non-scaled signals
+        """
+        return self.Y[np.asarray(record_indices, dtype=int), :, lead]
+
+    def get_dataset_hash(self):
+        """Content hash of the model inputs (metadata and scaled curves), computed once per load"""
+        if self.data is None:
+            return None
+        if self._dataset_hash is None:
+            self._dataset_hash = _content_hash(self.X, self.Y_scaled)
+        return self._dataset_hash
+
+    def get_record_index(self):
+        """
+        Get the search index of the loaded records
+
+        The index is built when the data is loaded, so this only waits if a
+        request arrives while it is still being built.
+        """
+        if self.data is None:
+            return None
+        while True:
+            with self._index_lock:
+                ready, dataset_id = self._index_ready, self.dataset_id
+            ready.wait()
+            with self._index_lock:
+                if self.dataset_id != dataset_id:
+                    continue  # other data was loaded meanwhile, wait for its index
+                if self._record_index is None:
+                    # The background build failed, build it here instead
+                    self._record_index = RecordIndex(self.X, self.Y, self.Z)
+                return self._record_index
+
     def get_num_records(self):
         """Get total number of records"""
         if self.data is None:
@@ -0,0 +1,97 @@
+import numpy as np
+from viewers.ecg.config import DIAGNOSIS_LABELS, SAMPLING_FREQUENCY, RECORD_PAGE_SIZE
+from viewers.ecg.utils.signal_processing import get_heartbeat_info
+
+
+def record_bpm(Y, fs=SAMPLING_FREQUENCY):
+    """Estimated heart rate of every record (the slow part of building a RecordIndex)"""
+    return np.array([get_heartbeat_info(Y[i], fs)[2] for i in range(Y.shape[0])])
+
+
+class RecordIndex:
+    """Searchable metadata of every record in the loaded dataset"""
+
+    def __init__(self, X, Y, Z, labels=DIAGNOSIS_LABELS, fs=SAMPLING_FREQUENCY, bpm=None):
+        """
+        Build the index once per dataset
+
+        Args:
+            X (np.ndarray): Standardized patient metadata (column 0 age, column 1 sex)
+            Y (np.ndarray): ECG curves (records, samples, leads)
+            Z (np.ndarray): One-hot diagnosis targets
+            labels (list): Diagnosis label names matching the columns of Z
+            fs (int): Sampling frequency used for the BPM estimate
+            bpm (np.ndarray): Precomputed record_bpm(Y, fs), skips the estimate
+        """
+        self.labels = list(labels)
+        self.n_records = X.shape[0]
+
+        self.age = np.asarray(X[:, 0], dtype=float)  # standardized (z-score)
+        self.sex = np.where(X[:, 1] > 0, 'F', 'M')
+        self.diagnoses = np.asarray(Z) >= 0.5  # (records, labels) bool
+        self.bpm = np.asarray(bpm, dtype=float) if bpm is not None else record_bpm(Y, fs)
+
+        self.descriptions = [
+            f"Record {i} · {'/'.join(self._diagnosis_names(i)) or '—'} · {self.sex[i]} · {self.bpm[i]:.0f} bpm"
+            for i in range(self.n_records)
+        ]
+        # Lower-case search text: record number, diagnoses and sex
+        self._search_text = np.array([
+            f"{i} {' '.join(self._diagnosis_names(i))} {self.sex[i]}".lower()
+            for i in range(self.n_records)
+        ])
+
+    def _diagnosis_names(self, i):
+        return [label for label, present in zip(self.labels, self.diagnoses[i]) if present]
+
+    def search(self, query=None, labels=None, sex=None, age_range=None, bpm_range=None):
+        """
+        Return the indices of the records matching every given filter
+
+        Args:
+            query (str): Space-separated terms matched against record number,
+                diagnosis and sex
+            labels (list): Keep records carrying any of these diagnoses
+            sex (str): 'M' or 'F'
+            age_range (tuple): (min, max) standardized age, None bounds are open
+            bpm_range (tuple): (min, max) heart rate, None bounds are open
+
+        Returns:
+            np.ndarray: Matching record indices in ascending order
+        """
+        mask = np.ones(self.n_records, dtype=bool)
+
+        for term in (query or '').lower().split():
+            mask &= np.char.find(self._search_text, term) >= 0
+
+        if labels:
+            columns = [self.labels.index(label) for label in labels if label in self.labels]
+            mask &= self.diagnoses[:, columns].any(axis=1)
+
+        if sex:
+            mask &= self.sex == sex
+
+        for values, (low, high) in ((self.age, age_range or (None, None)),
+                                    (self.bpm, bpm_range or (None, None))):
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+
+        return np.flatnonzero(mask)
+
+    def page(self, indices, page=0, page_size=RECORD_PAGE_SIZE):
+        """
+        Dropdown options for one page of search results
+
+        Returns:
+            tuple: (options, page, n_pages) with page clamped to the valid range
+        """
+        n_pages = max(1, -(-len(indices) // page_size))
+        page = min(max(page, 0), n_pages - 1)
+        visible = indices[page * page_size:(page + 1) * page_size]
+        return self.options(visible), page, n_pages
+
+    def options(self, indices):
+        """Dropdown options for the given record indices"""
+        return [{"label": self.descriptions[i], "value": int(i)} for i in indices]
@@ -0,0 +1,426 @@
+"""
+Live ECG ingestion for the continuous viewer
+
+Samples arrive as text lines of comma-separated lead values in mV, one line
+per sample, from one of (see ECG_STREAM_SOURCE in config.py):
+
+    simulator                 built-in synthetic 12-lead ECG (default)
+    socket:HOST:PORT          TCP feed, read as a client
+    file:PATH                 a file being appended to (followed like tail -f)
+
+The samples go into a ring buffer in a memory-mapped file that every gunicorn
+worker maps. Only the worker holding the ingest lease in the shared background
+cache reads the source; the others read the buffer and take over the source if
+that worker stops renewing its lease.
+
+A local stand-in feed for offline testing can be served over TCP or written
+to a file:
+
+    python -m viewers.ecg.data.stream serve --port 5055
+    python -m viewers.ecg.data.stream write feed.csv
+"""
+import abc
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+
+import diskcache
+import numpy as np
+from viewers.common.background import background_cache
+from viewers.ecg.config import (
+    SAMPLING_FREQUENCY,
+    STREAM_SOURCE,
+    STREAM_BUFFER_SECONDS,
+    STREAM_BUFFER_PATH,
+    STREAM_NUM_LEADS,
+    STREAM_LEASE_SECONDS
+)
+
+# Relative lead gains of the synthetic beat (I, II, III, aVR, aVL, aVF, V1-V6)
+SIMULATED_LEAD_GAINS = np.array([0.8, 1.0, 0.3, -0.9, 0.4, 0.6, -0.5, 0.2, 0.7, 1.1, 1.0, 0.8])
+# P, Q, R, S, T waves: (offset from R peak [s], width [s], amplitude [mV])
+SIMULATED_WAVES = [(-0.20, 0.025, 0.15), (-0.03, 0.010, -0.10), (0.0, 0.012, 1.0),
+                   (0.03, 0.010, -0.25), (0.25, 0.040, 0.30)]
+BUFFER_HEADER_BYTES = 64  # int64 count of samples appended, padded to keep the data aligned
+
+
+class ECGStreamBuffer:
+    """
+    Append-only ring buffer holding the most recent samples of a live feed
+
+    Samples are addressed by their absolute index since the stream started,
+    so the viewer can label the time axis however long the feed has run.
+    Given a path, the buffer lives in a memory-mapped file shared by every
+    process that opens it; one process appends, any number read.
+    """
+
+    def __init__(self, n_leads=STREAM_NUM_LEADS, fs=SAMPLING_FREQUENCY, seconds=STREAM_BUFFER_SECONDS, path=None):
+        self.n_leads = n_leads
+        self.fs = fs
+        self.capacity = int(seconds * fs)
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path is None:
+            self._counter = np.zeros(1, dtype=np.int64)
+            self._data = np.zeros((self.capacity, n_leads), dtype=np.float32)
+        else:
+            self._open(path)
+
+    def _open(self, path):
+        size = BUFFER_HEADER_BYTES + self.capacity * self.n_leads * np.dtype(np.float32).itemsize
+        # Workers opening the buffer at once must map the same file
+        with diskcache.Lock(background_cache, f'ecg-stream-buffer-init-{path}', expire=30):
+            if not os.path.exists(path) or os.path.getsize(path) != size:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                fd, staging = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+                with os.fdopen(fd, 'wb') as f:
+                    f.truncate(size)
+                os.replace(staging, path)
+        self._counter = np.memmap(path, dtype=np.int64, mode='r+', shape=(1,))
+        self._data = np.memmap(path, dtype=np.float32, mode='r+', offset=BUFFER_HEADER_BYTES,
+                               shape=(self.capacity, self.n_leads))
+
+    @property
+    def total(self):
+        """Samples appended since the start"""
+        return int(self._counter[0])
+
+    def append(self, samples):
+        """Append a (n, n_leads) block, overwriting the oldest samples when full"""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1, self.n_leads)
+        n_appended = len(samples)
+        if n_appended == 0:
+            return
+        # Only the newest capacity samples survive, but all of them count
+        samples = samples[-self.capacity:]
+        n = len(samples)
+
+        with self._lock:
+            total = self.total
+            pos = (total + n_appended - n) % self.capacity
+            first = min(n, self.capacity - pos)
+            self._data[pos:pos + first] = samples[:first]
+            self._data[:n - first] = samples[first:]
+            # Published after the samples, so readers never see unwritten rows
+            self._counter[0] = total + n_appended
+
+    def latest(self, n_samples):
+        """
+        Return a copy of the newest samples
+
+        Returns:
+            tuple: (start, samples) - absolute index of the first sample and a
+                (min(n_samples, available), n_leads) array
+        """
+        total = self.total
+        n = min(int(n_samples), total, self.capacity)
+        start = total - n
+        samples = self._data[np.arange(start, total) % self.capacity]
+
+        # Drop rows the writer overwrote while they were copied
+        overwritten = self.total - self.capacity - start
+        if overwritten > 0:
+            return start + overwritten, samples[overwritten:]
+        return start, samples
+
+
+def simulated_ecg(start, n_samples, fs=SAMPLING_FREQUENCY, bpm=72, n_leads=STREAM_NUM_LEADS, noise=0.02):
+    """
+    Synthetic 12-lead ECG samples [start, start + n_samples) of an endless recording
+
+    Every beat is a sum of Gaussian P-QRS-T waves scaled per lead, with a slow
+    respiratory baseline and a little noise.
+    """
+    t = (start + np.arange(n_samples)) / fs
+    period = 60.0 / bpm
+    phase = (t + period / 2) % period - period / 2  # time from the nearest R peak
+
+    beat = np.zeros(n_samples)
+    for offset, width, amplitude in SIMULATED_WAVES:
+        beat += amplitude * np.exp(-0.5 * ((phase - offset) / width) ** 2)
+    baseline = 0.05 * np.sin(2 * np.pi * 0.25 * t)
+
+    gains = np.resize(SIMULATED_LEAD_GAINS, n_leads)
+    samples = np.outer(beat, gains) + baseline[:, None]
+    return samples + noise * np.random.standard_normal(samples.shape)
+
+
+def parse_samples(lines, n_leads=STREAM_NUM_LEADS):
+    """Parse comma-separated sample lines, skipping lines that are not n_leads numbers"""
+    rows = []
+    for line in lines:
+        try:
+            values = [float(v) for v in line.strip().split(',')]
+        except ValueError:
+            continue
+        if len(values) == n_leads:
+            rows.append(values)
+    return np.array(rows, dtype=np.float32).reshape(-1, n_leads)
+
+
+def format_samples(samples):
+    """Encode a (n, n_leads) block as sample lines"""
+    return ''.join(','.join(f'{v:.4f}' for v in row) + '\n' for row in samples)
+
+
+class StreamIngestor(abc.ABC):
+    """Background thread feeding one source into an ECGStreamBuffer"""
+
+    description = "stream"
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='ecg-stream', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @abc.abstractmethod
+    def _run(self):
+        """Read the source into the buffer until stop() is called"""
+
+
+class SimulatedIngestor(StreamIngestor):
+    """Appends synthetic samples in real time"""
+
+    description = "simulator"
+
+    def __init__(self, buffer, bpm=72, chunk_seconds=0.1):
+        super().__init__(buffer)
+        self.bpm = bpm
+        self.chunk_seconds = chunk_seconds
+
+    def _run(self):
+        started = time.monotonic() - self.buffer.total / self.buffer.fs
+        while not self._stop.wait(self.chunk_seconds):
+            due = int((time.monotonic() - started) * self.buffer.fs) - self.buffer.total
+            if due > 0:
+                self.buffer.append(simulated_ecg(self.buffer.total, due, self.buffer.fs,
+                                                 self.bpm, self.buffer.n_leads))
+
+
+class SocketIngestor(StreamIngestor):
+    """Reads sample lines from a TCP feed, reconnecting when it drops"""
+
+    def __init__(self, buffer, host, port, retry_seconds=2.0):
+        super().__init__(buffer)
+        self.host = host
+        self.port = int(port)
+        self.retry_seconds = retry_seconds
+        self.description = f"socket {host}:{port}"
+
+    def _run(self):
+        batch = max(1, self.buffer.fs // 10)
+        while not self._stop.is_set():
+            try:
+                with socket.create_connection((self.host, self.port), timeout=5) as conn, \
+                        conn.makefile('r') as stream:
+                    self.error = None
+                    lines = []
+                    for line in stream:
+                        lines.append(line)
+                        if len(lines) >= batch:
+                            self.buffer.append(parse_samples(lines, self.buffer.n_leads))
+                            lines = []
+                        if self._stop.is_set():
+                            return
+            except OSError as e:
+                self.error = str(e)
+            self._stop.wait(self.retry_seconds)
+
+
+class FileIngestor(StreamIngestor):
+    """Follows a file being appended to, starting from its current end"""
+
+    def __init__(self, buffer, path, poll_seconds=0.1):
+        super().__init__(buffer)
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self.description = f"file {path}"
+
+    def _run(self):
+        while not os.path.exists(self.path):
+            self.error = f"Waiting for {self.path}"
+            if self._stop.wait(1.0):
+                return
+        self.error = None
+
+        with open(self.path, 'r') as f:
+            f.seek(0, os.SEEK_END)
+            partial = ''
+            while not self._stop.is_set():
+                chunk = f.read()
+                if not chunk:
+                    self._stop.wait(self.poll_seconds)
+                    continue
+                lines = (partial + chunk).split('\n')
+                partial = lines.pop()  # keep an unfinished last line for the next read
+                self.buffer.append(parse_samples(lines, self.buffer.n_leads))
+
+
+def create_ingestor(buffer, source=STREAM_SOURCE):
+    """Build the ingestor described by an ECG_STREAM_SOURCE string"""
+    kind, _, target = source.partition(':')
+    if kind == 'socket':
+        host, _, port = target.rpartition(':')
+        return SocketIngestor(buffer, host or '127.0.0.1', port)
+    if kind == 'file':
+        return FileIngestor(buffer, target)
+    if kind == 'simulator':
+        return SimulatedIngestor(buffer)
+    raise ValueError(f"Unknown ECG stream source '{source}'")
+
+
+class LiveECGStream:
+    """
+    The buffer and ingestor behind the 'live' data source, started on first use
+
+    Every worker maps the same buffer file. The ingest lease in the shared
+    cache makes sure a single worker runs the ingestor at a time; it is
+    renewed every lease_seconds / 3 and a standby worker takes over once it
+    expires.
+    """
+
+    LEASE_KEY = 'ecg-stream-ingest-lease'
+    ERROR_KEY = 'ecg-stream-ingest-error'
+
+    def __init__(self, source=STREAM_SOURCE, path=STREAM_BUFFER_PATH, lease_seconds=STREAM_LEASE_SECONDS,
+                 cache=background_cache):
+        self.buffer = ECGStreamBuffer(path=path)
+        self.ingestor = create_ingestor(self.buffer, source)
+        self.lease_seconds = lease_seconds
+        self.cache = cache
+        self.owner_id = uuid.uuid4().hex
+        self._lease_thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Join the workers competing for the ingest lease"""
+        with self._start_lock:
+            if self._lease_thread is None or not self._lease_thread.is_alive():
+                self._lease_thread = threading.Thread(target=self._hold_lease, name='ecg-stream-lease', daemon=True)
+                self._lease_thread.start()
+
+    def _hold_lease(self):
+        while True:
+            with self.cache.transact():
+                owner = self.cache.get(self.LEASE_KEY)
+                is_owner = owner in (None, self.owner_id)
+                if is_owner:
+                    self.cache.set(self.LEASE_KEY, self.owner_id, expire=self.lease_seconds)
+                    self.cache.set(self.ERROR_KEY, self.ingestor.error, expire=self.lease_seconds)
+
+            if is_owner:
+                self.ingestor.start()
+            elif self.ingestor.running:
+                self.ingestor.stop()
+            time.sleep(self.lease_seconds / 3)
+
+    @property
+    def is_ingesting(self):
+        """Whether this process currently reads the source"""
+        return self.ingestor.running
+
+    @property
+    def error(self):
+        """Last error of the ingesting worker, if any"""
+        return self.cache.get(self.ERROR_KEY)
+
+    @property
+    def description(self):
+        return self.ingestor.description
+
+
+def _simulated_blocks(fs, bpm, chunk_seconds=0.1):
+    """Yield real-time blocks of simulated samples forever"""
+    started = time.monotonic()
+    sent = 0
+    while True:
+        time.sleep(chunk_seconds)
+        due = int((time.monotonic() - started) * fs) - sent
+        if due > 0:
+            yield simulated_ecg(sent, due, fs, bpm)
+            sent += due
+
+
+def serve(host, port, fs, bpm):
+    """Send a simulated feed to every client connecting to host:port"""
+    clients = []
+    lock = threading.Lock()
+
+    def accept(server):
+        while True:
+            conn, address = server.accept()
+            print(f"Client connected: {address[0]}:{address[1]}")
+            with lock:
+                clients.append(conn)
+
+    server = socket.create_server((host, port))
+    threading.Thread(target=accept, args=(server,), daemon=True).start()
+    print(f"Serving simulated ECG at {fs} Hz on {host}:{port}")
+
+    for block in _simulated_blocks(fs, bpm):
+        data = format_samples(block).encode()
+        with lock:
+            for conn in clients[:]:
+                try:
+                    conn.sendall(data)
+                except OSError:
+                    clients.remove(conn)
+                    conn.close()
+
+
+def write(path, fs, bpm):
+    """Append a simulated feed to a file"""
+    print(f"Appending simulated ECG at {fs} Hz to {path}")
+    with open(path, 'a') as f:
+        for block in _simulated_blocks(fs, bpm):
+            f.write(format_samples(block))
+            f.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in live ECG feed")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="Serve a simulated feed over TCP")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=5055)
+
+    write_parser = commands.add_parser('write', help="Append a simulated feed to a file")
+    write_parser.add_argument('path')
+
+    for command in (serve_parser, write_parser):
+        command.add_argument('--fs', type=int, default=SAMPLING_FREQUENCY, help="Sampling frequency (Hz)")
+        command.add_argument('--bpm', type=float, default=72.0)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'serve':
+            serve(args.host, args.port, args.fs, args.bpm)
+        else:
+            write(args.path, args.fs, args.bpm)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import threading
+from collections import OrderedDict
+
+from viewers.ecg.config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_DIR
+
+
+class PredictionCache:
+    """
+    Diagnosis results keyed by (dataset hash, record index, model hash)
+
+    An in-process LRU answers repeat clicks without running the model. When
+    PREDICTION_CACHE_DIR is set, results are also kept in a diskcache store
+    that every gunicorn worker and background job shares.
+    """
+
+    def __init__(self, max_entries=PREDICTION_CACHE_SIZE, directory=PREDICTION_CACHE_DIR):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._disk = None
+        if directory:
+            import diskcache
+            self._disk = diskcache.Cache(directory)
+
+    def get(self, key):
+        """Return the cached result for key, or None"""
+        key = tuple(key)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        result = self._disk.get(key) if self._disk is not None else None
+        if result is not None:
+            self._remember(key, result)
+        return result
+
+    def put(self, key, result, persist=True):
+        """Store a successful prediction; persist=False keeps it in this process only"""
+        key = tuple(key)
+        self._remember(key, result)
+        if persist and self._disk is not None:
+            self._disk.set(key, result)
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
@@ -1,16 +1,92 @@
 
+import hashlib
+import logging
+import threading
+import time
 import numpy as np
-from tensorflow.keras.models import load_model
+from viewers.common.background import background_cache
 from viewers.ecg.config import MODEL_PATH, MODEL_INPUT_SIZE, DIAGNOSIS_LABELS
 
+logger = logging.getLogger(__name__)
+
+TIMING_KEY = 'ecg-model-timing'
+EMPTY_TIMING = {'loads': 0, 'load_total_s': 0.0, 'calls': 0, 'total_s': 0.0, 'last_s': None}
+
 
 class ECGPredictor:
-    """Handles ECG diagnosis prediction using trained model"""
+    """
+    Handles ECG diagnosis prediction using trained model
+
+    The model is loaded and traced by warm_up() when a process of the
+    inference pool starts, and stays loaded there for every prediction. The web
+    workers never initialise TensorFlow, so forking them cannot inherit its
+    thread pools. Load and inference times are added up in the shared
+    background cache, so any worker can report them.
+    """
 
-    def __init__(self, model_path=MODEL_PATH):
-        """Load the trained model"""
-        self.model = load_model(model_path)
+    def __init__(self, model_path=MODEL_PATH, timing_cache=background_cache):
+        self.model_path = model_path
+        self.model = None
+        self._infer = None
+        self._load_lock = threading.Lock()
         self.labels = DIAGNOSIS_LABELS
+        self.model_hash = self._file_hash(model_path)
+        self.timing_cache = timing_cache
+
+    def _load(self):
+        """Load the trained model and trace its inference function, once per process"""
+        with self._load_lock:
+            if self._infer is not None:
+                return
+            start = time.perf_counter()
+            import tensorflow as tf
+            from tensorflow.keras.models import load_model
+
+            self.model = load_model(self.model_path)
+
+            # Fixed signature: one trace serves every batch size, so single-record
+            # calls skip model.predict's data adapter and never retrace
+            metadata_shape = tuple(self.model.inputs[0].shape[1:])
+            signal_shape = tuple(self.model.inputs[1].shape[1:])
+            self._infer = tf.function(
+                lambda metadata, signal: self.model([metadata, signal], training=False),
+                input_signature=[
+                    tf.TensorSpec((None,) + metadata_shape, tf.float32),
+                    tf.TensorSpec((None,) + signal_shape, tf.float32)
+                ]
+            )
+            # Trace with a dummy batch so the load time, not the diagnosis, pays for it
+            self._infer(tf.zeros((1,) + metadata_shape), tf.zeros((1,) + signal_shape))
+
+            elapsed = time.perf_counter() - start
+            self._add_timing('load', elapsed)
+            logger.debug("ECG model loaded and traced in %.2fs", elapsed)
+
+    def warm_up(self):
+        """Load and trace the model now instead of on the first prediction"""
+        self._load()
+
+    def _add_timing(self, kind, elapsed):
+        """Add one model load or inference time to the shared counters"""
+        with self.timing_cache.transact():
+            timing = self.timing_cache.get(TIMING_KEY) or dict(EMPTY_TIMING)
+            if kind == 'load':
+                timing['loads'] += 1
+                timing['load_total_s'] += elapsed
+            else:
+                timing['calls'] += 1
+                timing['total_s'] += elapsed
+                timing['last_s'] = elapsed
+            self.timing_cache.set(TIMING_KEY, timing)
+
+    def timing_stats(self):
+        """Model load (including tracing) and inference times of all jobs, in seconds"""
+        timing = self.timing_cache.get(TIMING_KEY) or dict(EMPTY_TIMING)
+        return {
+            **timing,
+            'load_mean_s': timing['load_total_s'] / timing['loads'] if timing['loads'] else None,
+            'mean_s': timing['total_s'] / timing['calls'] if timing['calls'] else None
+        }
 
     def predict(self, metadata, signal_scaled):
         """
@@ -21,7 +97,8 @@ class ECGPredictor:
             signal_scaled (np.ndarray): Scaled ECG signal
 
         Returns:
-            dict: Prediction results containing label and confidence
+            dict: Prediction results containing label, confidence and the
+                probability of every label
         """
         try:
             # Prepare signal for prediction
@@ -32,14 +109,20 @@ class ECGPredictor:
             Y_test = np.expand_dims(signal_for_pred, axis=0)
 
             # Get predictions
-            predictions = self.model.predict([X_test, Y_test])
+            self._load()
+            start = time.perf_counter()
+            predictions = self._infer(X_test.astype(np.float32), Y_test.astype(np.float32)).numpy()
+            elapsed = time.perf_counter() - start
+            self._add_timing('call', elapsed)
+            logger.debug("ECG inference took %.1f ms", elapsed * 1000)
             pred_index = np.argmax(predictions, axis=1)[0]
             pred_label = self.labels[pred_index]
             confidence = np.max(predictions)
 
             return {
                 'label': pred_label,
-                'confidence': confidence,
+                'confidence': float(confidence),
+                'probabilities': {label: float(p) for label, p in zip(self.labels, predictions[0])},
                 'success': True,
                 'error': None
             }
@@ -48,10 +131,20 @@ class ECGPredictor:
             return {
                 'label': None,
                 'confidence': None,
+                'probabilities': None,
                 'success': False,
                 'error': str(e)
             }
 
+    @staticmethod
+    def _file_hash(path):
+        """SHA-256 of the model file, so cached predictions follow model updates"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+
     def _prepare_signal(self, signal_scaled):
         """
         Prepare signal for model input (pad or truncate to MODEL_INPUT_SIZE)
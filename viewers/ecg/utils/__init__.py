@@ -15,8 +15,11 @@ from .visualization import (
     create_xor_chunks_plot,
     create_polar_new_plot,
     create_phase_space_plot_with_colormap,
-    create_polar_time_domain_plot
+    create_polar_time_domain_plot,
+    create_grid_plot
 )
+from .polar_buffer import PolarHistory, PolarBufferStore
+from .figure_cache import FigureCache
 
 __all__ = [
     'get_heartbeat_info',
@@ -30,5 +33,9 @@ __all__ = [
     'create_xor_chunks_plot',
     'create_polar_new_plot',
     'create_phase_space_plot_with_colormap',
-    'create_polar_time_domain_plot'
-]
\ No newline at end of file
+    'create_polar_time_domain_plot',
+    'create_grid_plot',
+    'PolarHistory',
+    'PolarBufferStore',
+    'FigureCache'
+]
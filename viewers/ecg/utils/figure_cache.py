@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+
+from viewers.ecg.config import FIGURE_CACHE_SIZE
+
+
+class FigureCache:
+    """
+    Bounded LRU cache of built figures
+
+    Keys are tuples of everything a figure depends on - dataset id, record,
+    mode and that mode's parameters - so callbacks fired by unrelated inputs
+    and repeat views are answered without rebuilding the figure.
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """
+        Return the cached figure for key, calling build() on a miss
+
+        Args:
+            key (tuple): Hashable description of the figure
+            build (callable): Builds the figure when it is not cached
+        """
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return self._figures[key]
+            self.misses += 1
+
+        fig = build()
+
+        with self._lock:
+            self._figures[key] = fig
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+    def stats(self):
+        """Return size and hit/miss counters"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._figures),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
@@ -0,0 +1,130 @@
+from contextlib import contextmanager
+
+import diskcache
+import numpy as np
+from viewers.common.background import background_cache
+from viewers.common.decimation import minmax_envelope
+from viewers.ecg.config import POLAR_BUFFER_POINTS, POLAR_BUFFER_TTL, POLAR_WINDOW_POINTS
+
+
+class PolarHistory:
+    """
+    One session's cumulative polar history, stored window by window in a cache
+
+    Every window is reduced to at most window_points points by a min/max
+    envelope and stored under its own key, followed by a NaN gap point so
+    consecutive windows are not joined by a line. Appending writes only the new
+    window and a small index entry; once the history holds more than capacity
+    points the oldest windows are deleted, so storage and rendering cost stay
+    constant however long playback runs.
+    """
+
+    def __init__(self, cache, key, capacity=POLAR_BUFFER_POINTS, window_points=POLAR_WINDOW_POINTS,
+                 ttl=POLAR_BUFFER_TTL):
+        self.cache = cache
+        self.key = key
+        self.capacity = capacity
+        self.window_points = window_points
+        self.ttl = ttl
+
+        meta = cache.get(f'{key}-meta')
+        if meta is None or meta['capacity'] != (capacity, window_points):
+            meta = {'capacity': (capacity, window_points), 'first': 0, 'sizes': []}
+        self._meta = meta
+
+    @property
+    def n_windows(self):
+        """Windows appended since the last clear"""
+        return self._meta['first'] + len(self._meta['sizes'])
+
+    @property
+    def size(self):
+        """Points currently kept, gap points included"""
+        return sum(self._meta['sizes'])
+
+    def _window_key(self, n):
+        return f'{self.key}-{n}'
+
+    def clear(self):
+        for n in range(self._meta['first'], self.n_windows):
+            self.cache.delete(self._window_key(n))
+        self._meta['first'] = 0
+        self._meta['sizes'] = []
+        self.cache.delete(f'{self.key}-meta')
+
+    def append(self, r, theta):
+        """Store one window (plus a gap point) and drop the oldest windows beyond capacity"""
+        r = np.asarray(r, dtype=np.float32)
+        idx, r = minmax_envelope(r, max(1, (self.window_points - 2) // 2))
+        theta = np.asarray(theta, dtype=np.float32)[idx]
+        points = (np.append(r, np.nan).astype(np.float32)[-self.capacity:],
+                  np.append(theta, np.nan).astype(np.float32)[-self.capacity:])
+
+        self.cache.set(self._window_key(self.n_windows), points, expire=self.ttl)
+        self._meta['sizes'].append(len(points[0]))
+        while self.size > self.capacity:
+            self.cache.delete(self._window_key(self._meta['first']))
+            self._meta['first'] += 1
+            self._meta['sizes'].pop(0)
+        self.cache.set(f'{self.key}-meta', self._meta, expire=self.ttl)
+
+    def windows(self):
+        """Return the stored (window number, r, theta) entries, oldest first"""
+        entries = []
+        for n in range(self._meta['first'], self.n_windows):
+            points = self.cache.get(self._window_key(n))
+            if points is not None:  # an idle session's oldest windows may have expired
+                entries.append((n, *points))
+        return entries
+
+    def fade_groups(self, n_levels):
+        """
+        Split the history into at most n_levels age groups, oldest first
+
+        Returns:
+            list: (r, theta, age) tuples with age in (0, 1], 1 being the newest group
+        """
+        entries = self.windows()
+        if not entries:
+            return []
+
+        oldest = entries[0][0]
+        span = self.n_windows - oldest
+        groups = {}
+        for n, r, theta in entries:
+            level = ((n - oldest) * n_levels) // span
+            groups.setdefault(level, ([], []))
+            groups[level][0].append(r)
+            groups[level][1].append(theta)
+
+        return [(np.concatenate(rs), np.concatenate(thetas), (level + 1) / n_levels)
+                for level, (rs, thetas) in sorted(groups.items())]
+
+
+class PolarBufferStore:
+    """
+    Per-session polar histories kept in the shared background cache
+
+    Every gunicorn worker reads and writes the same on-disk store, so a
+    session's history does not depend on which worker serves a frame.
+    Histories expire after ttl seconds without a frame.
+    """
+
+    def __init__(self, capacity=POLAR_BUFFER_POINTS, window_points=POLAR_WINDOW_POINTS,
+                 ttl=POLAR_BUFFER_TTL, cache=background_cache):
+        self.capacity = capacity
+        self.window_points = window_points
+        self.ttl = ttl
+        self.cache = cache
+
+    @contextmanager
+    def session(self, session_id):
+        """
+        Lock a session's history and yield it
+
+        Frames of one session that reach different workers at once are
+        applied one after the other instead of overwriting each other.
+        """
+        key = f'polar-buffer-{session_id}'
+        with diskcache.Lock(self.cache, f'{key}-lock', expire=10):
+            yield PolarHistory(self.cache, key, self.capacity, self.window_points, self.ttl)
@@ -2,7 +2,9 @@ import numpy as np
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 from viewers.ecg.utils.signal_processing import compute_phase_space_occurrences
-from viewers.ecg.config import PHASE_SPACE_MIN_COUNT_DISPLAY
+from viewers.ecg.config import PHASE_SPACE_MIN_COUNT_DISPLAY, POLAR_FADE_LEVELS, GRID_COLUMNS, GRID_POINT_BUDGET
+from viewers.common.decimation import minmax_envelope
+from viewers.common.xor_engine import xor_chunks, xor_trace
 
 
 
@@ -143,7 +145,7 @@ def create_continuous_plot(signal_window, t, selected_channels, record_index,
 def create_xor_chunks_plot(signal, fs, channel, chunk_period, duration, threshold, record_index):
     """
     Create XOR Time Chunks plot - XOR between consecutive chunks
-    If chunks match (within threshold), they cancel out (XOR = 0, nothing plotted)
+    If chunks match (differ by less than threshold), they cancel out (XOR = 0, nothing plotted)
     If chunks differ, show the difference
 
     Args:
@@ -158,9 +160,6 @@ def create_xor_chunks_plot(signal, fs, channel, chunk_period, duration, threshol
     Returns:
         go.Figure: Plotly figure with XOR result
     """
-    import numpy as np
-    import plotly.graph_objs as go
-
     # Calculate samples
     chunk_samples = int(chunk_period * fs)
     duration_samples = int(duration * fs)
@@ -170,13 +169,10 @@ def create_xor_chunks_plot(signal, fs, channel, chunk_period, duration, threshol
         fig.add_annotation(text="Invalid parameters", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False)
         return fig
 
-    if duration_samples > len(signal):
-        duration_samples = len(signal)
-
     signal_window = signal[:duration_samples, channel]
 
-    # Calculate number of chunks
-    num_chunks = duration_samples // chunk_samples
+    # XOR Logic: Compare all consecutive chunks at once
+    num_chunks, pair, sample, value = xor_chunks(signal_window, chunk_samples, threshold)
 
     if num_chunks < 2:
         fig = go.Figure()
@@ -184,45 +180,11 @@ def create_xor_chunks_plot(signal, fs, channel, chunk_period, duration, threshol
                            xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False)
         return fig
 
-    # Time array for one chunk
-    t_chunk = np.linspace(0, chunk_period, chunk_samples)
-
-    # Extract all chunks
-    chunks = []
-    for i in range(num_chunks):
-        start_idx = i * chunk_samples
-        end_idx = start_idx + chunk_samples
-        if end_idx <= len(signal_window):
-            chunks.append(signal_window[start_idx:end_idx])
-
     fig = go.Figure()
 
-    # XOR Logic: Compare consecutive chunks
-    # For each pair of consecutive chunks, apply XOR
-    for i in range(len(chunks) - 1):
-        chunk1 = chunks[i]
-        chunk2 = chunks[i + 1]
-
-        # Calculate difference
-        diff = np.abs(chunk1 - chunk2)
-
-        # XOR: Only plot where difference > threshold (i.e., chunks don't match)
-        # Where diff <= threshold, chunks match, XOR = 0 (don't plot)
-        xor_mask = diff > threshold
-
-        # Get points where XOR = 1 (difference exists)
-        xor_times = t_chunk[xor_mask]
-        xor_values = diff[xor_mask]
-
-        if len(xor_times) > 0:
-            fig.add_trace(go.Scatter(
-                x=xor_times,
-                y=xor_values,
-                mode='markers',
-                name=f'XOR: Chunk {i + 1} ⊕ Chunk {i + 2}',
-                marker=dict(size=4, opacity=0.7),
-                showlegend=True
-            ))
+    # Points where XOR = 1 (difference exists), one trace colored by chunk pair
+    if len(value) > 0:
+        fig.add_trace(xor_trace(pair, sample, value, fs))
 
     # If all XOR results are empty, show message
     if len(fig.data) == 0:
@@ -237,7 +199,7 @@ def create_xor_chunks_plot(signal, fs, channel, chunk_period, duration, threshol
     fig.update_layout(
         title=f"ECG Record {record_index} - XOR Between Consecutive Chunks<br>"
               f"Lead {channel + 1} | Chunk Period: {chunk_period:.1f}s | "
-              f"{len(chunks)} chunks | Threshold: {threshold:.2f}mV<br>"
+              f"{num_chunks} chunks | Threshold: {threshold:.2f}mV<br>"
               f"<i>Points shown = chunks differ | Empty = chunks match</i>",
         xaxis_title="Time within Chunk [s]",
         yaxis_title="Absolute Difference [mV]",
@@ -252,7 +214,7 @@ def create_xor_chunks_plot(signal, fs, channel, chunk_period, duration, threshol
     return fig
 
 def create_polar_new_plot(signal_window, t, channel, record_index, start_idx, end_idx,
-                          fs, is_cumulative, cumulative_data):
+                          fs, is_cumulative, cumulative_buffer):
     """
     Create corrected Polar plot where r = magnitude, θ = time
 
@@ -265,10 +227,10 @@ def create_polar_new_plot(signal_window, t, channel, record_index, start_idx, en
         end_idx (int): End sample index
         fs (int): Sampling frequency
         is_cumulative (bool): Whether to show cumulative or latest only
-        cumulative_data (list): List of previous data points for cumulative mode
+        cumulative_buffer (PolarHistory): History of previous windows for cumulative mode
 
     Returns:
-        tuple: (figure, new_cumulative_data)
+        tuple: (figure, number of windows in the cumulative history)
     """
     # Extract signal for selected channel
     sig = signal_window[:, channel]
@@ -284,25 +246,26 @@ def create_polar_new_plot(signal_window, t, channel, record_index, start_idx, en
     fig = go.Figure()
 
     if is_cumulative:
-        # Cumulative mode: add new data to history
-        new_data = {'r': r.tolist(), 'theta': theta.tolist()}
-        cumulative_data.append(new_data)
-
-        # Plot all historical data with fading colors
-        for i, data in enumerate(cumulative_data):
-            opacity = 0.3 + (0.7 * (i / len(cumulative_data)))  # Fade older data
-            fig.add_trace(go.Scatterpolar(
-                r=data['r'],
-                theta=data['theta'],
+        # Cumulative mode: add new data to the bounded history
+        cumulative_buffer.append(r, theta)
+
+        # One trace per age group, older groups more transparent
+        for group_r, group_theta, age in cumulative_buffer.fade_groups(POLAR_FADE_LEVELS):
+            fig.add_trace(go.Scatterpolargl(
+                r=group_r,
+                theta=group_theta,
                 mode='lines+markers',
                 marker=dict(size=2),
                 line=dict(width=1),
-                opacity=opacity,
+                opacity=0.3 + 0.7 * age,  # Fade older data
                 showlegend=False
             ))
+        n_windows = cumulative_buffer.n_windows
     else:
         # Latest mode: show only current window
-        cumulative_data = []  # Reset cumulative data
+        if cumulative_buffer is not None:
+            cumulative_buffer.clear()  # Reset cumulative data
+        n_windows = 0
         fig.add_trace(go.Scatterpolar(
             r=r,
             theta=theta,
@@ -335,7 +298,7 @@ def create_polar_new_plot(signal_window, t, channel, record_index, start_idx, en
         # margin=dict(l=50, r=50, t=100, b=50)
     )
 
-    return fig, cumulative_data
+    return fig, n_windows
 
 def create_phase_space_plot_with_colormap(signal_window, channel_1, channel_2, record_index,
                                           start_idx, end_idx, fs, grid_resolution, colormap):
@@ -474,4 +437,68 @@ def create_polar_time_domain_plot(signal_window, t, channel, record_index,
     fig.update_xaxes(showgrid=True, gridcolor='lightgray', range=[t[0], t[-1]])
     fig.update_yaxes(showgrid=True, gridcolor='lightgray', zeroline=True, zerolinecolor='gray')
 
-    return fig
\ No newline at end of file
+    return fig
+
+
+def create_grid_plot(signals, record_indices, lead, fs, titles=None,
+                     columns=GRID_COLUMNS, point_budget=GRID_POINT_BUDGET):
+    """
+    Create small multiples of one lead for several records
+
+    Every panel is reduced to a min/max envelope of point_budget / N points,
+    so the figure stays the same size however many records are shown.
+
+    Args:
+        signals (np.ndarray): (N, samples) signals of the lead, one row per record
+        record_indices (list): Record index of each row
+        lead (int): Lead index shown
+        fs (int): Sampling frequency
+        titles (list): Panel titles (default "Record i")
+        columns (int): Panels per row
+        point_budget (int): Total number of points in the figure
+
+    Returns:
+        go.Figure: Grid figure, trace k belongs to record_indices[k]
+    """
+    n = len(record_indices)
+    if n == 0:
+        fig = go.Figure()
+        fig.add_annotation(text="No records match the filters", xref="paper", yref="paper",
+                           x=0.5, y=0.5, showarrow=False)
+        return fig
+
+    columns = min(columns, n)
+    rows = -(-n // columns)
+    titles = titles or [f"Record {i}" for i in record_indices]
+
+    fig = make_subplots(
+        rows=rows, cols=columns,
+        subplot_titles=titles,
+        shared_xaxes=True,
+        horizontal_spacing=0.02,
+        vertical_spacing=min(0.08, 0.4 / rows)
+    )
+
+    n_bins = max(1, point_budget // (2 * n))
+    for k, (record, y) in enumerate(zip(record_indices, signals)):
+        idx, values = minmax_envelope(y, n_bins)
+        fig.add_trace(go.Scattergl(
+            x=(idx / fs).astype(np.float32),  # float32 halves the payload
+            y=np.asarray(values, dtype=np.float32),
+            mode='lines',
+            line=dict(width=1, color='#2c3e50'),
+            name=f'Record {record}',
+            hovertemplate=f"Record {record}<br>%{{x:.2f}}s, %{{y:.2f}} mV<extra></extra>",
+            showlegend=False
+        ), row=k // columns + 1, col=k % columns + 1)
+
+    fig.update_annotations(font_size=10)
+    fig.update_xaxes(showticklabels=False, showgrid=False)
+    fig.update_yaxes(showticklabels=False, showgrid=False, zeroline=False)
+    fig.update_layout(
+        title=f"{get_lead_name(lead)} - {n} records",
+        height=max(400, 150 * rows),
+        margin=dict(l=20, r=20, t=80, b=20),
+        hovermode='closest'
+    )
+    return fig